@@ -0,0 +1,438 @@
+#!python
+
+from array import array
+
+from linkedlist import _MISSING, _check_match
+
+NIL = -1  # "No node" in the next and prev columns
+
+
+class ArrayLinkedList(object):
+    """Doubly linked list with the same API as LinkedList, but without Node
+    objects. Item i lives in slot i of three parallel columns: data (a list)
+    and next and prev (arrays of C ints holding slot numbers). A node handle
+    is just its slot number, so ll.data[ll.tail] is the tail item, the way
+    ll.tail.data is for LinkedList.
+    Removed slots go on a free list (chained through the next column) and
+    get reused, so a queue that keeps adding and removing stops allocating.
+    Each item costs 8 bytes of list pointer plus 2 * 4 bytes of links,
+    against 56+ bytes for a Node."""
+
+    def __init__(self, iterable=None):
+        """Initialize this linked list and append the given items, if any."""
+        self.head = None  # Slot of the first node
+        self.tail = None  # Slot of the last node
+        self.size = 0  # Number of nodes
+        self.data = []
+        self.next = array('i')
+        self.prev = array('i')
+        self._free = NIL  # First free slot; the rest follow through next
+        if iterable is not None:
+            self.extend(iterable)
+
+    def __str__(self):
+        """Return a formatted string representation of this linked list."""
+        items = ['({!r})'.format(item) for item in self]
+        return '[{}]'.format(' -> '.join(items))
+
+    def __repr__(self):
+        """Return a string representation of this linked list."""
+        return 'ArrayLinkedList({!r})'.format(self.items())
+
+    def __iter__(self):
+        """Return a generator over the items from head to tail."""
+        return self.iter_from(self.head)
+
+    def __reversed__(self):
+        """Return a generator over the items from tail to head."""
+        return self.iter_from(self.tail, reverse=True)
+
+    def __len__(self):
+        """Return the number of items in this linked list."""
+        return self.size
+
+    def iter_from(self, slot, reverse=False):
+        """Yield the items from the given slot (included) to the tail, or to
+        the head if reverse is True.
+        Running time: O(1) per item"""
+        if slot is None:
+            return
+        data = self.data
+        links = self.prev if reverse else self.next
+        while slot != NIL:
+            # Step first, in case the caller unlinks the slot we yielded
+            following = links[slot]
+            yield data[slot]
+            slot = following
+
+    def items(self):
+        """Return a list of all items in this linked list.
+        Best and worst case running time: Theta(n)"""
+        return list(self)
+
+    def rev_items(self):
+        """Return a list of all items in this linked list, last first.
+        Best and worst case running time: Theta(n)"""
+        return list(reversed(self))
+
+    def is_empty(self):
+        """Return True if this linked list is empty, or False."""
+        return self.head is None
+
+    def length(self):
+        """Return the number of items in this linked list.
+        Best and worst case: O(1); size is kept up to date"""
+        return self.size
+
+    def check_invariants(self):
+        """Walk the list once and raise AssertionError if size, head, tail
+        or any prev/next pair disagree with the slots. Slow; meant for tests
+        and debugging, not for normal use.
+        Best and worst case: Theta(n)"""
+        count = 0
+        previous = NIL
+        slot = NIL if self.head is None else self.head
+        while slot != NIL:
+            if self.prev[slot] != previous:
+                raise AssertionError('Slot {} at index {} has prev {}, '
+                                     'expected {}'.format(
+                                         slot, count, self.prev[slot],
+                                         previous))
+            count += 1
+            # A cycle would otherwise loop forever
+            if count > self.size:
+                raise AssertionError('More slots than size {}'
+                                     .format(self.size))
+            previous = slot
+            slot = self.next[slot]
+        if count != self.size:
+            raise AssertionError('Counted {} slots, size is {}'
+                                 .format(count, self.size))
+        if (NIL if self.tail is None else self.tail) != previous:
+            raise AssertionError('Tail is {}, last slot is {}'
+                                 .format(self.tail, previous))
+
+    def first(self):
+        """Return the item at the head, or raise ValueError if empty."""
+        if self.head is None:
+            raise ValueError('List is empty')
+        return self.data[self.head]
+
+    def last(self):
+        """Return the item at the tail, or raise ValueError if empty."""
+        if self.tail is None:
+            raise ValueError('List is empty')
+        return self.data[self.tail]
+
+    def _new_slot(self, item):
+        """Return an unlinked slot holding item, reusing a free one if any.
+        Running time: O(1) (amortised, when the columns have to grow)"""
+        slot = self._free
+        if slot != NIL:
+            self._free = self.next[slot]
+            self.data[slot] = item
+            self.next[slot] = NIL
+            return slot
+        self.data.append(item)
+        self.next.append(NIL)
+        self.prev.append(NIL)
+        return len(self.data) - 1
+
+    def _free_slot(self, slot):
+        """Put the given unlinked slot on the free list and return its item."""
+        item = self.data[slot]
+        # Don't keep the item alive
+        self.data[slot] = None
+        self.prev[slot] = NIL
+        self.next[slot] = self._free
+        self._free = slot
+        return item
+
+    def _slot_at(self, index):
+        """Return the slot at the given (valid) index, walking from whichever
+        end is closer.
+        Best case: O(1) at either end
+        Worst case: O(n/2) in the middle"""
+        if index < self.size - 1 - index:
+            slot = self.head
+            for i in range(index):
+                slot = self.next[slot]
+        else:
+            slot = self.tail
+            for i in range(self.size - 1 - index):
+                slot = self.prev[slot]
+        return slot
+
+    def get_at_index(self, index):
+        """Return the item at the given index in this linked list, or
+        raise ValueError if the given index is out of range of the list size.
+        Best case: O(1) at either end
+        Worst case: O(n/2) in the middle"""
+        if not (0 <= index < self.size):
+            raise ValueError('List index out of range: {}'.format(index))
+        return self.data[self._slot_at(index)]
+
+    def insert_at_index(self, index, item):
+        """Insert the given item at the given index in this linked list, or
+        raise ValueError if the given index is out of range of the list size.
+        Best case: O(1) at either end
+        Worst case: O(n/2) in the middle"""
+        if not (0 <= index <= self.size):
+            raise ValueError('List index out of range: {}'.format(index))
+        if index == self.size:
+            self.append(item)
+        else:
+            self.insert_before(self._slot_at(index), item)
+
+    def append(self, item):
+        """Insert the given item at the tail of this linked list.
+        Best and worst case: O(1)"""
+        slot = self._new_slot(item)
+        if self.tail is None:
+            self.head = slot
+        else:
+            self.next[self.tail] = slot
+            self.prev[slot] = self.tail
+        self.tail = slot
+        self.size += 1
+
+    def prepend(self, item):
+        """Insert the given item at the head of this linked list.
+        Best and worst case: O(1)"""
+        slot = self._new_slot(item)
+        if self.head is None:
+            self.tail = slot
+        else:
+            self.next[slot] = self.head
+            self.prev[self.head] = slot
+        self.head = slot
+        self.size += 1
+
+    def extend(self, iterable):
+        """Append every item of the given iterable.
+        Best and worst case: O(k) for k items"""
+        for item in iterable:
+            self.append(item)
+
+    def find(self, quality):
+        """Return an item from this linked list satisfying the given quality,
+        or None if there isn't one.
+        Best case: O(1) if it's near the head
+        Worst case: O(n) if it's near the tail or not there"""
+        for item in self:
+            if quality(item):
+                return item
+        return None
+
+    def find_all(self, quality=None, *, item=_MISSING):
+        """Return a list of every item satisfying the given quality, or equal
+        to the given item (which skips calling a function per item).
+        Best and worst case: Theta(n)"""
+        quality = _check_match(quality, item)
+        if quality is None:
+            return [data for data in self if data == item]
+        return [data for data in self if quality(data)]
+
+    def count_if(self, quality=None, *, item=_MISSING):
+        """Return how many items satisfy the given quality, or equal the
+        given item.
+        Best and worst case: Theta(n)"""
+        quality = _check_match(quality, item)
+        if quality is None:
+            return sum(1 for data in self if data == item)
+        return sum(1 for data in self if quality(data))
+
+    def remove_if(self, quality=None, *, item=_MISSING):
+        """Remove every item satisfying the given quality, or equal to the
+        given item, and return how many were removed.
+        Best and worst case: Theta(n)"""
+        quality = _check_match(quality, item)
+        count = 0
+        slot = NIL if self.head is None else self.head
+        while slot != NIL:
+            following = self.next[slot]
+            data = self.data[slot]
+            if data == item if quality is None else quality(data):
+                self._detach(slot)
+                self._free_slot(slot)
+                count += 1
+            slot = following
+        return count
+
+    def index_of(self, quality=None, *, item=_MISSING):
+        """Return the index of the first item satisfying the given quality,
+        or equal to the given item, or raise ValueError if there's none.
+        Best case: O(1) if it's the head
+        Worst case: Theta(n)"""
+        quality = _check_match(quality, item)
+        for index, data in enumerate(self):
+            if data == item if quality is None else quality(data):
+                return index
+        raise ValueError('Item not found: {}'.format(
+            item if quality is None else quality))
+
+    def _find_slot(self, item):
+        """Return the slot of the first node holding item, or NIL."""
+        slot = NIL if self.head is None else self.head
+        data, links = self.data, self.next
+        while slot != NIL and data[slot] != item:
+            slot = links[slot]
+        return slot
+
+    def replace(self, old_item, new_item):
+        """Replace the given old_item in this linked list with given new_item
+        in the same slot, or raise ValueError if old_item is not found.
+        Best case: O(1) if it's at the head
+        Worst case: O(n) if it's at the tail or not there"""
+        if old_item == new_item:
+            return
+        slot = self._find_slot(old_item)
+        if slot == NIL:
+            raise ValueError('Item not found: {}'.format(old_item))
+        self.data[slot] = new_item
+
+    def delete(self, item):
+        """Delete the given item from this linked list, or raise ValueError.
+        Best case: O(1) if it's at the head
+        Worst case: O(n) if it's at the tail or not there"""
+        slot = self._find_slot(item)
+        if slot == NIL:
+            raise ValueError('Item not found: {}'.format(item))
+        self.unlink(slot)
+        self._free_slot(slot)
+
+    def _detach(self, slot):
+        """Relink the neighbours of the given slot around it."""
+        before, after = self.prev[slot], self.next[slot]
+        if before == NIL:
+            self.head = None if after == NIL else after
+        else:
+            self.next[before] = after
+        if after == NIL:
+            self.tail = None if before == NIL else before
+        else:
+            self.prev[after] = before
+        self.next[slot] = self.prev[slot] = NIL
+        self.size -= 1
+
+    def unlink(self, slot):
+        """Remove the node in the given slot (which must be in this list)
+        from the list. The slot isn't put back on the free list, so nothing
+        else gets it while the caller still holds the handle.
+        Best and worst case: O(1)"""
+        self._detach(slot)
+
+    def insert_after(self, slot, item):
+        """Insert the given item right after the given slot (which must be in
+        this list) and return the new slot. Slots are plain numbers that get
+        reused, so once delete or remove_if frees the slot, drop the handle;
+        use unlink to take it out while keeping the slot yours.
+        Best and worst case: O(1)"""
+        if slot == self.tail:
+            self.append(item)
+            return self.tail
+        new_slot = self._new_slot(item)
+        after = self.next[slot]
+        self.prev[new_slot] = slot
+        self.next[new_slot] = after
+        self.prev[after] = new_slot
+        self.next[slot] = new_slot
+        self.size += 1
+        return new_slot
+
+    def insert_before(self, slot, item):
+        """Insert the given item right before the given slot (which must be
+        in this list) and return the new slot.
+        Best and worst case: O(1)"""
+        if slot == self.head:
+            self.prepend(item)
+            return self.head
+        return self.insert_after(self.prev[slot], item)
+
+    def move_to_front(self, slot):
+        """Move the given slot (which must be in this list) to the head.
+        Best and worst case: O(1)"""
+        if slot == self.head:
+            return
+        self._detach(slot)
+        if self.head is None:
+            self.tail = slot
+        else:
+            self.next[slot] = self.head
+            self.prev[self.head] = slot
+        self.head = slot
+        self.size += 1
+
+    def move_to_back(self, slot):
+        """Move the given slot (which must be in this list) to the tail.
+        Best and worst case: O(1)"""
+        if slot == self.tail:
+            return
+        self._detach(slot)
+        if self.tail is None:
+            self.head = slot
+        else:
+            self.next[self.tail] = slot
+            self.prev[slot] = self.tail
+        self.tail = slot
+        self.size += 1
+
+    def splice(self, other):
+        """Move every item of the other linked list onto the end of this one,
+        leaving the other one empty. Slots can't move between columns, so
+        unlike LinkedList.splice this copies the items.
+        Best and worst case: O(k) for k items in the other list"""
+        if other is self:
+            return
+        self.extend(other)
+        other.clear()
+
+    def concat(self, *others):
+        """Splice each of the given linked lists onto the end of this one,
+        in order, and return this list.
+        Best and worst case: O(k) for k items in total"""
+        for other in others:
+            self.splice(other)
+        return self
+
+    def clear(self):
+        """Remove every item and give back the memory of the columns."""
+        self.__init__()
+
+    def remove_tail(self):
+        """Remove and return the item at the tail.
+        Best and worst case: O(1)"""
+        slot = self.tail
+        prev = self.prev
+        before = prev[slot]
+        if before == NIL:
+            self.head = self.tail = None
+        else:
+            self.next[before] = NIL
+            prev[slot] = NIL
+            self.tail = before
+        self.size -= 1
+        item = self.data[slot]
+        self.data[slot] = None
+        self.next[slot] = self._free
+        self._free = slot
+        return item
+
+    def remove_head(self):
+        """Remove and return the item at the head. Written out instead of
+        going through _detach, since queues call this all the time.
+        Best and worst case: O(1)"""
+        slot = self.head
+        following = self.next
+        after = following[slot]
+        if after == NIL:
+            self.head = self.tail = None
+        else:
+            self.prev[after] = NIL
+            self.head = after
+        self.size -= 1
+        item = self.data[slot]
+        self.data[slot] = None
+        following[slot] = self._free
+        self._free = slot
+        return item
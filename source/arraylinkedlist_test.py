@@ -0,0 +1,167 @@
+#!python
+
+from arraylinkedlist import ArrayLinkedList, NIL
+import random
+import unittest
+
+
+class ArrayLinkedListTest(unittest.TestCase):
+
+    def test_init(self):
+        ll = ArrayLinkedList()
+        assert ll.head is None
+        assert ll.tail is None
+        assert ll.size == 0
+        ll = ArrayLinkedList(['A', 'B', 'C'])
+        assert ll.data[ll.head] == 'A'
+        assert ll.data[ll.tail] == 'C'
+        assert ll.items() == ['A', 'B', 'C']
+        assert ll.length() == 3
+
+    def test_append_and_prepend(self):
+        ll = ArrayLinkedList()
+        ll.append('B')
+        ll.append('C')
+        ll.prepend('A')
+        assert ll.items() == ['A', 'B', 'C']
+        assert ll.rev_items() == ['C', 'B', 'A']
+        assert list(ll) == ['A', 'B', 'C']
+        assert list(reversed(ll)) == ['C', 'B', 'A']
+        assert len(ll) == 3
+        assert ll.first() == 'A'
+        assert ll.last() == 'C'
+
+    def test_remove_head_and_tail(self):
+        ll = ArrayLinkedList(['A', 'B', 'C'])
+        assert ll.remove_head() == 'A'
+        assert ll.remove_tail() == 'C'
+        assert ll.items() == ['B']
+        assert ll.remove_head() == 'B'
+        assert ll.is_empty()
+        assert ll.head is None and ll.tail is None
+        with self.assertRaises(ValueError):
+            ll.first()
+
+    def test_free_slots_are_reused(self):
+        ll = ArrayLinkedList(range(4))
+        for number in range(100):
+            ll.append(number)
+            ll.remove_head()
+        # The columns never grew past the five slots the queue needed
+        assert len(ll.data) == 5
+        assert len(ll.next) == len(ll.prev) == 5
+        assert ll.items() == [96, 97, 98, 99]
+
+    def test_removed_items_are_let_go(self):
+        ll = ArrayLinkedList(['A', 'B'])
+        slot = ll.head
+        ll.remove_head()
+        assert ll.data[slot] is None
+
+    def test_get_and_insert_at_index(self):
+        ll = ArrayLinkedList(['A', 'C'])
+        ll.insert_at_index(1, 'B')
+        ll.insert_at_index(0, 'Z')
+        ll.insert_at_index(4, 'D')
+        assert ll.items() == ['Z', 'A', 'B', 'C', 'D']
+        assert [ll.get_at_index(i) for i in range(5)] == ll.items()
+        with self.assertRaises(ValueError):
+            ll.get_at_index(5)
+        with self.assertRaises(ValueError):
+            ll.insert_at_index(6, 'X')
+
+    def test_find_replace_delete(self):
+        ll = ArrayLinkedList(['A', 'B', 'C'])
+        assert ll.find(lambda item: item > 'A') == 'B'
+        assert ll.find(lambda item: item > 'Z') is None
+        ll.replace('B', 'X')
+        assert ll.items() == ['A', 'X', 'C']
+        with self.assertRaises(ValueError):
+            ll.replace('B', 'Y')
+        ll.delete('A')
+        ll.delete('C')
+        assert ll.items() == ['X']
+        with self.assertRaises(ValueError):
+            ll.delete('A')
+
+    def test_bulk_matching(self):
+        ll = ArrayLinkedList([1, 2, 3, 2, 4])
+        assert ll.find_all(lambda item: item % 2 == 0) == [2, 2, 4]
+        assert ll.find_all(item=2) == [2, 2]
+        assert ll.count_if(item=2) == 2
+        assert ll.index_of(item=3) == 2
+        assert ll.index_of(quality=lambda item: item > 3) == 4
+        assert ll.index_of(lambda item: item > 3) == 4
+        for method in [ll.find_all, ll.count_if, ll.remove_if, ll.index_of]:
+            with self.assertRaises(TypeError):
+                method(2)
+        with self.assertRaises(ValueError):
+            ll.index_of(item=9)
+        with self.assertRaises(TypeError):
+            ll.count_if()
+        assert ll.remove_if(item=2) == 2
+        assert ll.items() == [1, 3, 4]
+        ll.check_invariants()
+
+    def test_slot_handles(self):
+        ll = ArrayLinkedList(['A', 'C'])
+        b = ll.insert_after(ll.head, 'B')
+        assert ll.data[b] == 'B'
+        ll.insert_before(ll.head, 'Z')
+        assert ll.items() == ['Z', 'A', 'B', 'C']
+        ll.move_to_front(b)
+        assert ll.items() == ['B', 'Z', 'A', 'C']
+        ll.move_to_back(b)
+        assert ll.items() == ['Z', 'A', 'C', 'B']
+        ll.unlink(b)
+        assert ll.items() == ['Z', 'A', 'C']
+        assert ll.next[b] == NIL and ll.prev[b] == NIL
+        assert list(ll.iter_from(ll.tail, reverse=True)) == ['C', 'A', 'Z']
+
+    def test_splice_and_concat(self):
+        ll = ArrayLinkedList(['A'])
+        other = ArrayLinkedList(['B', 'C'])
+        ll.concat(other, ArrayLinkedList(['D']))
+        assert ll.items() == ['A', 'B', 'C', 'D']
+        assert other.is_empty()
+
+    def test_matches_list(self):
+        rand = random.Random(3)
+        ll = ArrayLinkedList()
+        expected = []
+        for step in range(2000):
+            choice = rand.randrange(5)
+            if choice == 0:
+                ll.append(step)
+                expected.append(step)
+            elif choice == 1:
+                ll.prepend(step)
+                expected.insert(0, step)
+            elif choice == 2 and expected:
+                assert ll.remove_head() == expected.pop(0)
+            elif choice == 3 and expected:
+                assert ll.remove_tail() == expected.pop()
+            elif choice == 4:
+                index = rand.randrange(len(expected) + 1)
+                ll.insert_at_index(index, step)
+                expected.insert(index, step)
+            ll.check_invariants()
+        assert ll.items() == expected
+        assert ll.rev_items() == expected[::-1]
+        assert ll.size == len(expected)
+
+    def test_check_invariants(self):
+        ll = ArrayLinkedList(['A', 'B', 'C'])
+        ll.check_invariants()
+        ArrayLinkedList().check_invariants()
+        ll.size = 2
+        with self.assertRaises(AssertionError):
+            ll.check_invariants()
+        ll.size = 3
+        ll.prev[ll.tail] = NIL
+        with self.assertRaises(AssertionError):
+            ll.check_invariants()
+
+
+if __name__ == '__main__':
+    unittest.main()
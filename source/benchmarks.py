@@ -0,0 +1,716 @@
+#!python
+"""Rough timing benchmarks for the data structures in this folder.
+Run all of them with `python benchmarks.py`, or just some by name, like
+`python benchmarks.py concurrent_hashtable`."""
+
+import collections
+import itertools
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from hashtable import HashTable, fibonacci_hash, mix64_hash, seeded_hash
+from concurrenthashtable import ConcurrentHashTable
+from arraylinkedlist import ArrayLinkedList
+from bitset import BitSet
+from bloomfilter import BloomFilter, BloomFront
+from linkedlist import LinkedList, Node, NodePool
+from roaringset import RoaringSet
+from set import Set, FrozenSet
+from binarytree import BinarySearchTree
+from skiplist import SkipList
+from unrolledlinkedlist import UnrolledLinkedList
+
+
+def _time(function):
+    """Call function and return how many seconds it took."""
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def _allocated(function):
+    """Call function and return (its result, bytes it left allocated)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = function()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def _run_threads(thread_count, worker):
+    """Run worker(thread_number) on thread_count threads and wait for all."""
+    threads = [threading.Thread(target=worker, args=(number,))
+               for number in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def benchmark_bitset(domain=200000, density=0.5):
+    """Compare memory, build time and set algebra time of the hash-backed
+    Set against BitSet, for two random halves of a dense range of ids."""
+    rand = random.Random(0)
+    first = [number for number in range(domain) if rand.random() < density]
+    second = [number for number in range(domain) if rand.random() < density]
+    print('Dense integer sets: two sets of ~{} ids out of {}'
+          .format(len(first), domain))
+    print('{:>8} {:>12} {:>9} {:>9} {:>14} {:>12} {:>10}'.format(
+        'set', 'bytes/elem', 'build s', 'union s', 'intersection s',
+        'difference s', 'subset s'))
+    for name, make in [('Set', Set), ('BitSet', BitSet)]:
+        start = time.perf_counter()
+        (left, right), nbytes = _allocated(lambda: (make(first),
+                                                    make(second)))
+        build_time = time.perf_counter() - start
+        times = [_time(lambda: left.union(right)),
+                 _time(lambda: left.intersection(right)),
+                 _time(lambda: left.difference(right)),
+                 _time(lambda: left.is_subset(right))]
+        print('{:>8} {:>12.2f} {:>9.3f} {:>9.3f} {:>14.3f} {:>12.3f} '
+              '{:>10.3f}'.format(name, nbytes / (len(first) + len(second)),
+                                 build_time, *times))
+
+
+def benchmark_bloom(size=100000, lookups=500000,
+                    miss_rates=(1.0, 0.9, 0.5)):
+    """Measure Bloom filter memory per element and false positive rate at a
+    few error rates, then time lookups on a Set and a HashTable with and
+    without a BloomFront, for a few shares of misses."""
+    rand = random.Random(0)
+    keys = ['user{}'.format(i) for i in range(size)]
+    others = ['other{}'.format(i) for i in range(size)]
+    print('Bloom filter: {} string keys'.format(size))
+    print('{:>12} {:>8} {:>12} {:>16}'.format('error rate', 'hashes',
+                                              'bytes/elem', 'measured rate'))
+    for error_rate in (0.1, 0.01, 0.001):
+        bloom = BloomFilter(size, error_rate)
+        bloom.add_many(keys)
+        false_positives = sum(bloom.contains(key) for key in others)
+        print('{:>12} {:>8} {:>12.2f} {:>16.4f}'.format(
+            error_rate, bloom.hash_count, bloom.bytes_per_element(),
+            false_positives / len(others)))
+    containers = [('Set', Set(keys)),
+                  ('HashTable', HashTable.from_items((key, 1)
+                                                     for key in keys))]
+    print('{} lookups; seconds for each share of misses'.format(lookups))
+    print('{:>22}'.format('container') +
+          ''.join('{:>9.0%}'.format(rate) for rate in miss_rates))
+    for name, container in containers:
+        front = BloomFront(container)
+        plain_times, front_times = [], []
+        for miss_rate in miss_rates:
+            probes = [rand.choice(others) if rand.random() < miss_rate
+                      else rand.choice(keys) for i in range(lookups)]
+            plain_times.append(_time(lambda: [container.contains(key)
+                                              for key in probes]))
+            front_times.append(_time(lambda: [front.contains(key)
+                                              for key in probes]))
+        print('{:>22}'.format(name) +
+              ''.join('{:>9.3f}'.format(t) for t in plain_times))
+        print('{:>22}'.format('BloomFront(' + name + ')') +
+              ''.join('{:>9.3f}'.format(t) for t in front_times))
+
+
+def benchmark_concurrent_hashtable(operations=200000,
+                                   thread_counts=(1, 2, 4, 8)):
+    """Compare throughput of a HashTable behind one global lock against the
+    striped ConcurrentHashTable, for a 90% get / 10% set mix of int keys.
+    Note that on CPython the GIL keeps pure Python code from running in
+    parallel, so the striped table mostly wins on reduced lock contention."""
+    print('Concurrent hash table: {} operations, 90% get / 10% set'
+          .format(operations))
+    print('{:>8} {:>18} {:>18}'.format('threads', 'global lock ops/s',
+                                        'striped ops/s'))
+    keys = list(range(50000))
+    for thread_count in thread_counts:
+        per_thread = operations // thread_count
+        plain = HashTable.from_items((key, key) for key in keys)
+        global_lock = threading.Lock()
+        striped = ConcurrentHashTable(init_size=65536)
+        for key in keys:
+            striped.set(key, key)
+
+        def locked_worker(number):
+            rand = random.Random(number)
+            for i in range(per_thread):
+                key = rand.choice(keys)
+                with global_lock:
+                    if i % 10 == 0:
+                        plain.set(key, i)
+                    else:
+                        plain.get(key)
+
+        def striped_worker(number):
+            rand = random.Random(number)
+            for i in range(per_thread):
+                key = rand.choice(keys)
+                if i % 10 == 0:
+                    striped.set(key, i)
+                else:
+                    striped.get(key)
+
+        locked_time = _time(lambda: _run_threads(thread_count,
+                                                 locked_worker))
+        striped_time = _time(lambda: _run_threads(thread_count,
+                                                  striped_worker))
+        total = per_thread * thread_count
+        print('{:>8} {:>18.0f} {:>18.0f}'.format(thread_count,
+                                                  total / locked_time,
+                                                  total / striped_time))
+
+
+def _percentile(numbers, percent):
+    """Return the given percentile of a list of numbers (nearest rank)."""
+    ordered = sorted(numbers)
+    rank = max(0, int(round(percent / 100 * len(ordered))) - 1)
+    return ordered[rank]
+
+
+def benchmark_hash_functions(key_count=100000):
+    """Build a chained HashTable from skewed int key sets with each hash
+    function, and report max and p99 chain length (over non-empty buckets)
+    along with how long looking up every key took."""
+    rand = random.Random(0)
+    key_sets = {
+        'sequential': list(range(key_count)),
+        'multiples of 1000': [number * 1000 for number in range(key_count)],
+        'multiples of 4096': [number * 4096 for number in range(key_count)],
+        'area code prefixes': [area * 10 ** 7 + exchange * 10 ** 4
+                               for area, exchange in
+                               ((rand.randrange(200, 1000),
+                                 rand.randrange(1000))
+                                for i in range(key_count))],
+    }
+    hash_functions = [('hash', hash), ('fibonacci_hash', fibonacci_hash),
+                      ('mix64_hash', mix64_hash),
+                      ('seeded_hash', seeded_hash(12345))]
+    print('Hash functions: {} keys per set'.format(key_count))
+    print('{:>20} {:>16} {:>6} {:>6} {:>10}'.format(
+        'keys', 'hash function', 'max', 'p99', 'lookup s'))
+    for set_name, keys in sorted(key_sets.items()):
+        for function_name, hash_function in hash_functions:
+            ht = HashTable.from_items(((key, key) for key in keys),
+                                      hash_function=hash_function)
+            lengths = [length for length in ht.chain_lengths() if length]
+            seconds = _time(lambda: ht.get_many(keys))
+            print('{:>20} {:>16} {:>6} {:>6} {:>10.3f}'.format(
+                set_name, function_name, max(lengths),
+                _percentile(lengths, 99), seconds))
+
+
+def benchmark_snapshot(key_count=200000, lookups=10000):
+    """Compare cold start from a text file (parse every line into a fresh
+    HashTable) against HashTable.open_mmap on a saved snapshot."""
+    directory = tempfile.mkdtemp()
+    text_path = os.path.join(directory, 'routes.txt')
+    snapshot_path = os.path.join(directory, 'routes.htbl')
+    keys = ['+1{}'.format(number) for number in range(key_count)]
+    with open(text_path, 'w') as text:
+        for number, key in enumerate(keys):
+            text.write('{} {}\n'.format(key, number * 0.001))
+    HashTable.from_items((key, number * 0.001)
+                         for number, key in enumerate(keys)).save(snapshot_path)
+    probes = random.Random(0).sample(keys, lookups)
+
+    def from_text():
+        with open(text_path) as text:
+            ht = HashTable.from_items((key, float(value)) for key, value
+                                      in (line.split() for line in text))
+        ht.get_many(probes)
+
+    def from_snapshot():
+        mapped = HashTable.open_mmap(snapshot_path)
+        for key in probes:
+            mapped.get(key)
+        mapped.close()
+
+    print('Snapshot: {} keys, then {} lookups'.format(key_count, lookups))
+    print('  parse text file: {:.3f}s'.format(_time(from_text)))
+    print('  open_mmap:       {:.3f}s'.format(_time(from_snapshot)))
+    os.remove(text_path)
+    os.remove(snapshot_path)
+    os.rmdir(directory)
+
+
+def benchmark_array_linkedlist(size=200000, operations=1000000):
+    """Compare memory per item, append time, queue churn (append at the
+    tail, remove from the head) and iteration time of LinkedList, LinkedList
+    with a NodePool, and ArrayLinkedList."""
+    items = list(range(size))
+    print('Array-backed linked list: {} items, {} churn operations'
+          .format(size, operations))
+    print('{:>20} {:>12} {:>10} {:>10} {:>10}'.format(
+        'list', 'bytes/item', 'append s', 'churn s', 'iterate s'))
+
+    def churn(linked_list):
+        for number in range(operations):
+            linked_list.append(number)
+            linked_list.remove_head()
+
+    for name, make in [('LinkedList', LinkedList),
+                       ('LinkedList+NodePool',
+                        lambda: LinkedList(pool=NodePool())),
+                       ('ArrayLinkedList', ArrayLinkedList)]:
+        def fill():
+            linked_list = make()
+            for item in items:
+                linked_list.append(item)
+            return linked_list
+        start = time.perf_counter()
+        linked_list, nbytes = _allocated(fill)
+        append_time = time.perf_counter() - start
+        churn_time = _time(lambda: churn(linked_list))
+        iterate_time = _time(lambda: list(linked_list))
+        print('{:>20} {:>12.1f} {:>10.3f} {:>10.3f} {:>10.3f}'.format(
+            name, nbytes / size, append_time, churn_time, iterate_time))
+
+
+def _length_by_walking(linked_list):
+    """The old LinkedList.length: count the nodes one by one."""
+    count = 0
+    node = linked_list.head
+    while node is not None:
+        count += 1
+        node = node.next
+    return count
+
+
+def benchmark_linkedlist_fuzz(operations=300000, check_every=5000,
+                              max_size=1000):
+    """Run random mixed operations on a LinkedList (with a NodePool) and an
+    ArrayLinkedList: both ends, insert_at_index and get_at_index next to the
+    last index (the index finger), delete, unlink, insert_after, move_to_front
+    and move_to_back, extend, splice, split_at (LinkedList only) and
+    remove_if. Compares against a list after every step and runs
+    check_invariants and compares all the items every check_every steps.
+    Also times length() against walking the nodes."""
+    print('Linked list fuzz: {} random operations, invariants checked every '
+          '{}'.format(operations, check_every))
+    for name, make, node_at, data_of in [
+            ('LinkedList', lambda: LinkedList(pool=NodePool()),
+             LinkedList._node_at, lambda linked_list, node: node.data),
+            ('ArrayLinkedList', ArrayLinkedList, ArrayLinkedList._slot_at,
+             lambda linked_list, slot: linked_list.data[slot])]:
+        rand = random.Random(0)
+        linked_list = make()
+        expected = []
+        # Every item is a different number, so delete finds the right one
+        counter = itertools.count()
+
+        def fuzz():
+            index = 0
+            for step in range(operations):
+                choice = rand.random()
+                size = len(expected)
+                if size > max_size:
+                    # Too big; cut off the back half
+                    if hasattr(linked_list, 'split_at'):
+                        rest = linked_list.split_at(size // 2)
+                        assert rest.items() == expected[size // 2:]
+                        rest.check_invariants()
+                        del expected[size // 2:]
+                    else:
+                        while len(expected) > size // 2:
+                            assert (linked_list.remove_tail() ==
+                                    expected.pop())
+                elif choice < 0.15:
+                    item = next(counter)
+                    linked_list.append(item)
+                    expected.append(item)
+                elif choice < 0.25:
+                    item = next(counter)
+                    linked_list.prepend(item)
+                    expected.insert(0, item)
+                elif choice < 0.35:
+                    if expected:
+                        assert linked_list.remove_head() == expected.pop(0)
+                elif choice < 0.45:
+                    if expected:
+                        assert linked_list.remove_tail() == expected.pop()
+                elif choice < 0.55:
+                    # Mostly next to the last index, so the finger gets used
+                    index = min(max(index + rand.randint(-2, 2), 0), size)
+                    item = next(counter)
+                    linked_list.insert_at_index(index, item)
+                    expected.insert(index, item)
+                    if index < size:
+                        assert (linked_list.get_at_index(index + 1) ==
+                                expected[index + 1])
+                elif not expected:
+                    continue
+                elif choice < 0.6:
+                    item = rand.choice(expected)
+                    linked_list.delete(item)
+                    expected.remove(item)
+                elif choice < 0.65:
+                    index = rand.randrange(size)
+                    linked_list.unlink(node_at(linked_list, index))
+                    del expected[index]
+                elif choice < 0.72:
+                    index = rand.randrange(size)
+                    item = next(counter)
+                    node = linked_list.insert_after(
+                        node_at(linked_list, index), item)
+                    expected.insert(index + 1, item)
+                    assert data_of(linked_list, node) == item
+                elif choice < 0.77:
+                    index = rand.randrange(size)
+                    linked_list.move_to_front(node_at(linked_list, index))
+                    expected.insert(0, expected.pop(index))
+                elif choice < 0.82:
+                    index = rand.randrange(size)
+                    linked_list.move_to_back(node_at(linked_list, index))
+                    expected.append(expected.pop(index))
+                elif choice < 0.88:
+                    items = [next(counter) for i in range(rand.randrange(5))]
+                    linked_list.extend(items)
+                    expected.extend(items)
+                elif choice < 0.94:
+                    other = make()
+                    other.extend(next(counter)
+                                 for i in range(rand.randrange(5)))
+                    expected.extend(other.items())
+                    linked_list.splice(other)
+                    assert other.length() == 0
+                    other.check_invariants()
+                elif choice < 0.97:
+                    if hasattr(linked_list, 'split_at'):
+                        index = rand.randrange(size + 1)
+                        rest = linked_list.split_at(index)
+                        assert rest.items() == expected[index:]
+                        rest.check_invariants()
+                        linked_list.check_invariants()
+                        linked_list.splice(rest)
+                else:
+                    remainder = rand.randrange(50)
+                    count = linked_list.remove_if(
+                        lambda data: data % 50 == remainder)
+                    kept = [data for data in expected
+                            if data % 50 != remainder]
+                    assert count == len(expected) - len(kept)
+                    expected[:] = kept
+                assert linked_list.length() == len(expected)
+                if step % check_every == 0:
+                    linked_list.check_invariants()
+                    assert linked_list.items() == expected
+            linked_list.check_invariants()
+            assert linked_list.items() == expected
+
+        print('{:>16}: {:.3f}s, all invariants held'.format(name,
+                                                            _time(fuzz)))
+    linked_list = LinkedList(range(100000))
+    walk_time = _time(lambda: [_length_by_walking(linked_list)
+                               for i in range(100)])
+    size_time = _time(lambda: [linked_list.length() for i in range(100)])
+    print('100 length() calls on 100000 items: walking {:.3f}s, size '
+          '{:.6f}s'.format(walk_time, size_time))
+
+
+def benchmark_linkedlist_predicates(size=200000, repeats=10):
+    """Time collecting matches in a LinkedList with a loop over the list,
+    and with find_all and count_if given a function or a plain item."""
+    linked_list = LinkedList(number % 100 for number in range(size))
+    print('LinkedList bulk matching: {} items, {} repeats'
+          .format(size, repeats))
+
+    def is_seven(data):
+        return data == 7
+
+    def python_loop():
+        matches = []
+        for item in linked_list:
+            if is_seven(item):
+                matches.append(item)
+        return matches
+
+    results = [
+        ('loop + function', python_loop),
+        ('find_all(function)', lambda: linked_list.find_all(is_seven)),
+        ('find_all(item=7)', lambda: linked_list.find_all(item=7)),
+        ('count_if(function)', lambda: linked_list.count_if(is_seven)),
+        ('count_if(item=7)', lambda: linked_list.count_if(item=7)),
+    ]
+    for name, function in results:
+        seconds = _time(lambda: [function() for i in range(repeats)])
+        print('{:>18} {:>8.3f}s'.format(name, seconds))
+
+
+def _get_at_index_from_head(linked_list, index):
+    """The old LinkedList.get_at_index: always walk from the head."""
+    node = linked_list.head
+    for i in range(index):
+        node = node.next
+    return node.data
+
+
+def benchmark_linkedlist_index(size=5000, lookups=5000):
+    """Time get_at_index over sequential, random and end-biased index
+    patterns, against always walking from the head."""
+    rand = random.Random(0)
+    linked_list = LinkedList(range(size))
+    patterns = {
+        'sequential': [i % size for i in range(lookups)],
+        'near-sequential': [min(size - 1, i + rand.randrange(3))
+                            for i in range(lookups)],
+        'random': [rand.randrange(size) for i in range(lookups)],
+        'end-biased': [size - 1 - int(rand.expovariate(0.05)) % size
+                       for i in range(lookups)],
+    }
+    print('LinkedList index access: {} items, {} lookups'
+          .format(size, lookups))
+    print('{:>16} {:>12} {:>12}'.format('pattern', 'from head s',
+                                        'nearest s'))
+    for name, indexes in sorted(patterns.items()):
+        from_head = _time(lambda: [_get_at_index_from_head(linked_list, i)
+                                   for i in indexes])
+        nearest = _time(lambda: [linked_list.get_at_index(i)
+                                 for i in indexes])
+        print('{:>16} {:>12.3f} {:>12.3f}'.format(name, from_head, nearest))
+
+
+def benchmark_unrolled_linkedlist(size=1000000):
+    """Compare memory per item, append time and full iteration time of
+    LinkedList against UnrolledLinkedList."""
+    items = list(range(size))
+    print('Unrolled linked list: {} items'.format(size))
+    print('{:>22} {:>14} {:>10} {:>10}'.format('list', 'bytes/item',
+                                               'append s', 'items() s'))
+    for name, make in [('LinkedList', LinkedList),
+                       ('UnrolledLinkedList(32)', UnrolledLinkedList)]:
+        start = time.perf_counter()
+        linked_list, nbytes = _allocated(lambda: make(items))
+        append_time = time.perf_counter() - start
+        iterate_time = _time(linked_list.items)
+        print('{:>22} {:>14.1f} {:>10.3f} {:>10.3f}'.format(
+            name, nbytes / size, append_time, iterate_time))
+
+
+def _sorted_insert(linked_list, item):
+    """Insert item into a sorted LinkedList by walking to its spot."""
+    node = linked_list.head
+    while node is not None and node.data < item:
+        node = node.next
+    if node is None:
+        linked_list.append(item)
+    else:
+        linked_list.insert_before(node, item)
+
+
+def benchmark_skiplist(size=5000, lookups=5000):
+    """Time inserting distinct random numbers in sorted order and then
+    looking them up, for a sorted LinkedList, a BinarySearchTree and a
+    SkipList."""
+    rand = random.Random(0)
+    items = rand.sample(range(size * 10), size)
+    probes = [rand.randrange(size * 10) for i in range(lookups)]
+    print('Sorted inserts: {} items, {} lookups'.format(size, lookups))
+    print('{:>18} {:>10} {:>10}'.format('container', 'insert s',
+                                        'lookup s'))
+    linked_list = LinkedList()
+    insert_time = _time(lambda: [_sorted_insert(linked_list, item)
+                                 for item in items])
+    # find walks the whole list for misses, just like a sorted walk would
+    lookup_time = _time(lambda: [linked_list.find(lambda data: data == probe)
+                                 for probe in probes])
+    print('{:>18} {:>10.3f} {:>10.3f}'.format('LinkedList', insert_time,
+                                              lookup_time))
+    for name, container in [('BinarySearchTree', BinarySearchTree()),
+                            ('SkipList', SkipList(seed=0))]:
+        insert_time = _time(lambda: [container.insert(item)
+                                     for item in items])
+        lookup_time = _time(lambda: [container.contains(probe)
+                                     for probe in probes])
+        print('{:>18} {:>10.3f} {:>10.3f}'.format(name, insert_time,
+                                                  lookup_time))
+    # Already sorted input is the worst case for an unbalanced tree (kept
+    # short since its recursive insert goes one frame deeper per item)
+    ordered = sorted(items)[:500]
+    tree_time = _time(lambda: BinarySearchTree(ordered))
+    skip_time = _time(lambda: SkipList(ordered, seed=0))
+    print('{} already sorted inserts: BinarySearchTree {:.3f}s, '
+          'SkipList {:.3f}s'.format(len(ordered), tree_time, skip_time))
+
+
+def _number_ranges(rand, ranges, range_size, scattered):
+    """Return ints like blocks of phone numbers: a few long runs of
+    consecutive numbers plus some scattered ones, out of a billion."""
+    numbers = set()
+    for i in range(ranges):
+        start = rand.randrange(10 ** 9)
+        numbers.update(range(start, start + range_size))
+    numbers.update(rand.randrange(10 ** 9) for i in range(scattered))
+    return list(numbers)
+
+
+def benchmark_roaring(ranges=20, range_size=10000, scattered=20000):
+    """Compare memory, serialized size and set algebra time of Set and
+    RoaringSet on clustered numbers spread over a billion (a BitSet of
+    those would need 125MB, so it falls back to a Set)."""
+    rand = random.Random(0)
+    first = _number_ranges(rand, ranges, range_size, scattered)
+    second = _number_ranges(rand, ranges, range_size, scattered)
+    # Share half the ranges so the intersection isn't empty
+    second.extend(first[:len(first) // 2])
+    print('Clustered numbers: {} and {} elements'.format(len(first),
+                                                         len(second)))
+    print('{:>11} {:>12} {:>9} {:>9} {:>14} {:>12}'.format(
+        'set', 'bytes/elem', 'build s', 'union s', 'intersection s',
+        'difference s'))
+    for name, make in [('Set', Set), ('RoaringSet', RoaringSet)]:
+        start = time.perf_counter()
+        (left, right), nbytes = _allocated(lambda: (make(first),
+                                                    make(second)))
+        build_time = time.perf_counter() - start
+        times = [_time(lambda: left.union(right)),
+                 _time(lambda: left.intersection(right)),
+                 _time(lambda: left.difference(right))]
+        print('{:>11} {:>12.2f} {:>9.3f} {:>9.3f} {:>14.3f} {:>12.3f}'
+              .format(name, nbytes / (len(left) + len(right)), build_time,
+                      *times))
+    roaring = RoaringSet(first)
+    data = roaring.to_bytes()
+    print('RoaringSet.to_bytes: {:.2f} bytes/elem ({} bytes in containers)'
+          .format(len(data) / len(roaring), roaring.memory_usage()))
+
+
+def _old_intersection(this_set, other_set):
+    """The old Set.intersection: walk all of other_set, then build a new
+    Set from a list."""
+    newset = []
+    for item in other_set:
+        if this_set.contains(item):
+            newset.append(item)
+    return Set(newset)
+
+
+def benchmark_set_algebra(large_sizes=(100000, 1000000), small_size=1000):
+    """Time intersecting a small Set with large ones, both ways around, with
+    the old intersection (which walked its argument) and the new one (which
+    walks whichever set is smaller). The new times shouldn't grow with the
+    large set."""
+    print('Set intersection with a {} element set'.format(small_size))
+    print('{:>10} {:>14} {:>14} {:>14} {:>14}'.format(
+        'large', 'old small&big', 'old big&small', 'new small&big',
+        'new big&small'))
+    small = Set(range(0, small_size * 2, 2))
+    for large_size in large_sizes:
+        large = Set(range(large_size))
+        times = [_time(lambda: _old_intersection(small, large)),
+                 _time(lambda: _old_intersection(large, small)),
+                 _time(lambda: small.intersection(large)),
+                 _time(lambda: large.intersection(small))]
+        print('{:>10} {:>14.4f} {:>14.4f} {:>14.4f} {:>14.4f}'.format(
+            large_size, *times))
+
+
+def benchmark_frozenset(size=100000, lookups=200000, subset_checks=20000):
+    """Time building, contains (half hits, half misses) and is_subset for a
+    Set and the FrozenSet it freezes into, and looking FrozenSets up as
+    HashTable keys, which only hashes each one once."""
+    print('Set vs FrozenSet of {} strings, {} lookups'.format(size, lookups))
+    elements = [str(number) for number in range(size)]
+    probes = [str(number * (1 if number % 2 else -1))
+              for number in range(1, lookups + 1)]
+    mutable = Set(elements)
+    build_time = _time(lambda: mutable.freeze())
+    frozen = mutable.freeze()
+    print('freeze: {:.3f}s'.format(build_time))
+    print('{:>10} {:>10} {:>14} {:>14}'.format('set', 'contains',
+                                               'subset (no)', 'subset (yes)'))
+    # Small sets that mostly aren't subsets, and one that is
+    rand = random.Random(0)
+    others = [[str(rand.randrange(2 * size)) for i in range(8)]
+              for check in range(subset_checks)]
+    inside = elements[:8]
+    for name, kind in (('Set', Set), ('FrozenSet', FrozenSet)):
+        target = mutable if kind is Set else frozen
+        contains = target.contains
+        smalls = [kind(other) for other in others]
+        small_inside = kind(inside)
+        times = [_time(lambda: [contains(probe) for probe in probes]),
+                 _time(lambda: [small.is_subset(target)
+                                for small in smalls]),
+                 _time(lambda: [small_inside.is_subset(target)
+                                for check in range(subset_checks)])]
+        print('{:>10} {:>10.3f} {:>14.3f} {:>14.3f}'.format(name, *times))
+    keys = [FrozenSet(other) for other in others[:1000]]
+    table = HashTable.from_items((key, None) for key in keys)
+    print('HashTable.get with FrozenSet keys, 100 rounds: {:.3f}s'.format(
+        _time(lambda: [table.get(key) for round in range(100)
+                       for key in keys])))
+
+
+class _DictNode(object):
+    """What linkedlist.Node looked like before it had __slots__."""
+
+    def __init__(self, data):
+        self.data = data
+        self.next = None
+        self.prev = None
+
+
+def benchmark_node_pool(operations=1000000, queue_size=100):
+    """Count node allocations and time a queue-like churn workload (append
+    at the tail, remove from the head) with and without a NodePool, and
+    measure bytes per node before and after adding __slots__."""
+    print('Node pool: {} append + remove_head pairs on a {} item list'
+          .format(operations, queue_size))
+
+    def churn(linked_list):
+        for number in range(queue_size):
+            linked_list.append(number)
+        for number in range(operations):
+            linked_list.append(number)
+            linked_list.remove_head()
+
+    plain_time = _time(lambda: churn(LinkedList()))
+    pool = NodePool()
+    pooled_time = _time(lambda: churn(LinkedList(pool=pool)))
+    print('{:>16} {:>14} {:>10}'.format('list', 'allocations', 'seconds'))
+    # Without a pool every append makes a brand new node
+    print('{:>16} {:>14} {:>10.3f}'.format('no pool', queue_size + operations,
+                                           plain_time))
+    print('{:>16} {:>14} {:>10.3f}'.format('NodePool', pool.allocated,
+                                           pooled_time))
+    count = 100000
+    dict_nodes, dict_bytes = _allocated(lambda: [_DictNode(i)
+                                                 for i in range(count)])
+    slot_nodes, slot_bytes = _allocated(lambda: [Node(i)
+                                                 for i in range(count)])
+    # Leave out the list holding them and the int payloads
+    overhead = sys.getsizeof(slot_nodes) + count * sys.getsizeof(count)
+    print('bytes per node: {:.1f} with __dict__, {:.1f} with __slots__'
+          .format((dict_bytes - overhead) / count,
+                  (slot_bytes - overhead) / count))
+
+
+BENCHMARKS = {
+    'array_linkedlist': benchmark_array_linkedlist,
+    'bitset': benchmark_bitset,
+    'bloom': benchmark_bloom,
+    'concurrent_hashtable': benchmark_concurrent_hashtable,
+    'frozenset': benchmark_frozenset,
+    'hash_functions': benchmark_hash_functions,
+    'linkedlist_fuzz': benchmark_linkedlist_fuzz,
+    'linkedlist_index': benchmark_linkedlist_index,
+    'linkedlist_predicates': benchmark_linkedlist_predicates,
+    'node_pool': benchmark_node_pool,
+    'roaring': benchmark_roaring,
+    'set_algebra': benchmark_set_algebra,
+    'skiplist': benchmark_skiplist,
+    'snapshot': benchmark_snapshot,
+    'unrolled_linkedlist': benchmark_unrolled_linkedlist,
+}
+
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or sorted(BENCHMARKS):
+        BENCHMARKS[name]()
+        print('')
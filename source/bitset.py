@@ -0,0 +1,253 @@
+#!python
+
+from hashtable import HashTable
+from set import Set
+
+# Past this many bytes, a bitmap has to earn its keep: if it needs more than
+# SPARSE_BYTES_PER_ELEMENT bytes per element, a hash set is smaller
+MIN_SPARSE_BYTES = 4096
+SPARSE_BYTES_PER_ELEMENT = 64
+
+
+if hasattr(int, 'bit_count'):  # Python 3.10+
+    _popcount = int.bit_count
+else:
+    def _popcount(number):
+        """Return the number of 1 bits in the given non-negative int."""
+        return bin(number).count('1')
+
+
+class BitSet(Set):
+    """Set of small non-negative ints, stored as one bit per possible value
+    in a bytearray: bit i of the bitmap is 1 when i is in the set. That's an
+    eighth of a byte per value instead of a hash table entry per element.
+    Union, intersection, difference and subset checks turn the bitmaps into
+    Python ints and use |, & and ^, which work on whole machine words at a
+    time in C.
+    Elements that don't fit a bitmap (anything that isn't an int, negative
+    ints, or ints so large the bitmap would be mostly empty) make this set
+    turn itself into a plain hash-backed Set, with all its elements."""
+
+    def __init__(self, elements=None):
+        """Make a bit set of the given elements, if any."""
+        self.bits = bytearray()
+        self._size = 0
+        if elements is not None:
+            self.update(elements)
+
+    def __str__(self):
+        return str(self.contents())
+
+    def __repr__(self):
+        return 'BitSet({!r})'.format(self.contents())
+
+    def __iter__(self):
+        """Yield the elements from smallest to largest, skipping empty bytes
+        without looking at their bits."""
+        for index, byte in enumerate(self.bits):
+            base = index * 8
+            while byte:
+                lowest = byte & -byte
+                yield base + lowest.bit_length() - 1
+                byte ^= lowest
+
+    def __len__(self):
+        """Number of elements, same as size()."""
+        return self._size
+
+    def contents(self):
+        return list(self)
+
+    def size(self):
+        """Find size. O(1); kept up to date as elements come and go"""
+        return self._size
+
+    def popcount(self):
+        """Count the 1 bits in the bitmap (the elements) from scratch.
+        O(n / 64) for a bitmap of n bits"""
+        return _popcount(self._number())
+
+    def memory_usage(self):
+        """Return the bytes taken by the bitmap."""
+        return len(self.bits)
+
+    def _number(self):
+        """Return the bitmap as one big int."""
+        return int.from_bytes(self.bits, 'little')
+
+    def _set_number(self, number):
+        """Replace the bitmap with the bits of the given int."""
+        self.bits = bytearray(number.to_bytes((number.bit_length() + 7) // 8,
+                                              'little'))
+        self._size = _popcount(number)
+
+    def _fits(self, element, count=1):
+        """Return True if the given element can be a bit in this bitmap
+        without making it mostly empty space, once count more elements are
+        in (the element is the biggest of them)."""
+        if type(element) is not int or element < 0:
+            return False
+        needed = element // 8 + 1
+        return (needed <= max(MIN_SPARSE_BYTES, len(self.bits)) or
+                needed <= SPARSE_BYTES_PER_ELEMENT * (self._size + count))
+
+    def _fall_back(self):
+        """Turn this object into a hash-backed Set with the same elements."""
+        elements = list(self)
+        del self.bits, self._size
+        self.__class__ = Set
+        self.data = HashTable.from_items((item, None) for item in elements)
+
+    def contains(self, element):
+        """Checks if element is inside set. O(1); one bit test"""
+        if type(element) is not int or element < 0:
+            return False
+        index = element >> 3
+        return (index < len(self.bits) and
+                self.bits[index] >> (element & 7) & 1 == 1)
+
+    def add(self, element):
+        """Adds element to set, growing the bitmap if needed.
+        O(1), or O(n / 8) when the bitmap has to grow"""
+        if not self._fits(element):
+            self._fall_back()
+            self.add(element)
+            return
+        index = element >> 3
+        if index >= len(self.bits):
+            self.bits.extend(bytes(index + 1 - len(self.bits)))
+        mask = 1 << (element & 7)
+        if not self.bits[index] & mask:
+            self.bits[index] |= mask
+            self._size += 1
+
+    def remove(self, element):
+        """Removes element from set, or raises ValueError if it's not there.
+        O(1)"""
+        if not self.contains(element):
+            raise ValueError('Element not found: {}'.format(element))
+        self.bits[element >> 3] &= ~(1 << (element & 7)) & 0xFF
+        self._size -= 1
+
+    def copy(self):
+        """Return a new bit set with the same elements. O(n / 8)"""
+        newset = BitSet()
+        newset.bits = bytearray(self.bits)
+        newset._size = self._size
+        return newset
+
+    def _from_number(self, number):
+        """Return a new bit set whose bitmap is the given int."""
+        newset = BitSet()
+        newset._set_number(number)
+        return newset
+
+    def _from_members(self, elements):
+        """Return a new bit set of the given distinct elements, all of which
+        are in this set, so they fit a bitmap as long as ours; no element
+        needs checking, and the result never has to fall back.
+        O(n / 8 + m) for m elements"""
+        bits = bytearray(len(self.bits))
+        count = 0
+        for element in elements:
+            bits[element >> 3] |= 1 << (element & 7)
+            count += 1
+        newset = BitSet()
+        newset.bits = bits.rstrip(b'\x00')
+        newset._size = count
+        return newset
+
+    def union(self, other_set):
+        """Return a new set that is a union of this set and other_set.
+        O(n / 64) for two bit sets; other sets are added one by one"""
+        if isinstance(other_set, BitSet):
+            return self._from_number(self._number() | other_set._number())
+        newset = self.copy()
+        newset.update(other_set)
+        return newset
+
+    def intersection(self, other_set):
+        """Return a new set that is an intersection of this set + other_set.
+        O(n / 64) for two bit sets, O(min(n, m)) otherwise"""
+        if isinstance(other_set, BitSet):
+            return self._from_number(self._number() & other_set._number())
+        if len(other_set) < len(self):
+            return self._from_members(item for item in other_set
+                                      if self.contains(item))
+        return self._from_members(item for item in self
+                                  if other_set.contains(item))
+
+    def difference(self, other_set):
+        """Return a new set of the elements in this set but not other_set.
+        O(n / 64) for two bit sets"""
+        if isinstance(other_set, BitSet):
+            return self._from_number(self._number() & ~other_set._number())
+        return self._from_members(item for item in self
+                                  if not other_set.contains(item))
+
+    def symmetric_difference(self, other_set):
+        """Return a new set of the elements in exactly one of the two sets.
+        O(n / 64) for two bit sets"""
+        if isinstance(other_set, BitSet):
+            return self._from_number(self._number() ^ other_set._number())
+        newset = self.copy()
+        newset.symmetric_difference_update(other_set)
+        return newset
+
+    def update(self, other_set):
+        """Add every element of other_set to this set. Whether they fit is
+        decided for all of them at once, so the order they come in doesn't
+        matter: the bitmap is grown once for the biggest, or we fall back.
+        O(m) for m elements, plus O(n / 8) if the bitmap grows"""
+        if isinstance(other_set, BitSet):
+            self._set_number(self._number() | other_set._number())
+            return
+        items = list(other_set)
+        if not items:
+            return
+        if (not all(type(item) is int and item >= 0 for item in items) or
+                not self._fits(max(items), len(items))):
+            self._fall_back()
+            Set.update(self, items)
+            return
+        needed = max(items) // 8 + 1
+        if needed > len(self.bits):
+            self.bits.extend(bytes(needed - len(self.bits)))
+        bits = self.bits
+        for item in items:
+            mask = 1 << (item & 7)
+            if not bits[item >> 3] & mask:
+                bits[item >> 3] |= mask
+                self._size += 1
+
+    def intersection_update(self, other_set):
+        """Keep only the elements that are also in other_set."""
+        result = self.intersection(other_set)
+        self.bits, self._size = result.bits, result._size
+
+    def difference_update(self, other_set):
+        """Remove every element of other_set from this set."""
+        result = self.difference(other_set)
+        self.bits, self._size = result.bits, result._size
+
+    def symmetric_difference_update(self, other_set):
+        """Keep the elements in exactly one of this set and other_set."""
+        if isinstance(other_set, BitSet):
+            self._set_number(self._number() ^ other_set._number())
+            return
+        if other_set is self:
+            self._set_number(0)
+            return
+        for item in other_set:
+            if self.contains(item):
+                self.remove(item)
+            else:
+                # add falls back to a hash set if it has to
+                self.add(item)
+
+    def is_subset(self, other_set):
+        """Return a boolean whether this set is a subset of other_set.
+        O(n / 64) for two bit sets: no bit of ours is missing from theirs"""
+        if isinstance(other_set, BitSet):
+            return self._number() & ~other_set._number() == 0
+        return Set.is_subset(self, other_set)
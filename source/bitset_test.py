@@ -0,0 +1,138 @@
+#!python
+
+from bitset import BitSet
+from set import Set
+import unittest
+
+
+class BitSetTest(unittest.TestCase):
+
+    def test_init(self):
+        test1 = BitSet([5, 1, 9, 1])
+        assert test1.size() == 3
+        assert test1.contents() == [1, 5, 9]
+        assert len(BitSet()) == 0
+        assert BitSet([]).contents() == []
+
+    def test_add_remove_contains(self):
+        test1 = BitSet()
+        test1.add(3)
+        test1.add(3)
+        test1.add(100)
+        assert test1.size() == 2
+        assert test1.contains(3) is True
+        assert test1.contains(4) is False
+        assert test1.contains(1000) is False  # past the end of the bitmap
+        assert test1.contains(-1) is False
+        assert test1.contains('3') is False
+        test1.remove(3)
+        assert test1.contains(3) is False
+        assert test1.size() == 1
+        with self.assertRaises(ValueError):
+            test1.remove(3)
+        with self.assertRaises(ValueError):
+            test1.remove('A')
+
+    def test_popcount_and_memory(self):
+        test1 = BitSet(range(0, 800, 2))
+        assert test1.popcount() == test1.size() == 400
+        # One bit per possible value, so 800 values fit in 100 bytes
+        assert test1.memory_usage() == 100
+
+    def test_set_algebra(self):
+        test1 = BitSet([1, 2, 3, 4, 5])
+        test2 = BitSet([4, 5, 6, 7, 8])
+        assert test1.union(test2).contents() == [1, 2, 3, 4, 5, 6, 7, 8]
+        assert test1.intersection(test2).contents() == [4, 5]
+        assert test1.difference(test2).contents() == [1, 2, 3]
+        assert test1.symmetric_difference(test2).contents() == [1, 2, 3, 6,
+                                                                 7, 8]
+        assert test1.difference(test1).size() == 0
+        # Inputs don't change
+        assert test1.contents() == [1, 2, 3, 4, 5]
+
+    def test_set_algebra_with_hash_sets(self):
+        test1 = BitSet([1, 2, 3, 4, 5])
+        test2 = Set([4, 5, 6])
+        assert test1.intersection(test2).contents() == [4, 5]
+        assert test1.difference(test2).contents() == [1, 2, 3]
+        assert test1.union(test2).contents() == [1, 2, 3, 4, 5, 6]
+        assert sorted(test2.intersection(test1).contents()) == [4, 5]
+
+    def test_in_place(self):
+        test1 = BitSet([1, 2, 3])
+        test1.update(BitSet([3, 4]))
+        assert test1.contents() == [1, 2, 3, 4]
+        test1.intersection_update(BitSet([2, 3, 4, 5]))
+        assert test1.contents() == [2, 3, 4]
+        test1.difference_update(Set([4]))
+        assert test1.contents() == [2, 3]
+        test1.symmetric_difference_update(BitSet([3, 9]))
+        assert test1.contents() == [2, 9]
+        assert test1.size() == 2
+        test1.symmetric_difference_update(test1)
+        assert test1.size() == 0
+
+    def test_in_place_with_big_hash_set_elements(self):
+        # Results that are sparse for their biggest element stay bit sets,
+        # since they fit the bitmap we already have
+        test1 = BitSet(range(40000))
+        test1.intersection_update(Set([39000, 50000]))
+        assert type(test1) is BitSet
+        assert test1.contents() == [39000]
+        test1 = BitSet(range(5000))
+        test1.add(100000)
+        test1.difference_update(Set(range(5000)))
+        assert type(test1) is BitSet
+        assert test1.contents() == [100000]
+        assert test1.size() == 1
+        test1 = BitSet(range(40000))
+        assert test1.intersection(Set([33000, 39999])).contents() == [
+            33000, 39999]
+        assert test1.difference(Set(range(100, 40000))).size() == 100
+
+    def test_order_doesnt_matter(self):
+        test1 = BitSet([100000] + list(range(5000)))
+        test2 = BitSet(list(range(5000)) + [100000])
+        assert type(test1) is BitSet
+        assert type(test2) is BitSet
+        assert test1.contents() == test2.contents()
+        # Too sparse whichever way around
+        assert type(BitSet([10 ** 7, 1, 2])) is Set
+        assert type(BitSet([1, 2, 10 ** 7])) is Set
+
+    def test_subset(self):
+        assert BitSet([1, 2]).is_subset(BitSet([1, 2, 3])) is True
+        assert BitSet([1, 2]).is_subset(BitSet([1, 2])) is True
+        assert BitSet([1, 4]).is_subset(BitSet([1, 2, 3])) is False
+        assert BitSet([1, 2]).is_subset(Set([1, 2, 'A'])) is True
+        assert BitSet().is_subset(BitSet()) is True
+
+    def test_falls_back_for_non_ints(self):
+        test1 = BitSet([1, 2])
+        test1.add('A')
+        assert type(test1) is Set
+        assert test1.contains('A') is True
+        assert test1.contains(2) is True
+        assert test1.size() == 3
+        test1 = BitSet([1, 'B', 2])
+        assert type(test1) is Set
+        assert test1.size() == 3
+
+    def test_falls_back_when_sparse(self):
+        # A bitmap for one billion would take 125MB for two elements
+        test1 = BitSet([1, 2])
+        test1.add(10 ** 9)
+        assert type(test1) is Set
+        assert test1.contains(10 ** 9) is True
+        test1 = BitSet([1, 2])
+        test1.add(-5)
+        assert type(test1) is Set
+        # Dense sets can keep growing a while
+        test1 = BitSet(range(10000))
+        test1.add(100000)
+        assert type(test1) is BitSet
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,274 @@
+#!python
+
+import math
+
+from hashtable import FIBONACCI_MULTIPLIER, _MASK_64, _MISSING
+
+
+class BloomFilter(object):
+    """Probabilistic set that only answers "definitely not in here" or
+    "probably in here". Each item sets hash_count bits out of bit_count, so
+    an item whose bits aren't all set was never added, while one whose bits
+    are all set was added or is a false positive (its bits were set by
+    other items). Sized for capacity items at the given error_rate, it
+    takes about 1.2 bytes per item at 1% and never stores the items."""
+
+    def __init__(self, capacity=1000, error_rate=0.01):
+        """Initialize this filter to hold capacity items with about the
+        given false positive rate. Adding more than capacity items still
+        works, but the false positive rate climbs."""
+        if capacity <= 0:
+            raise ValueError('Capacity must be positive: {}'.format(capacity))
+        if not (0 < error_rate < 1):
+            raise ValueError('Error rate must be between 0 and 1: {}'
+                             .format(error_rate))
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # The usual optimal sizes: m = -n ln p / (ln 2)^2, k = (m / n) ln 2
+        self.bit_count = max(8, int(math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(
+            self.bit_count / capacity * math.log(2))))
+        self.bits = bytearray((self.bit_count + 7) // 8)
+        self.count = 0  # Number of adds, repeats included
+
+    def __repr__(self):
+        """Return a string representation of this filter."""
+        return 'BloomFilter({} items, {} bits, {} hashes)'.format(
+            self.count, self.bit_count, self.hash_count)
+
+    def __len__(self):
+        """Return how many items were added, repeats included."""
+        return self.count
+
+    def __contains__(self, item):
+        """Return False if item was definitely never added, or True."""
+        return self.contains(item)
+
+    def _indexes(self, item):
+        """Yield the hash_count bit indexes for the given item. One 64 bit
+        hash is split in two halves, h1 and h2, and the indexes are
+        h1 + i * h2, which works as well as hash_count separate hashes.
+        The hash is a single fibonacci multiply (see fibonacci_hash); the
+        bits have to be cheap, since a lookup is supposed to be cheaper than
+        the hash table lookup it saves."""
+        code = (hash(item) * FIBONACCI_MULTIPLIER) & _MASK_64
+        first, step = code >> 32, (code & 0xFFFFFFFF) | 1
+        bit_count = self.bit_count
+        for i in range(self.hash_count):
+            yield (first + i * step) % bit_count
+
+    def add(self, item):
+        """Set the bits for the given item. O(k) for k hashes"""
+        bits = self.bits
+        for index in self._indexes(item):
+            bits[index >> 3] |= 1 << (index & 7)
+        self.count += 1
+
+    def add_many(self, items):
+        """Set the bits for every item in the given iterable.
+        O(n * k) for n items"""
+        bits = self.bits
+        indexes = self._indexes
+        count = 0
+        for item in items:
+            for index in indexes(item):
+                bits[index >> 3] |= 1 << (index & 7)
+            count += 1
+        self.count += count
+
+    def contains(self, item):
+        """Return False if item was definitely never added, or True if it
+        probably was. Does the same math as _indexes, written out so a miss
+        costs no generator.
+        Best case: O(1)
+        Worst case: O(k) for k hashes"""
+        code = (hash(item) * FIBONACCI_MULTIPLIER) & _MASK_64
+        index, step = code >> 32, (code & 0xFFFFFFFF) | 1
+        bits, bit_count = self.bits, self.bit_count
+        # Most misses stop at the first bit, so check it before the loop
+        index %= bit_count
+        if not bits[index >> 3] >> (index & 7) & 1:
+            return False
+        for i in range(1, self.hash_count):
+            index = (index + step) % bit_count
+            if not bits[index >> 3] >> (index & 7) & 1:
+                return False
+        return True
+
+    def false_positive_rate(self):
+        """Return the expected false positive rate for the items added so
+        far: (1 - e^(-kn/m))^k."""
+        return (1 - math.exp(-self.hash_count * self.count /
+                             self.bit_count)) ** self.hash_count
+
+    def memory_usage(self):
+        """Return the bytes taken by the bit array."""
+        return len(self.bits)
+
+    def bytes_per_element(self):
+        """Return bytes of bit array per item added so far."""
+        return self.memory_usage() / max(1, self.count)
+
+
+class CountingBloomFilter(BloomFilter):
+    """Bloom filter with a small counter instead of a bit per position, so
+    items can be removed again: adding increments an item's counters and
+    removing decrements them. Costs 8 times the memory of a BloomFilter.
+    Counters stop at 255; a counter that got there stays there, since we no
+    longer know how many items share it."""
+
+    def __init__(self, capacity=1000, error_rate=0.01):
+        """Initialize this filter to hold capacity items with about the
+        given false positive rate."""
+        BloomFilter.__init__(self, capacity, error_rate)
+        self.bits = None
+        self.counters = bytearray(self.bit_count)
+
+    def __repr__(self):
+        """Return a string representation of this filter."""
+        return 'CountingBloomFilter({} items, {} counters, {} hashes)'.format(
+            self.count, self.bit_count, self.hash_count)
+
+    def add(self, item):
+        """Increment the counters for the given item. O(k) for k hashes"""
+        counters = self.counters
+        for index in self._indexes(item):
+            if counters[index] < 255:
+                counters[index] += 1
+        self.count += 1
+
+    def add_many(self, items):
+        """Increment the counters for every item in the given iterable."""
+        for item in items:
+            self.add(item)
+
+    def contains(self, item):
+        """Return False if item is definitely not in here, or True if it
+        probably is. Written out like BloomFilter.contains.
+        Best case: O(1)
+        Worst case: O(k) for k hashes"""
+        code = (hash(item) * FIBONACCI_MULTIPLIER) & _MASK_64
+        index, step = code >> 32, (code & 0xFFFFFFFF) | 1
+        counters, bit_count = self.counters, self.bit_count
+        index %= bit_count
+        if not counters[index]:
+            return False
+        for i in range(1, self.hash_count):
+            index = (index + step) % bit_count
+            if not counters[index]:
+                return False
+        return True
+
+    def remove(self, item):
+        """Decrement the counters for the given item, or raise ValueError if
+        it definitely isn't in here. Only remove items that were added, or
+        other items can start getting false negatives.
+        O(k) for k hashes"""
+        if not self.contains(item):
+            raise ValueError('Item not found: {!r}'.format(item))
+        counters = self.counters
+        for index in self._indexes(item):
+            if counters[index] < 255:
+                counters[index] -= 1
+        self.count -= 1
+
+    def memory_usage(self):
+        """Return the bytes taken by the counters."""
+        return len(self.counters)
+
+
+class BloomFront(object):
+    """Wraps a Set or HashTable with a Bloom filter of its elements (or
+    keys), so lookups of things that aren't there are usually answered by
+    the filter without touching the container. Everything that adds or
+    removes has to go through here to keep the filter up to date.
+    With counting=True removals are taken out of the filter too; otherwise
+    removed keys just cost a wasted container lookup until the next rebuild.
+    Whenever the filter fills up, it's rebuilt for twice what the container
+    holds now."""
+
+    def __init__(self, container, error_rate=0.01, counting=False):
+        """Put a filter in front of the given Set or HashTable, loaded with
+        what it holds now."""
+        self.container = container
+        self.error_rate = error_rate
+        self.counting = counting
+        self.skipped = 0  # Lookups the filter answered on its own
+        self._rebuild()
+
+    def __repr__(self):
+        """Return a string representation of this front."""
+        return 'BloomFront({!r}, skipped={})'.format(self.filter,
+                                                     self.skipped)
+
+    def __len__(self):
+        return len(self.container)
+
+    def __iter__(self):
+        return iter(self.container)
+
+    def __contains__(self, key):
+        return self.contains(key)
+
+    def _rebuild(self):
+        """Replace the filter with a new one with room for twice what the
+        container holds, loaded from the container. O(n)"""
+        kind = CountingBloomFilter if self.counting else BloomFilter
+        capacity = max(1024, 2 * len(self.container))
+        self.filter = kind(capacity, self.error_rate)
+        self.filter.add_many(self.container)
+
+    def _added(self, key):
+        """Put a key the container just gained into the filter."""
+        self.filter.add(key)
+        if self.filter.count > self.filter.capacity:
+            self._rebuild()
+
+    def contains(self, key):
+        """Return True if the container has key. Misses usually stop at the
+        filter."""
+        if not self.filter.contains(key):
+            self.skipped += 1
+            return False
+        return self.container.contains(key)
+
+    def get(self, key, default=_MISSING):
+        """Return the value for key in a HashTable container. If it's
+        missing, return default if one was given, or else raise KeyError."""
+        if not self.filter.contains(key):
+            self.skipped += 1
+            if default is _MISSING:
+                raise KeyError('Key not found: {}'.format(key))
+            return default
+        # _MISSING is the hash table's own sentinel, so it passes through
+        return self.container.get(key, default)
+
+    def add(self, element):
+        """Add element to a Set container."""
+        # Elements already in there are already in the filter, and adding
+        # them again would only fill it up (or overcount, if counting)
+        if self.container.contains(element):
+            return
+        self.container.add(element)
+        self._added(element)
+
+    def set(self, key, value):
+        """Insert or update key in a HashTable container."""
+        # Updating a key already in the filter leaves the filter alone
+        new = not self.container.contains(key)
+        self.container.set(key, value)
+        if new:
+            self._added(key)
+
+    def remove(self, element):
+        """Remove element from a Set container (ValueError if missing)."""
+        self.container.remove(element)
+        if self.counting:
+            self.filter.remove(element)
+
+    def delete(self, key):
+        """Delete key from a HashTable container (KeyError if missing)."""
+        self.container.delete(key)
+        if self.counting:
+            self.filter.remove(key)
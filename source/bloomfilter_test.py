@@ -0,0 +1,119 @@
+#!python
+
+from bloomfilter import BloomFilter, CountingBloomFilter, BloomFront
+from hashtable import HashTable
+from set import Set
+import unittest
+
+
+class BloomFilterTest(unittest.TestCase):
+
+    def test_sizing(self):
+        bloom = BloomFilter(1000, 0.01)
+        # About 9.6 bits and 7 hashes per item for 1%
+        assert 9500 <= bloom.bit_count <= 9600
+        assert bloom.hash_count == 7
+        assert bloom.memory_usage() == (bloom.bit_count + 7) // 8
+        with self.assertRaises(ValueError):
+            BloomFilter(0)
+        with self.assertRaises(ValueError):
+            BloomFilter(100, 1.5)
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000, 0.01)
+        for number in range(1000):
+            bloom.add(number)
+        assert len(bloom) == 1000
+        assert all(bloom.contains(number) for number in range(1000))
+        assert 'A' not in BloomFilter()
+
+    def test_false_positive_rate(self):
+        bloom = BloomFilter(10000, 0.01)
+        bloom.add_many('key{}'.format(i) for i in range(10000))
+        false_positives = sum(bloom.contains('other{}'.format(i))
+                              for i in range(10000))
+        # About 100 expected; leave plenty of room for chance
+        assert false_positives < 250
+        assert 0.005 < bloom.false_positive_rate() < 0.02
+        assert 1.1 < bloom.bytes_per_element() < 1.3
+
+
+class CountingBloomFilterTest(unittest.TestCase):
+
+    def test_add_and_remove(self):
+        bloom = CountingBloomFilter(100, 0.01)
+        bloom.add_many(['A', 'B', 'C'])
+        assert bloom.contains('A') is True
+        bloom.remove('A')
+        assert bloom.contains('A') is False
+        assert bloom.contains('B') is True
+        assert len(bloom) == 2
+        with self.assertRaises(ValueError):
+            bloom.remove('A')
+        # One byte per counter
+        assert bloom.memory_usage() == bloom.bit_count
+
+    def test_saturated_counters_stay(self):
+        bloom = CountingBloomFilter(100, 0.01)
+        for i in range(300):
+            bloom.add('A')
+        for i in range(300):
+            bloom.remove('A')
+        # Counters stuck at 255 can't be trusted to go back to zero
+        assert bloom.contains('A') is True
+
+
+class BloomFrontTest(unittest.TestCase):
+
+    def test_set_front(self):
+        front = BloomFront(Set(['A', 'B']))
+        assert front.contains('A') is True
+        assert 'Z' not in front
+        assert front.skipped >= 1
+        front.add('C')
+        assert front.contains('C') is True
+        front.remove('C')
+        assert front.contains('C') is False
+        assert len(front) == 2
+
+    def test_hashtable_front(self):
+        table = HashTable.from_items([('A', 1), ('B', 2)])
+        front = BloomFront(table, counting=True)
+        assert front.get('A') == 1
+        assert front.get('Z', 0) == 0
+        with self.assertRaises(KeyError):
+            front.get('Z')
+        front.set('C', 3)
+        front.set('C', 4)
+        assert front.get('C') == 4
+        front.delete('C')
+        assert front.filter.contains('C') is False
+        assert front.contains('C') is False
+        with self.assertRaises(KeyError):
+            front.delete('C')
+
+    def test_rebuilds_when_full(self):
+        front = BloomFront(Set())
+        capacity = front.filter.capacity
+        for number in range(capacity + 1):
+            front.add(number)
+        assert front.filter.capacity == 2 * len(front)
+        assert all(front.contains(number) for number in range(capacity + 1))
+
+    def test_updates_dont_grow_filter(self):
+        table = HashTable.from_items((key, 0) for key in range(1000))
+        front = BloomFront(table)
+        capacity = front.filter.capacity
+        for step in range(20000):
+            front.set(step % 1000, step)
+        assert front.filter.capacity == capacity
+        assert front.get(999) == 19999
+        front = BloomFront(Set(range(1000)))
+        for step in range(5000):
+            front.add(step % 1000)
+        assert front.filter.capacity == capacity
+        assert front.filter.count == 1000
+
+
+if __name__ == '__main__':
+    unittest.main()
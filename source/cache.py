@@ -0,0 +1,220 @@
+#!python
+
+import functools
+import sys
+from hashtable import HashTable, _MISSING
+from linkedlist import LinkedList
+
+
+class LRUCache(object):
+    """Least recently used cache. A HashTable maps each key to its node in
+    a LinkedList kept in use order (most recent at the head), so lookups,
+    inserts and evicting the oldest entry from the tail are all O(1)."""
+
+    def __init__(self, max_entries=128, max_bytes=None, sizeof=sys.getsizeof):
+        """Initialize this cache. It holds at most max_entries entries and,
+        if max_bytes is given, at most that many bytes of values as measured
+        by sizeof (which only sees the value object itself by default)."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.table = HashTable()  # key -> node in self.order
+        self.order = LinkedList()  # (key, value, bytes) entries
+        self.bytes = 0  # Bytes of values currently cached
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self):
+        """Return a string representation of this cache."""
+        return '{}({} entries, hits={}, misses={}, evictions={})'.format(
+            type(self).__name__, self.length(), self.hits, self.misses,
+            self.evictions)
+
+    def __len__(self):
+        """Return the number of cached entries."""
+        return self.length()
+
+    def __contains__(self, key):
+        """Return True if the given key is cached, or False."""
+        return self.contains(key)
+
+    def length(self):
+        """Return the number of cached entries."""
+        return self.table.size
+
+    def contains(self, key):
+        """Return True if the given key is cached, or False. Doesn't count
+        as a use of the key, or as a hit or miss."""
+        return self.table.contains(key)
+
+    def stats(self):
+        """Return a dict with the hit, miss and eviction counts."""
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'entries': self.length(),
+                'bytes': self.bytes}
+
+    def get(self, key, default=None):
+        """Return the cached value for the given key and mark it as just
+        used, or return default if it isn't cached.
+        Running time: O(1)"""
+        node = self.table.get(key, None)
+        if node is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._touch(key, node)
+        return node.data[1]
+
+    def set(self, key, value):
+        """Cache the given value for the given key, first evicting the least
+        recently used entries until it fits within the limits. A value
+        bigger than max_bytes on its own is never cached.
+        Running time: O(1), plus O(1) per evicted entry"""
+        nbytes = self.sizeof(value) if self.max_bytes is not None else 0
+        old_node = self.table.get(key, None)
+        if old_node is not None:
+            self._remove(old_node)
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            # Too big to ever fit; evicting others for it would be no use
+            self.evictions += 1
+            return
+        # Make room first, so the new entry is never the one evicted
+        self._evict(1, nbytes)
+        self._add(key, value, nbytes, old_node)
+
+    def delete(self, key):
+        """Remove the given key from this cache, or raise KeyError."""
+        self._remove(self.table.get(key))
+
+    def clear(self):
+        """Remove every entry (the counters are kept)."""
+        self.table = HashTable()
+        self.order = LinkedList()
+        self.bytes = 0
+
+    def _add(self, key, value, nbytes, old_node=None):
+        """Add an entry as the most recently used one. old_node is the
+        key's previous entry, if it had one."""
+        self.order.prepend((key, value, nbytes))
+        self.table.set(key, self.order.head)
+        self.bytes += nbytes
+
+    def _remove(self, node):
+        """Remove the given entry's node from the list and the table."""
+        key, value, nbytes = node.data
+        self.order.unlink(node)
+        self.table.delete(key)
+        self.bytes -= nbytes
+
+    def _touch(self, key, node):
+        """Move the given key's entry to the front of the use order. The
+        node itself moves, so the table still points at the right one."""
+        self.order.move_to_front(node)
+
+    def _over_limit(self, entries, nbytes):
+        """Return True if adding the given number of entries and bytes would
+        put us over the limits."""
+        if self.table.size + entries > self.max_entries:
+            return True
+        return (self.max_bytes is not None and
+                self.bytes + nbytes > self.max_bytes)
+
+    def _evict(self, entries=0, nbytes=0):
+        """Drop least recently used entries until the given number of
+        entries and bytes would fit within the limits."""
+        while self.table.size > 0 and self._over_limit(entries, nbytes):
+            self._remove(self.order.tail)
+            self.evictions += 1
+
+
+class LFUCache(LRUCache):
+    """Least frequently used cache. Entries are grouped into one LinkedList
+    per use count, each ordered most recent first, so the entry evicted is
+    the least recently used of the least frequently used ones. Every
+    operation is still O(1)."""
+
+    def __init__(self, max_entries=128, max_bytes=None, sizeof=sys.getsizeof):
+        """Initialize this cache; see LRUCache for the limits."""
+        LRUCache.__init__(self, max_entries, max_bytes, sizeof)
+        self.order = None  # Unused; entries live in self.frequencies
+        self.frequencies = HashTable()  # use count -> LinkedList
+        self.min_frequency = 0  # Lowest use count of any cached entry
+
+    def clear(self):
+        """Remove every entry (the counters are kept)."""
+        LRUCache.clear(self)
+        self.order = None
+        self.frequencies = HashTable()
+        self.min_frequency = 0
+
+    def _add(self, key, value, nbytes, old_node=None):
+        """Add an entry at the front of its use count's list. A key that
+        was already cached (in old_node) moves up to the next use count."""
+        frequency = 1 if old_node is None else old_node.data[3] + 1
+        entries = self.frequencies.get(frequency, None)
+        if entries is None:
+            entries = LinkedList()
+            self.frequencies.set(frequency, entries)
+        entries.prepend((key, value, nbytes, frequency))
+        self.table.set(key, entries.head)
+        self.bytes += nbytes
+        if frequency == 1 or frequency < self.min_frequency:
+            self.min_frequency = frequency
+
+    def _remove(self, node):
+        """Remove the given entry's node from its list and the table."""
+        key, value, nbytes, frequency = node.data
+        entries = self.frequencies.get(frequency)
+        entries.unlink(node)
+        if entries.is_empty():
+            self.frequencies.delete(frequency)
+            if self.min_frequency == frequency:
+                # Right for _touch and set, which re-add the entry at
+                # frequency + 1; after a delete _evict may have to look
+                self.min_frequency = frequency + 1
+        self.table.delete(key)
+        self.bytes -= nbytes
+
+    def _touch(self, key, node):
+        """Move the given key's entry up to the next use count's list."""
+        self._remove(node)
+        self._add(key, node.data[1], node.data[2], node)
+
+    def _evict(self, entries=0, nbytes=0):
+        """Drop least frequently used entries until the given number of
+        entries and bytes would fit within the limits."""
+        while self.table.size > 0 and self._over_limit(entries, nbytes):
+            lowest = self.frequencies.get(self.min_frequency, None)
+            if lowest is None:
+                # Stale after a delete; only then do we scan the use counts
+                self.min_frequency = min(self.frequencies.keys())
+                lowest = self.frequencies.get(self.min_frequency)
+            self._remove(lowest.tail)
+            self.evictions += 1
+
+
+def memoize(max_entries=128, max_bytes=None, cache_class=LRUCache):
+    """Return a decorator caching a function's results by its arguments
+    (which must be hashable). The cache is kept on the wrapped function as
+    its .cache attribute, for looking at its hit and miss counts."""
+    def decorator(function):
+        cache = cache_class(max_entries, max_bytes)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            key = args
+            if kwargs:
+                key = args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+            result = cache.get(key, _MISSING)
+            if result is _MISSING:
+                result = function(*args, **kwargs)
+                cache.set(key, result)
+            return result
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+# Separates positional from keyword arguments in memoize keys
+_KWARGS_MARK = ('memoize kwargs',)
@@ -0,0 +1,139 @@
+#!python
+
+from cache import LRUCache, LFUCache, memoize
+import unittest
+
+
+class LRUCacheTest(unittest.TestCase):
+
+    def test_get_and_set(self):
+        cache = LRUCache(max_entries=2)
+        cache.set('A', 1)
+        cache.set('B', 2)
+        assert cache.get('A') == 1
+        assert cache.get('C') is None
+        assert cache.get('C', 0) == 0
+        assert 'B' in cache
+        assert len(cache) == 2
+        assert cache.hits == 1
+        assert cache.misses == 2
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.set('A', 1)
+        cache.set('B', 2)
+        cache.get('A')  # B is now the least recently used
+        cache.set('C', 3)
+        assert cache.contains('B') is False
+        assert cache.contains('A') is True
+        assert cache.contains('C') is True
+        assert cache.evictions == 1
+        cache.set('A', 10)  # Updating counts as a use too
+        cache.set('D', 4)
+        assert cache.contains('C') is False
+        assert cache.get('A') == 10
+
+    def test_max_bytes(self):
+        cache = LRUCache(max_entries=100, max_bytes=10, sizeof=len)
+        cache.set('A', 'xxxx')
+        cache.set('B', 'xxxx')
+        assert cache.bytes == 8
+        cache.set('C', 'xxxx')  # 12 bytes; A has to go
+        assert cache.contains('A') is False
+        assert cache.bytes == 8
+        cache.set('D', 'x' * 11)  # Too big to ever fit; the rest stay
+        assert cache.contains('D') is False
+        assert cache.get('B') == 'xxxx'
+        assert cache.get('C') == 'xxxx'
+        assert cache.bytes == 8
+        assert cache.evictions == 2
+        cache.set('B', 'x' * 11)  # The old B goes too, since it's stale
+        assert cache.contains('B') is False
+        assert cache.contains('C') is True
+
+    def test_delete_and_clear(self):
+        cache = LRUCache()
+        cache.set('A', 1)
+        cache.set('B', 2)
+        cache.delete('A')
+        assert cache.contains('A') is False
+        with self.assertRaises(KeyError):
+            cache.delete('A')
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()['entries'] == 0
+
+
+class LFUCacheTest(unittest.TestCase):
+
+    def test_evicts_least_frequently_used(self):
+        cache = LFUCache(max_entries=2)
+        cache.set('A', 1)
+        cache.set('B', 2)
+        cache.get('A')
+        cache.get('A')
+        cache.get('B')
+        cache.set('C', 3)  # B was used less than A
+        assert cache.contains('B') is False
+        assert cache.get('A') == 1
+        cache.set('D', 4)  # C and D tie; C is older
+        assert cache.contains('C') is False
+        assert cache.contains('D') is True
+
+    def test_delete_then_evict(self):
+        cache = LFUCache(max_entries=2)
+        cache.set('A', 1)
+        cache.set('B', 2)
+        cache.get('B')
+        cache.delete('A')
+        cache.set('C', 3)
+        cache.get('C')
+        cache.get('C')
+        cache.set('D', 4)  # B has 2 uses, C has 3
+        assert cache.contains('B') is False
+        assert cache.contains('C') is True
+        assert cache.length() == 2
+
+    def test_too_big_keeps_others(self):
+        cache = LFUCache(max_entries=10, max_bytes=10, sizeof=len)
+        cache.set('A', 'xxxx')
+        cache.set('B', 'xxxx')
+        cache.set('C', 'x' * 11)
+        assert cache.contains('C') is False
+        assert cache.length() == 2
+        assert cache.evictions == 1
+
+
+class MemoizeTest(unittest.TestCase):
+
+    def test_memoize(self):
+        calls = []
+
+        @memoize(max_entries=10)
+        def route_cost(source, destination, discount=0):
+            calls.append((source, destination))
+            return len(source) + len(destination) - discount
+
+        assert route_cost('SFO', 'JFK') == 6
+        assert route_cost('SFO', 'JFK') == 6
+        assert route_cost('SFO', 'JFK', discount=1) == 5
+        assert len(calls) == 2
+        assert route_cost.cache.hits == 1
+        assert route_cost.cache.misses == 2
+        assert route_cost.__name__ == 'route_cost'
+
+    def test_memoize_none_results(self):
+        calls = []
+
+        @memoize(cache_class=LFUCache)
+        def nothing(number):
+            calls.append(number)
+            return None
+
+        nothing(1)
+        nothing(1)
+        assert calls == [1]
+
+
+if __name__ == '__main__':
+    unittest.main()
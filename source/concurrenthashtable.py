@@ -0,0 +1,121 @@
+#!python
+
+import threading
+from hashtable import HashTable, _MISSING
+
+
+class ConcurrentHashTable(object):
+    """Hash table that's safe to share between threads. Keys are split by
+    hash code across a fixed number of stripes; each stripe is its own
+    HashTable with its own lock, so threads working on different stripes
+    never wait for each other.
+
+    Stripes use incremental resizing, so when one grows, every operation
+    on it moves just a few buckets. Nobody waits for a whole rehash, and
+    the other stripes aren't blocked at all."""
+
+    def __init__(self, init_size=64, stripes=17, hash_function=hash):
+        """Initialize this hash table with about init_size buckets in total,
+        split across the given number of stripes. A prime stripe count keeps
+        keys spread out inside each stripe's power of two bucket list.
+        hash_function is used for picking stripes and inside each one."""
+        stripe_size = max(1, init_size // stripes)
+        self.hash_function = hash_function
+        self.stripes = [HashTable(stripe_size, incremental=True,
+                                  hash_function=hash_function)
+                        for i in range(stripes)]
+        self.locks = [threading.Lock() for i in range(stripes)]
+
+    def __repr__(self):
+        """Return a string representation of this hash table."""
+        return 'ConcurrentHashTable({!r})'.format(self.items())
+
+    def _stripe_index(self, key):
+        """Return the index of the stripe (and lock) the given key uses."""
+        return self.hash_function(key) % len(self.stripes)
+
+    @property
+    def size(self):
+        """Number of key-value entries, added up across the stripes. Other
+        threads may change it while we count, so it's a best guess."""
+        return sum(stripe.size for stripe in self.stripes)
+
+    def length(self):
+        """Return the number of key-value entries."""
+        return self.size
+
+    def __len__(self):
+        """Return the number of key-value entries."""
+        return self.size
+
+    def __contains__(self, key):
+        """Return True if this hash table contains the given key, or False."""
+        return self.contains(key)
+
+    def __getitem__(self, key):
+        """Return the value associated with the given key, or raise KeyError."""
+        return self.get(key)
+
+    def __setitem__(self, key, value):
+        """Insert or update the given key with its associated value."""
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        """Delete the given key and its associated value, or raise KeyError."""
+        self.delete(key)
+
+    def contains(self, key):
+        """Return True if this hash table contains the given key, or False.
+        Only locks the key's stripe."""
+        index = self._stripe_index(key)
+        with self.locks[index]:
+            return self.stripes[index].contains(key)
+
+    def get(self, key, default=_MISSING):
+        """Return the value associated with the given key. If it's missing,
+        return default if one was given, or else raise KeyError."""
+        index = self._stripe_index(key)
+        with self.locks[index]:
+            return self.stripes[index].get(key, default)
+
+    def set(self, key, value):
+        """Insert or update the given key with its associated value."""
+        index = self._stripe_index(key)
+        with self.locks[index]:
+            self.stripes[index].set(key, value)
+
+    def setdefault(self, key, default=None):
+        """Return the value of the given key if it's here; otherwise insert
+        it with the given default and return that, as one atomic step."""
+        index = self._stripe_index(key)
+        with self.locks[index]:
+            return self.stripes[index].setdefault(key, default)
+
+    def pop(self, key, default=_MISSING):
+        """Remove the given key and return its value. If it's missing,
+        return default if one was given, or else raise KeyError."""
+        index = self._stripe_index(key)
+        with self.locks[index]:
+            return self.stripes[index].pop(key, default)
+
+    def delete(self, key):
+        """Delete the given key and its associated value, or raise KeyError."""
+        self.pop(key)
+
+    def items(self):
+        """Return a list of all entries (key-value pairs). Each stripe is
+        copied under its own lock, one at a time, so this never blocks the
+        whole table; entries changed meanwhile may or may not show up."""
+        all_items = []
+        for index, stripe in enumerate(self.stripes):
+            with self.locks[index]:
+                all_items.extend(stripe.iter_items())
+        return all_items
+
+    def keys(self):
+        """Return a list of all keys; see items."""
+        return [key for key, value in self.items()]
+
+    def values(self):
+        """Return a list of all values; see items."""
+        return [value for key, value in self.items()]
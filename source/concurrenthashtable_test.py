@@ -0,0 +1,67 @@
+#!python
+
+from concurrenthashtable import ConcurrentHashTable
+import threading
+import unittest
+
+
+class ConcurrentHashTableTest(unittest.TestCase):
+
+    def test_set_get_and_delete(self):
+        ht = ConcurrentHashTable()
+        ht.set('I', 1)
+        ht['V'] = 5
+        ht.set('V', 4)  # Update value
+        assert ht.get('I') == 1
+        assert ht['V'] == 4
+        assert ht.get('X', None) is None
+        assert 'I' in ht
+        assert len(ht) == 2
+        self.assertCountEqual(ht.items(), [('I', 1), ('V', 4)])
+        assert ht.setdefault('I', 2) == 1
+        assert ht.pop('I') == 1
+        ht.delete('V')
+        assert ht.size == 0
+        with self.assertRaises(KeyError):
+            ht.get('V')  # Key no longer exists
+
+    def test_threads(self):
+        ht = ConcurrentHashTable(init_size=4)
+
+        def worker(offset):
+            for number in range(offset, offset + 2000):
+                ht.set(number, number)
+                assert ht.get(number) == number
+            for number in range(offset, offset + 2000, 2):
+                ht.delete(number)
+
+        threads = [threading.Thread(target=worker, args=(offset,))
+                   for offset in range(0, 8000, 2000)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert ht.size == 4000
+        self.assertCountEqual(ht.keys(), range(1, 8000, 2))
+
+    def test_setdefault_is_atomic(self):
+        ht = ConcurrentHashTable()
+        winners = []
+
+        def worker(name):
+            for number in range(500):
+                if ht.setdefault(number, name) == name:
+                    winners.append(number)
+
+        threads = [threading.Thread(target=worker, args=(name,))
+                   for name in 'ABCD']
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Each key was claimed by exactly one thread
+        assert sorted(winners) == list(range(500))
+
+
+if __name__ == '__main__':
+    unittest.main()
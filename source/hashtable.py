@@ -1,18 +1,109 @@
 #!python
 
+import hashlib
+import mmap
+import os
+import struct
+import sys
 from linkedlist import LinkedList
 
+# Returned by _lookup when a key is missing (None is a valid value)
+_MISSING = object()
+
+# 2**64 divided by the golden ratio, rounded to an odd number
+FIBONACCI_MULTIPLIER = 11400714819323198485
+_MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+
+def fibonacci_hash(key):
+    """Return hash(key) scrambled by fibonacci (multiplicative) hashing.
+    Integer keys hash to themselves, so keys that share their low bits
+    (like prefixes that are all multiples of 1000) all land in the same few
+    buckets; multiplying spreads every input bit into the high bits of the
+    product, and folding those back down lets a bucket mask see them."""
+    product = (hash(key) * FIBONACCI_MULTIPLIER) & _MASK_64
+    return product ^ (product >> 32)
+
+
+def mix64_hash(key):
+    """Return hash(key) run through a 64 bit finalizer (from MurmurHash3),
+    where every input bit flips about half the output bits. A bit slower
+    than fibonacci_hash but spreads keys out more evenly."""
+    return _mix64(hash(key) & _MASK_64)
+
+
+def seeded_hash(seed=None):
+    """Return a hash function mixing a secret seed into every hash code, so
+    someone picking keys can't predict which ones collide. Strings are
+    already randomized by Python, but ints and tuples of ints aren't.
+    A random seed is used if none is given."""
+    if seed is None:
+        seed = int.from_bytes(os.urandom(8), 'little')
+    seed &= _MASK_64
+
+    def hash_function(key):
+        return _mix64((hash(key) & _MASK_64) ^ seed)
+    return hash_function
+
+
+def _mix64(code):
+    """Scramble a 64 bit int (the MurmurHash3 fmix64 finalizer)."""
+    code ^= code >> 33
+    code = (code * 0xFF51AFD7ED558CCD) & _MASK_64
+    code ^= code >> 33
+    code = (code * 0xC4CEB9FE1A85EC53) & _MASK_64
+    return code ^ (code >> 33)
+
+
+def _index(hash_code, bucket_count):
+    """Return the bucket index for the given hash code. Power of two bucket
+    counts (which is all of them unless init_size says otherwise) get a
+    cheap bit mask instead of a modulo; the result is the same either way."""
+    if bucket_count & (bucket_count - 1) == 0:
+        return hash_code & (bucket_count - 1)
+    return hash_code % bucket_count
 
 class HashTable(object):
 
-    def __init__(self, init_size=8):
-        """Initialize this hash table with the given initial size."""
+    def __new__(cls, init_size=8, storage='chained', *args, **kwargs):
+        """Create a hash table using the given storage engine.
+        'chained' keeps a LinkedList of entries per bucket (the default),
+        'linear' uses open addressing over flat parallel lists,
+        'compact' chains small slotted Entry records off each bucket.
+        Every engine takes (init_size, storage, incremental, hash_function),
+        positionally or by keyword; incremental=True only works with
+        'chained' storage."""
+        # Only dispatch when called as HashTable(...); subclasses build as-is
+        if cls is HashTable and storage != 'chained':
+            if storage not in STORAGE_ENGINES:
+                raise ValueError('Unknown storage engine: {}'.format(storage))
+            cls = STORAGE_ENGINES[storage]
+        return object.__new__(cls)
+
+    def __init__(self, init_size=8, storage='chained', incremental=False,
+                 hash_function=hash):
+        """Initialize this hash table with the given initial size.
+        With incremental=True a resize moves a few buckets per operation
+        instead of rehashing every entry in one go. hash_function turns a
+        key into an int hash code; see fibonacci_hash and seeded_hash for
+        ones that spread out patterned int keys better than hash does."""
         self.buckets = [LinkedList() for i in range(init_size)]
+        self.hash_function = hash_function
         self.size = 0  # Number of key-value entries
+        # Bumped on every structural change so iterators can fail fast
+        self._version = 0
+        self.incremental = incremental
+        # Buckets still waiting to be moved during an incremental resize
+        self._old_buckets = None
+        self._migrated = 0  # Old buckets before this index are moved over
+        # Running iterators; buckets aren't moved while there are any, so
+        # reading the table during a loop over it is fine
+        self._iterators = 0
 
     def __str__(self):
         """Return a formatted string representation of this hash table."""
-        items = ['{!r}: {!r}'.format(key, val) for key, val in self.items()]
+        items = ['{!r}: {!r}'.format(key, val)
+                 for key, val in self.iter_items()]
         return '{' + ', '.join(items) + '}'
 
     def __repr__(self):
@@ -21,43 +112,105 @@ class HashTable(object):
 
     def _bucket_index(self, key):
         """Return the bucket index where the given key would be stored."""
-        return hash(key) % len(self.buckets)
+        return _index(self.hash_function(key), len(self.buckets))
+
+    def _find_bucket(self, key, hash_code):
+        """Return the bucket the given key lives in (or would be added to).
+        During an incremental resize that's still the old bucket if it
+        hasn't been moved over yet."""
+        if self._old_buckets is not None:
+            old_index = _index(hash_code, len(self._old_buckets))
+            if old_index >= self._migrated:
+                return self._old_buckets[old_index]
+        return self.buckets[_index(hash_code, len(self.buckets))]
+
+    def _live_buckets(self):
+        """Return every bucket that can currently hold entries."""
+        if self._old_buckets is None:
+            return self.buckets
+        return self.buckets + self._old_buckets[self._migrated:]
+
+    def _slot_count(self):
+        """Return how many buckets (or slots) this table currently has."""
+        return len(self.buckets)
 
     def load_factor(self):
         """Return the load factor, the ratio of number of entries to buckets.
         Best and worst case running time: ??? under what conditions? [TODO]"""
         # TODO: Calculate load factor
         # print(self.size / len(self.buckets))
-        return self.size / len(self.buckets)
+        return self.size / self._slot_count()
+
+    def __iter__(self):
+        """Return an iterator over the keys of this hash table."""
+        return self.iter_keys()
+
+    def __len__(self):
+        """Return the number of key-value entries."""
+        return self.size
+
+    def __contains__(self, key):
+        """Return True if this hash table contains the given key, or False."""
+        return self.contains(key)
+
+    def __getitem__(self, key):
+        """Return the value associated with the given key, or raise KeyError."""
+        return self.get(key)
+
+    def __setitem__(self, key, value):
+        """Insert or update the given key with its associated value."""
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        """Delete the given key and its associated value, or raise KeyError."""
+        self.delete(key)
+
+    def _check_version(self, version):
+        """Raise RuntimeError if this table changed since version was read."""
+        if self._version != version:
+            raise RuntimeError('HashTable changed during iteration')
+
+    def iter_items(self):
+        """Yield each entry (key-value pair) in this hash table, one bucket
+        at a time, without building a list of them all. Raises RuntimeError
+        if the table is added to, deleted from or resized in the meantime.
+        Lookups are fine: an incremental resize stops moving buckets until
+        every iterator is done (or thrown away).
+        Running time: O(1) per entry, O(n + b) for b buckets in total"""
+        version = self._version
+        self._iterators += 1
+        try:
+            for bucket in self._live_buckets():
+                for key, value, hash_code in bucket:
+                    yield key, value
+                    self._check_version(version)
+        finally:
+            self._iterators -= 1
+
+    def iter_keys(self):
+        """Yield each key in this hash table; see iter_items."""
+        for key, value in self.iter_items():
+            yield key
+
+    def iter_values(self):
+        """Yield each value in this hash table; see iter_items."""
+        for key, value in self.iter_items():
+            yield value
 
     def keys(self):
         """Return a list of all keys in this hash table.
-        Best and worst case running time: ??? under what conditions? [TODO]"""
-        # Collect all keys in each of the buckets
-        all_keys = []
-        for bucket in self.buckets:
-            for key, value in bucket.items():
-                all_keys.append(key)
-        return all_keys
+        Best and worst case running time: O(n + b) for b buckets"""
+        return list(self.iter_keys())
 
     def values(self):
         """Return a list of all values in this hash table.
-        Best and worst case running time: ??? under what conditions? [TODO]"""
-        # Collect all values in each of the buckets
-        all_values = []
-        for bucket in self.buckets:
-            for key, value in bucket.items():
-                all_values.append(value)
-        return all_values
+        Best and worst case running time: O(n + b) for b buckets"""
+        return list(self.iter_values())
 
     def items(self):
         """Return a list of all entries (key-value pairs) in this hash table.
-        Best and worst case running time: ??? under what conditions? [TODO]"""
-        # Collect all pairs of key-value entries in each of the buckets
-        all_items = []
-        for bucket in self.buckets:
-            all_items.extend(bucket.items())
-        return all_items
+        Best and worst case running time: O(n + b) for b buckets"""
+        return list(self.iter_items())
 
     def length(self):
         """Return the number of key-value entries by traversing its buckets.
@@ -75,72 +228,189 @@ class HashTable(object):
         """Return True if this hash table contains the given key, or False.
         Best case running time: 0(1) at near head
         Worst case running time: O(n) at tail"""
-        # Find the bucket the given key belongs in
-        index = self._bucket_index(key)
-        bucket = self.buckets[index]
-        # Check if an entry with the given key exists in that bucket
-        entry = bucket.find(lambda key_value: key_value[0] == key)
-        return entry is not None  # True or False
-
-    def get(self, key):
-        """Return the value associated with the given key, or raise KeyError.
-        Best case running time: ??? under what conditions? [TODO]
-        Worst case running time: ??? under what conditions? [TODO]"""
-        # Find the bucket the given key belongs in
-        index = self._bucket_index(key)
-        bucket = self.buckets[index]
-        # Find the entry with the given key in that bucket, if one exists
-        entry = bucket.find(lambda key_value: key_value[0] == key)
-        if entry is not None:  # Found
+        self._rehash_step()
+        # Check if an entry with the given key exists in its bucket
+        return self._lookup(key, self.hash_function(key)) is not _MISSING  # True or False
+
+    def get(self, key, default=_MISSING):
+        """Return the value associated with the given key. If it's missing,
+        return default if one was given, or else raise KeyError.
+        Best case running time: O(1) if the key is near its bucket's head
+        Worst case running time: O(k) for k entries in the key's bucket"""
+        self._rehash_step()
+        value = self._lookup(key, self.hash_function(key))
+        if value is not _MISSING:  # Found
             # Return the given key's associated value
-            assert isinstance(entry, tuple)
-            assert len(entry) == 2
-            return entry[1]
+            return value
+        elif default is not _MISSING:  # Not found, but we have a fallback
+            return default
         else:  # Not found
             raise KeyError('Key not found: {}'.format(key))
 
     def set(self, key, value):
         """Insert or update the given key with its associated value.
-        Best case running time: ??? under what conditions? [TODO]
-        Worst case running time: ??? under what conditions? [TODO]"""
-        # Find the bucket the given key belongs in
-        index = self._bucket_index(key)
-        bucket = self.buckets[index]
-        # Find the entry with the given key in that bucket, if one exists
-        # Check if an entry with the given key exists in that bucket
-        entry = bucket.find(lambda key_value: key_value[0] == key)
-        if entry is not None:  # Found
-            # In this case, the given key's value is being updated
-            # Remove the old key-value entry from the bucket first
-            bucket.delete(entry)
-        else:
-            self.size += 1
-        # Insert the new key-value entry into the bucket in either case
-        bucket.append((key, value))
+        Best case running time: O(1) if the key is near its bucket's head
+        Worst case running time: O(k) for k entries in the key's bucket,
+        or O(n) when this triggers a resize"""
+        self._rehash_step()
+        self._insert(key, value, self.hash_function(key))
         # TODO: Check if the load factor exceeds a threshold such as 0.75
         if self.load_factor() > 0.75:
             self._resize()
         # TODO: If so, automatically resize to reduce the load factor
         # ...
 
+    def setdefault(self, key, default=None):
+        """Return the value of the given key if it's here; otherwise insert
+        it with the given default and return that. Walks the bucket once.
+        Best case running time: O(1) if the key is near its bucket's head
+        Worst case running time: O(k) for k entries in the key's bucket"""
+        self._rehash_step()
+        hash_code = self.hash_function(key)
+        bucket = self._find_bucket(key, hash_code)
+        node = self._find_node(bucket, key, hash_code)
+        if node is not None:
+            return node.data[1]
+        bucket.append((key, default, hash_code))
+        self.size += 1
+        self._version += 1
+        if self.load_factor() > 0.75:
+            self._resize()
+        return default
+
+    def _insert(self, key, value, hash_code):
+        """Insert or update the given key without checking the load factor.
+        Running time: O(k) for k entries in the key's bucket"""
+        # Find the bucket the given key belongs in
+        bucket = self._find_bucket(key, hash_code)
+        # Find the node with the given key in that bucket, if one exists
+        node = self._find_node(bucket, key, hash_code)
+        if node is not None:  # Found
+            # In this case, the given key's value is being updated, so swap
+            # the entry in place rather than deleting and re-appending it
+            node.data = (key, value, hash_code)
+        else:
+            # Insert the new entry, keeping the hash code so resizing
+            # never has to call hash() again
+            bucket.append((key, value, hash_code))
+            self.size += 1
+            self._version += 1
+
+    def _find_node(self, bucket, key, hash_code):
+        """Return the node holding the given key in the bucket, or None.
+        Walks the nodes directly instead of calling a lambda on each one,
+        and compares cached hashes first so most mismatches skip ==. The
+        same key object matches without == at all, like in dict, which
+        matters for keys whose == is slow (a FrozenSet compares elements).
+        Running time: O(k) for k entries in the bucket"""
+        node = bucket.head
+        while node is not None:
+            entry = node.data
+            if entry[2] == hash_code and (entry[0] is key or entry[0] == key):
+                return node
+            node = node.next
+        return None
+
+    def _lookup(self, key, hash_code):
+        """Return the value stored for the given key, or _MISSING.
+        Running time: O(k) for k entries in the key's bucket"""
+        node = self._find_node(self._find_bucket(key, hash_code), key,
+                               hash_code)
+        if node is None:
+            return _MISSING
+        return node.data[1]
+
     def delete(self, key):
         """Delete the given key and its associated value, or raise KeyError.
         Best case running time: O(1) at head
         Worst case running time: O(n) at tail"""
+        self.pop(key)
+
+    def pop(self, key, default=_MISSING):
+        """Remove the given key and return its value. If it's missing,
+        return default if one was given, or else raise KeyError.
+        Finds the node once and unlinks it, without a second search.
+        Best case running time: O(1) at head
+        Worst case running time: O(k) for k entries in the key's bucket"""
+        self._rehash_step()
         # Find the bucket the given key belongs in
-        index = self._bucket_index(key)
-        bucket = self.buckets[index]
-        # Find the entry with the given key in that bucket, if one exists
-        entry = bucket.find(lambda key_value: key_value[0] == key)
-        if entry is not None:  # Found
-            # Remove the key-value entry from the bucket
-            self.size -= 1
-
-            bucket.delete(entry)
-        else:  # Not found
+        hash_code = self.hash_function(key)
+        bucket = self._find_bucket(key, hash_code)
+        # Find the node with the given key in that bucket, if one exists
+        node = self._find_node(bucket, key, hash_code)
+        if node is None:  # Not found
+            if default is not _MISSING:
+                return default
             raise KeyError('Key not found: {}'.format(key))
-        if self.load_factor() < 0.30:
+        # Remove the key-value entry from the bucket
+        bucket.unlink(node)
+        self.size -= 1
+        self._version += 1
+        # Never shrink below one bucket, or indexing would divide by zero
+        if self.load_factor() < 0.30 and len(self.buckets) > 1:
             self._resize(0)
+        return node.data[1]
+
+    @classmethod
+    def from_items(cls, items, **options):
+        """Return a new hash table holding the given key-value pairs, sized
+        up front so loading them never has to resize.
+        Running time: O(n) for n pairs"""
+        items = _sized(items)
+        init_size = 8
+        # Grow the same way _resize would, until everything fits under 0.75
+        while len(items) > 0.75 * init_size:
+            init_size *= 2
+        table = cls(init_size, **options)
+        table.update(items)
+        return table
+
+    def update(self, items):
+        """Insert or update every key-value pair in the given iterable (or
+        anything with an items() method, like another hash table or dict).
+        Makes room for all of them first, so we resize at most once.
+        Running time: O(n) for n pairs, plus one resize if needed"""
+        items = _sized(items)
+        self._reserve(self.size + len(items))
+        insert = self._insert
+        for key, value in items:
+            insert(key, value, self.hash_function(key))
+        # Updates of existing keys may have left us oversized; that's fine,
+        # but duplicates in items could still push us past the threshold
+        if self.load_factor() > 0.75:
+            self._resize()
+
+    def get_many(self, keys, default=_MISSING):
+        """Return a list with the value of each of the given keys. Missing
+        keys raise KeyError, unless a default is given to use instead.
+        Running time: O(m) for m keys, assuming short buckets"""
+        self._rehash_step()
+        lookup = self._lookup
+        values = []
+        for key in keys:
+            value = lookup(key, self.hash_function(key))
+            if value is _MISSING:
+                if default is _MISSING:
+                    raise KeyError('Key not found: {}'.format(key))
+                value = default
+            values.append(value)
+        return values
+
+    def contains_many(self, keys):
+        """Return a list of True or False for whether each key is in here.
+        Running time: O(m) for m keys, assuming short buckets"""
+        self._rehash_step()
+        lookup = self._lookup
+        return [lookup(key, self.hash_function(key)) is not _MISSING for key in keys]
+
+    def _reserve(self, count):
+        """Resize ahead of time so count entries fit under the threshold.
+        Running time: O(n) if we resize, O(1) otherwise"""
+        new_size = self._slot_count()
+        while count > 0.75 * new_size:
+            new_size *= 2
+        if new_size != self._slot_count():
+            self._resize(new_size)
 
     def _resize(self, new_size=None):
         """Resize this hash table's buckets and rehash all key-value entries.
@@ -151,31 +421,721 @@ class HashTable(object):
                 to put into new buckets is gonna take time
         Best space: Minimum would be if init had a 1 bucket size;
                     just makes a list with one element, and two lls.
-        Worse space: As big of a list and previosu bucket size as we can"""
+        Worse space: As big of a list and previosu bucket size as we can
+        In incremental mode this only swaps in the new buckets; the entries
+        are moved over a few buckets at a time by _rehash_step."""
         # If unspecified, choose new size dynamically based on current size
         if new_size is None:
             new_size = len(self.buckets) * 2  # Double size
         # Option to reduce size if buckets are sparsely filled (low load factor)
-        elif new_size is 0:
+        elif new_size == 0:
             new_size = len(self.buckets) / 2  # Half size
 
+        # An earlier incremental resize has to land before we start another
+        self._finish_rehash()
+        self._version += 1
         # Get a list to temporarily hold all current key-value entries
         templist = self.buckets
         # Create a new list of new_size total empty linked list buckets
         self.buckets = [LinkedList() for i in range(int(new_size))]
+        if self.incremental:
+            # Leave the entries where they are; set/get/delete move them
+            self._old_buckets = templist
+            self._migrated = 0
+            return
         # Insert each key-value entry into the new list of buckets,
-        for oldbucket in templist:
-            node = oldbucket.head
-            for i in range(oldbucket.size):
-                index = self._bucket_index(node.data[0])
-                bucket = self.buckets[index]
+        # which will rehash them into a new bucket index based on the new size
+        for index, oldbucket in enumerate(templist):
+            self._move_bucket(oldbucket, index, len(templist))
 
-                bucket.append(node.data)
-                node = node.next
+    def _move_bucket(self, oldbucket, old_index, old_count):
+        """Move every entry of an old bucket (at old_index of old_count old
+        buckets) into the current buckets. The nodes themselves move, so
+        nothing gets allocated, and each entry's cached hash code is used
+        instead of calling hash() again.
+        Running time: O(1) when shrinking by a whole factor, since the
+        whole chain lands in one bucket; O(k) for k entries otherwise"""
+        bucket_count = len(self.buckets)
+        if old_count % bucket_count == 0:
+            # hash % old_count % bucket_count == hash % bucket_count here
+            self.buckets[old_index % bucket_count].splice(oldbucket)
+            return
+        node = oldbucket.head
+        while node is not None:
+            following = node.next
+            oldbucket.unlink(node)
+            bucket = self.buckets[_index(node.data[2], bucket_count)]
+            bucket.append_node(node)
+            node = following
 
+    def _rehash_step(self, bucket_count=4):
+        """Move up to bucket_count old buckets over during an incremental
+        resize, so no single operation pays for rehashing the whole table.
+        Does nothing while an iterator is running; see iter_items.
+        Running time: O(1) buckets per call, O(k) for the k entries in them"""
+        if self._old_buckets is None or self._iterators:
+            return
+        self._migrate(bucket_count)
 
-        # which will rehash them into a new bucket index based on the new size
-        # ...
+    def _migrate(self, bucket_count):
+        """Move up to bucket_count old buckets over, iterators or not."""
+        stop = min(self._migrated + bucket_count, len(self._old_buckets))
+        # Entries are changing buckets, so any running iterator is stale
+        self._version += 1
+        while self._migrated < stop:
+            self._move_bucket(self._old_buckets[self._migrated],
+                              self._migrated, len(self._old_buckets))
+            self._migrated += 1
+        if self._migrated == len(self._old_buckets):
+            self._old_buckets = None
+            self._migrated = 0
+
+    def _finish_rehash(self):
+        """Move every remaining old bucket over right now."""
+        if self._old_buckets is not None:
+            self._migrate(len(self._old_buckets))
+
+    def save(self, path):
+        """Write this table to a file that HashTable.open_mmap can serve
+        lookups from without loading it. Keys must be strings and values
+        ints (that fit in 64 bits) or floats, or else TypeError is raised.
+        Running time: O(n)"""
+        _write_snapshot(path, self.iter_items(), self.size)
+
+    @staticmethod
+    def open_mmap(path):
+        """Return a read-only MappedHashTable for a file written by save.
+        Nothing is read up front; lookups go straight to the mapped pages,
+        which every process opening the same file shares.
+        Running time: O(1)"""
+        return MappedHashTable(path)
+
+    def chain_lengths(self):
+        """Return a list with the number of entries in each bucket.
+        Running time: O(b) for b buckets"""
+        return [bucket.size for bucket in self._live_buckets()]
+
+    def bucket_histogram(self):
+        """Return a dict mapping each chain length to how many buckets
+        have that many entries, to spot keys clustering in a few buckets.
+        Running time: O(n + b) for b buckets"""
+        histogram = {}
+        for length in self.chain_lengths():
+            histogram[length] = histogram.get(length, 0) + 1
+        return histogram
+
+    def memory_usage(self):
+        """Return a dict with roughly how many bytes this table's own
+        structure takes ('bytes'), how many entries it holds ('entries') and
+        the bytes spent per entry ('bytes_per_entry'). Keys and values
+        themselves aren't counted, only what it costs to store them.
+        Running time: O(1), except O(b) for the chained table's b buckets"""
+        total = self._structure_bytes()
+        per_entry = total / self.size if self.size > 0 else 0
+        return {'bytes': total, 'entries': self.size,
+                'bytes_per_entry': per_entry}
+
+    def _structure_bytes(self):
+        """Return the bytes taken by the bucket list, the LinkedLists and
+        their nodes and entry tuples."""
+        buckets = self._live_buckets()
+        total = sys.getsizeof(self.buckets)
+        if self._old_buckets is not None:
+            total += sys.getsizeof(self._old_buckets)
+        # Every LinkedList (and every node) costs the same, so measure one
+        total += len(buckets) * _object_bytes(buckets[0]) if buckets else 0
+        for bucket in buckets:
+            if bucket.head is not None:
+                node = bucket.head
+                total += self.size * (_object_bytes(node) +
+                                      sys.getsizeof(node.data))
+                break
+        return total
+
+
+def _sized(items):
+    """Return the given key-value pairs as something with a length."""
+    if hasattr(items, 'items'):
+        items = items.items()
+    if not hasattr(items, '__len__'):
+        items = list(items)
+    return items
+
+
+def _object_bytes(obj):
+    """Return roughly how many bytes the given object takes by itself,
+    including its attribute dict if it has one."""
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+# Marks a slot that has never held an entry (None is a valid key)
+_EMPTY = object()
+
+
+def _check_not_incremental(storage, incremental):
+    """Raise ValueError if incremental resizing was asked for on a storage
+    engine that doesn't do it. Only the chained engine has buckets it can
+    move over a few at a time; the others always resize in one go."""
+    if incremental:
+        raise ValueError("Incremental resize only works with 'chained' "
+                         "storage, not {!r}".format(storage))
+
+
+class LinearProbingHashTable(HashTable):
+    """Open addressing hash table. Keys, values and hash codes live in three
+    flat parallel lists instead of LinkedList buckets, and a collision just
+    probes forward to the next slot, so lookups don't allocate anything."""
+
+    def __init__(self, init_size=8, storage='linear', incremental=False,
+                 hash_function=hash):
+        """Initialize this hash table with the given number of slots.
+        Incremental resizing needs buckets, so it's chained only."""
+        _check_not_incremental(storage, incremental)
+        self.incremental = False
+        init_size = max(1, init_size)
+        self.hash_function = hash_function
+        self.slot_keys = [_EMPTY] * init_size
+        self.slot_values = [None] * init_size
+        self.slot_hashes = [0] * init_size
+        self.size = 0  # Number of key-value entries
+        # Bumped on every structural change so iterators can fail fast
+        self._version = 0
+
+    def __repr__(self):
+        """Return a string representation of this hash table."""
+        return 'LinearProbingHashTable({!r})'.format(self.items())
+
+    def _slot_count(self):
+        """Return how many slots this table currently has."""
+        return len(self.slot_keys)
+
+    def _probe(self, key, hash_code):
+        """Return the slot index holding the given key, or the index of the
+        empty slot that ended the probe if the key is not in this table.
+        Best case: O(1) when the key sits in its home slot.
+        Worst case: O(n) if everything clustered into one long run."""
+        keys = self.slot_keys
+        hashes = self.slot_hashes
+        slot_count = len(keys)
+        index = _index(hash_code, slot_count)
+        while True:
+            slot_key = keys[index]
+            if slot_key is _EMPTY:
+                return index
+            # Compare cached hashes first; == on keys can be expensive
+            if hashes[index] == hash_code and (slot_key is key or
+                                               slot_key == key):
+                return index
+            index = (index + 1) % slot_count
+
+    def iter_items(self):
+        """Yield each entry (key-value pair) in slot order, without building
+        a list. Raises RuntimeError if the table changes in the meantime.
+        Running time: O(slots) in total"""
+        version = self._version
+        keys = self.slot_keys
+        values = self.slot_values
+        for index in range(len(keys)):
+            key = keys[index]
+            if key is not _EMPTY:
+                yield key, values[index]
+                self._check_version(version)
+
+    def set(self, key, value):
+        """Insert or update the given key with its associated value.
+        Best case running time: O(1) if the home slot is free or holds key
+        Worst case running time: O(n) if we probe a cluster or resize"""
+        self._insert(key, value, self.hash_function(key))
+        # Keep at least a quarter of the slots empty so probes stay short
+        if self.load_factor() > 0.75:
+            self._resize()
+
+    def _insert(self, key, value, hash_code):
+        """Insert or update the given key without checking the load factor.
+        Callers have to make sure there's an empty slot left."""
+        index = self._probe(key, hash_code)
+        if self.slot_keys[index] is _EMPTY:
+            # New entry goes in the empty slot that ended the probe
+            self.slot_keys[index] = key
+            self.slot_hashes[index] = hash_code
+            self.size += 1
+            self._version += 1
+        self.slot_values[index] = value
+
+    def _rehash_step(self, bucket_count=4):
+        """Nothing to do; open addressing always resizes in one go."""
+
+    def _lookup(self, key, hash_code):
+        """Return the value stored for the given key, or _MISSING."""
+        index = self._probe(key, hash_code)
+        if self.slot_keys[index] is _EMPTY:
+            return _MISSING
+        return self.slot_values[index]
+
+    def setdefault(self, key, default=None):
+        """Return the value of the given key if it's here; otherwise insert
+        it with the given default and return that. Probes only once."""
+        hash_code = self.hash_function(key)
+        index = self._probe(key, hash_code)
+        if self.slot_keys[index] is not _EMPTY:
+            return self.slot_values[index]
+        self.slot_keys[index] = key
+        self.slot_values[index] = default
+        self.slot_hashes[index] = hash_code
+        self.size += 1
+        self._version += 1
+        if self.load_factor() > 0.75:
+            self._resize()
+        return default
+
+    def pop(self, key, default=_MISSING):
+        """Remove the given key and return its value. If it's missing,
+        return default if one was given, or else raise KeyError.
+        Uses backward shift deletion, so no tombstones pile up in the table.
+        Best case running time: O(1) if nothing was displaced after it
+        Worst case running time: O(n) if we shift back a whole cluster"""
+        keys = self.slot_keys
+        hashes = self.slot_hashes
+        values = self.slot_values
+        hole = self._probe(key, self.hash_function(key))
+        if keys[hole] is _EMPTY:
+            if default is not _MISSING:
+                return default
+            raise KeyError('Key not found: {}'.format(key))
+        value = values[hole]
+        slot_count = len(keys)
+        index = hole
+        while True:
+            index = (index + 1) % slot_count
+            if keys[index] is _EMPTY:
+                break
+            home = _index(hashes[index], slot_count)
+            # Entry can move into the hole only if its home slot is not
+            # (cyclically) between the hole and where it currently sits
+            if hole < index:
+                movable = home <= hole or home > index
+            else:
+                movable = home <= hole and home > index
+            if movable:
+                keys[hole] = keys[index]
+                values[hole] = values[index]
+                hashes[hole] = hashes[index]
+                hole = index
+        keys[hole] = _EMPTY
+        values[hole] = None
+        self.size -= 1
+        self._version += 1
+        if self.load_factor() < 0.30 and slot_count > 1:
+            self._resize(0)
+        return value
+
+    def _resize(self, new_size=None):
+        """Resize this table's slots and reinsert all key-value entries.
+        Hash codes are cached per slot, so we never call hash() again here.
+        Best and worst case running time: O(n)"""
+        if new_size is None:
+            new_size = len(self.slot_keys) * 2  # Double size
+        elif new_size == 0:
+            new_size = len(self.slot_keys) / 2  # Half size
+        new_size = max(1, int(new_size))
+        self._version += 1
+        old_keys = self.slot_keys
+        old_values = self.slot_values
+        old_hashes = self.slot_hashes
+        keys = [_EMPTY] * new_size
+        values = [None] * new_size
+        hashes = [0] * new_size
+        for old_index, key in enumerate(old_keys):
+            if key is _EMPTY:
+                continue
+            hash_code = old_hashes[old_index]
+            # Keys are unique, so we only need to find the first empty slot
+            index = _index(hash_code, new_size)
+            while keys[index] is not _EMPTY:
+                index = (index + 1) % new_size
+            keys[index] = key
+            values[index] = old_values[old_index]
+            hashes[index] = hash_code
+        self.slot_keys = keys
+        self.slot_values = values
+        self.slot_hashes = hashes
+
+    def chain_lengths(self):
+        """Return a list with the probe length of each entry, i.e. how many
+        slots a lookup for it has to look at (1 if it's in its home slot).
+        Running time: O(slots)"""
+        slot_count = len(self.slot_keys)
+        lengths = []
+        for index, key in enumerate(self.slot_keys):
+            if key is not _EMPTY:
+                home = _index(self.slot_hashes[index], slot_count)
+                lengths.append((index - home) % slot_count + 1)
+        return lengths
+
+    def _structure_bytes(self):
+        """Return the bytes taken by the three slot lists."""
+        return (sys.getsizeof(self.slot_keys) +
+                sys.getsizeof(self.slot_values) +
+                sys.getsizeof(self.slot_hashes))
+
+
+class Entry(object):
+    """One key-value entry in a CompactHashTable bucket chain. Slotted, so
+    there's no per-entry attribute dict, tuple or separate list node."""
+    __slots__ = ('key', 'value', 'hash', 'next')
+
+    def __init__(self, key, value, hash_code, next_entry=None):
+        """Initialize this entry with the given key, value and hash code."""
+        self.key = key
+        self.value = value
+        self.hash = hash_code
+        self.next = next_entry
+
+    def __repr__(self):
+        """Return a string representation of this entry."""
+        return 'Entry({!r}: {!r})'.format(self.key, self.value)
+
+
+class CompactHashTable(HashTable):
+    """Chained hash table that trades LinkedList buckets for singly linked
+    chains of slotted Entry records. An empty bucket is just None, so no
+    bucket object exists until something is stored in it."""
+
+    def __init__(self, init_size=8, storage='compact', incremental=False,
+                 hash_function=hash):
+        """Initialize this hash table with the given number of buckets.
+        Resizes always rehash every entry at once, so incremental=True is
+        refused."""
+        _check_not_incremental(storage, incremental)
+        self.incremental = False
+        self.buckets = [None] * max(1, init_size)
+        self.hash_function = hash_function
+        self.size = 0  # Number of key-value entries
+        # Bumped on every structural change so iterators can fail fast
+        self._version = 0
+
+    def __repr__(self):
+        """Return a string representation of this hash table."""
+        return 'CompactHashTable({!r})'.format(self.items())
+
+    def iter_items(self):
+        """Yield each entry (key-value pair) in bucket order, without
+        building a list. Raises RuntimeError if the table changes meanwhile.
+        Running time: O(n + b) for b buckets in total"""
+        version = self._version
+        for entry in self.buckets:
+            while entry is not None:
+                yield entry.key, entry.value
+                self._check_version(version)
+                entry = entry.next
+
+    def _rehash_step(self, bucket_count=4):
+        """Nothing to do; the compact table always resizes in one go."""
+
+    def _find_entry(self, key, hash_code):
+        """Return the entry holding the given key, or None.
+        Running time: O(k) for k entries in the key's bucket"""
+        entry = self.buckets[_index(hash_code, len(self.buckets))]
+        while entry is not None:
+            if entry.hash == hash_code and (entry.key is key or
+                                            entry.key == key):
+                return entry
+            entry = entry.next
+        return None
+
+    def _lookup(self, key, hash_code):
+        """Return the value stored for the given key, or _MISSING."""
+        entry = self._find_entry(key, hash_code)
+        if entry is None:
+            return _MISSING
+        return entry.value
+
+    def _insert(self, key, value, hash_code):
+        """Insert or update the given key without checking the load factor.
+        New entries go on the front of the chain, so it's one walk total."""
+        entry = self._find_entry(key, hash_code)
+        if entry is not None:
+            entry.value = value
+            return
+        index = _index(hash_code, len(self.buckets))
+        self.buckets[index] = Entry(key, value, hash_code, self.buckets[index])
+        self.size += 1
+        self._version += 1
+
+    def setdefault(self, key, default=None):
+        """Return the value of the given key if it's here; otherwise insert
+        it with the given default and return that."""
+        hash_code = self.hash_function(key)
+        entry = self._find_entry(key, hash_code)
+        if entry is not None:
+            return entry.value
+        self._insert(key, default, hash_code)
+        if self.load_factor() > 0.75:
+            self._resize()
+        return default
+
+    def pop(self, key, default=_MISSING):
+        """Remove the given key and return its value. If it's missing,
+        return default if one was given, or else raise KeyError.
+        Running time: O(k) for k entries in the key's bucket"""
+        hash_code = self.hash_function(key)
+        index = _index(hash_code, len(self.buckets))
+        previous = None
+        entry = self.buckets[index]
+        while entry is not None:
+            if entry.hash == hash_code and (entry.key is key or
+                                            entry.key == key):
+                # Skip around the entry; the bucket goes back to None
+                # once its last entry is gone
+                if previous is None:
+                    self.buckets[index] = entry.next
+                else:
+                    previous.next = entry.next
+                self.size -= 1
+                self._version += 1
+                if self.load_factor() < 0.30 and len(self.buckets) > 1:
+                    self._resize(0)
+                return entry.value
+            previous = entry
+            entry = entry.next
+        if default is not _MISSING:
+            return default
+        raise KeyError('Key not found: {}'.format(key))
+
+    def _resize(self, new_size=None):
+        """Resize this table's buckets and relink every entry into them.
+        Entries are moved, not copied, and keep their cached hash codes.
+        Best and worst case running time: O(n + b) for b buckets"""
+        if new_size is None:
+            new_size = len(self.buckets) * 2  # Double size
+        elif new_size == 0:
+            new_size = len(self.buckets) / 2  # Half size
+        new_size = max(1, int(new_size))
+        self._version += 1
+        buckets = [None] * new_size
+        for entry in self.buckets:
+            # Remember the rest of the old chain before relinking this entry
+            while entry is not None:
+                next_entry = entry.next
+                index = _index(entry.hash, new_size)
+                entry.next = buckets[index]
+                buckets[index] = entry
+                entry = next_entry
+        self.buckets = buckets
+
+    def chain_lengths(self):
+        """Return a list with the number of entries in each bucket.
+        Running time: O(n + b) for b buckets"""
+        lengths = []
+        for entry in self.buckets:
+            length = 0
+            while entry is not None:
+                length += 1
+                entry = entry.next
+            lengths.append(length)
+        return lengths
+
+    def _structure_bytes(self):
+        """Return the bytes taken by the bucket list and the entries."""
+        total = sys.getsizeof(self.buckets)
+        if self.size > 0:
+            sample = next(entry for entry in self.buckets if entry is not None)
+            total += self.size * sys.getsizeof(sample)
+        return total
+
+
+# Snapshot file layout (all little endian):
+#   header: magic, format version, slot count, entry count, key blob offset
+#   slots:  slot count records of hash, key offset, key length, value type,
+#           and 8 value bytes, in an open addressing (linear probing) table
+#   keys:   every key's UTF-8 bytes, back to back
+_SNAPSHOT_MAGIC = b'HTBL'
+_SNAPSHOT_HEADER = struct.Struct('<4sIQQQ')
+_SNAPSHOT_SLOT = struct.Struct('<QQIB3x8s')
+_SNAPSHOT_EMPTY = 0
+_SNAPSHOT_INT = 1
+_SNAPSHOT_FLOAT = 2
+
+
+def stable_hash(key_bytes):
+    """Return a 64 bit hash of the given bytes that's the same in every
+    process (unlike hash, which Python randomizes for strings)."""
+    digest = hashlib.blake2b(key_bytes, digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def _write_snapshot(path, items, count):
+    """Write count key-value pairs from items in the snapshot format."""
+    slot_count = 8
+    # Keep the file table at most half full so probes stay short
+    while count > 0.5 * slot_count:
+        slot_count *= 2
+    slots = [None] * slot_count
+    key_blob = bytearray()
+    for key, value in items:
+        if not isinstance(key, str):
+            raise TypeError('Snapshot keys must be strings: {!r}'.format(key))
+        if isinstance(value, float):
+            value_type, value_bytes = _SNAPSHOT_FLOAT, struct.pack('<d', value)
+        elif isinstance(value, int):
+            value_type = _SNAPSHOT_INT
+            try:
+                value_bytes = struct.pack('<q', value)
+            except struct.error:
+                raise TypeError('Snapshot int too big: {!r}'.format(value))
+        else:
+            raise TypeError('Snapshot values must be numbers: {!r}'
+                            .format(value))
+        key_bytes = key.encode('utf-8')
+        hash_code = stable_hash(key_bytes)
+        index = hash_code & (slot_count - 1)
+        while slots[index] is not None:
+            index = (index + 1) & (slot_count - 1)
+        slots[index] = _SNAPSHOT_SLOT.pack(hash_code, len(key_blob),
+                                           len(key_bytes), value_type,
+                                           value_bytes)
+        key_blob.extend(key_bytes)
+    empty = _SNAPSHOT_SLOT.pack(0, 0, 0, _SNAPSHOT_EMPTY, bytes(8))
+    keys_offset = _SNAPSHOT_HEADER.size + slot_count * _SNAPSHOT_SLOT.size
+    with open(path, 'wb') as snapshot:
+        snapshot.write(_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, 1, slot_count,
+                                             count, keys_offset))
+        snapshot.write(b''.join(empty if slot is None else slot
+                                for slot in slots))
+        snapshot.write(key_blob)
+
+
+class MappedHashTable(object):
+    """Read-only hash table served straight out of a memory-mapped file
+    written by HashTable.save. Lookups unpack just the slots they probe, so
+    opening even a huge table is instant, and the OS shares its pages
+    between every process that has it open."""
+
+    def __init__(self, path):
+        """Map the snapshot file at the given path."""
+        with open(path, 'rb') as snapshot:
+            self.map = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.slot_count, self.size,
+         self.keys_offset) = _SNAPSHOT_HEADER.unpack_from(self.map, 0)
+        if magic != _SNAPSHOT_MAGIC or version != 1:
+            self.map.close()
+            raise ValueError('Not a HashTable snapshot: {}'.format(path))
+
+    def __repr__(self):
+        """Return a string representation of this hash table."""
+        return 'MappedHashTable({} entries)'.format(self.size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        """Return the number of key-value entries."""
+        return self.size
+
+    def __contains__(self, key):
+        """Return True if this hash table contains the given key, or False."""
+        return self.contains(key)
+
+    def __getitem__(self, key):
+        """Return the value associated with the given key, or raise KeyError."""
+        return self.get(key)
+
+    def __iter__(self):
+        """Return an iterator over the keys of this hash table."""
+        return self.iter_keys()
+
+    def close(self):
+        """Unmap the file; the table can't be used afterwards."""
+        self.map.close()
+
+    def length(self):
+        """Return the number of key-value entries."""
+        return self.size
+
+    def _slot(self, index):
+        """Return the (hash, key offset, key length, type, value bytes)
+        record stored in the given slot."""
+        offset = _SNAPSHOT_HEADER.size + index * _SNAPSHOT_SLOT.size
+        return _SNAPSHOT_SLOT.unpack_from(self.map, offset)
+
+    def _value(self, value_type, value_bytes):
+        """Decode a value's 8 stored bytes."""
+        if value_type == _SNAPSHOT_FLOAT:
+            return struct.unpack('<d', value_bytes)[0]
+        return struct.unpack('<q', value_bytes)[0]
+
+    def _lookup(self, key):
+        """Return the value stored for the given key, or _MISSING.
+        Best case: O(1) if it's in its home slot
+        Worst case: O(n) if we probe through a long cluster"""
+        if not isinstance(key, str):
+            return _MISSING
+        key_bytes = key.encode('utf-8')
+        hash_code = stable_hash(key_bytes)
+        mask = self.slot_count - 1
+        index = hash_code & mask
+        while True:
+            (slot_hash, key_offset, key_length, value_type,
+             value_bytes) = self._slot(index)
+            if value_type == _SNAPSHOT_EMPTY:
+                return _MISSING
+            if slot_hash == hash_code and key_length == len(key_bytes):
+                start = self.keys_offset + key_offset
+                if self.map[start:start + key_length] == key_bytes:
+                    return self._value(value_type, value_bytes)
+            index = (index + 1) & mask
+
+    def contains(self, key):
+        """Return True if this hash table contains the given key, or False."""
+        return self._lookup(key) is not _MISSING
+
+    def get(self, key, default=_MISSING):
+        """Return the value associated with the given key. If it's missing,
+        return default if one was given, or else raise KeyError."""
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value
+        elif default is not _MISSING:
+            return default
+        raise KeyError('Key not found: {}'.format(key))
+
+    def iter_items(self):
+        """Yield each entry (key-value pair) in slot order.
+        Running time: O(slots) in total"""
+        for index in range(self.slot_count):
+            (slot_hash, key_offset, key_length, value_type,
+             value_bytes) = self._slot(index)
+            if value_type != _SNAPSHOT_EMPTY:
+                start = self.keys_offset + key_offset
+                key = self.map[start:start + key_length].decode('utf-8')
+                yield key, self._value(value_type, value_bytes)
+
+    def iter_keys(self):
+        """Yield each key in this hash table."""
+        for key, value in self.iter_items():
+            yield key
+
+    def items(self):
+        """Return a list of all entries (key-value pairs) in this table."""
+        return list(self.iter_items())
+
+    def keys(self):
+        """Return a list of all keys in this hash table."""
+        return list(self.iter_keys())
+
+
+# Storage engines selectable with HashTable(init_size, storage=...)
+STORAGE_ENGINES = {
+    'chained': HashTable,
+    'linear': LinearProbingHashTable,
+    'compact': CompactHashTable,
+}
 
 
 def test_hash_table():
@@ -1,12 +1,44 @@
 #!python
 
-from hashtable import HashTable
+from hashtable import HashTable, LinearProbingHashTable, CompactHashTable
+from hashtable import fibonacci_hash, mix64_hash, seeded_hash
+from hashtable import MappedHashTable
+import os
+import shutil
+import tempfile
 import unittest
 # Python 2 and 3 compatibility: unittest module renamed this assertion method
 if not hasattr(unittest.TestCase, 'assertCountEqual'):
     unittest.TestCase.assertCountEqual = unittest.TestCase.assertItemsEqual
 
 
+class CountedKey(object):
+    """Key that counts how many times it has been hashed."""
+
+    def __init__(self, value):
+        self.value = value
+        self.hash_calls = 0
+
+    def __hash__(self):
+        self.hash_calls += 1
+        return hash(self.value)
+
+    def __eq__(self, other):
+        return isinstance(other, CountedKey) and self.value == other.value
+
+
+class EqualityCountedKey(CountedKey):
+    """Key that counts how many times == was called on it."""
+
+    eq_calls = 0
+
+    def __eq__(self, other):
+        EqualityCountedKey.eq_calls += 1
+        return CountedKey.__eq__(self, other)
+
+    __hash__ = CountedKey.__hash__
+
+
 class HashTableTest(unittest.TestCase):
 
     def test_init(self):
@@ -142,6 +174,502 @@ class HashTableTest(unittest.TestCase):
         with self.assertRaises(KeyError):
             ht.delete('A')  # Key does not exist
 
+    def test_resize_reuses_cached_hashes(self):
+        ht = HashTable(2)
+        keys = [CountedKey(number) for number in range(20)]
+        for key in keys:
+            ht.set(key, key.value)
+        # One hash() per set call, none extra for the resizes in between
+        assert sum(key.hash_calls for key in keys) == 20
+        assert len(ht.buckets) == 32
+
+    def test_set_updates_node_in_place(self):
+        ht = HashTable()
+        ht.set('I', 1)
+        node = ht.buckets[ht._bucket_index('I')].head
+        ht.set('I', 2)  # Update value
+        assert node.data[1] == 2  # Same node, no delete and re-append
+        assert ht.size == 1
+
+    def test_get_with_default(self):
+        ht = HashTable()
+        ht.set('I', 1)
+        assert ht.get('I', 0) == 1
+        assert ht.get('A', 0) == 0
+        assert ht.get('A', None) is None
+
+    def test_setdefault(self):
+        ht = HashTable()
+        assert ht.setdefault('I', 1) == 1
+        assert ht.setdefault('I', 2) == 1  # Already there; not replaced
+        assert ht.get('I') == 1
+        assert ht.setdefault('V') is None
+        assert ht.size == 2
+
+    def test_pop(self):
+        ht = HashTable()
+        ht.set('I', 1)
+        ht.set('V', 5)
+        assert ht.pop('I') == 1
+        assert ht.contains('I') is False
+        assert ht.size == 1
+        assert ht.pop('I', None) is None
+        with self.assertRaises(KeyError):
+            ht.pop('I')  # Key no longer exists
+
+
+class BulkHashTableTest(unittest.TestCase):
+
+    def test_update(self):
+        ht = HashTable(2)
+        ht.set('I', 1)
+        ht.update([('V', 5), ('X', 10), ('I', 2)])
+        assert ht.size == 3
+        assert ht.get('I') == 2
+        ht.update({'L': 50})  # Anything with items() works too
+        assert ht.get('L') == 50
+        ht.update(HashTable.from_items([('C', 100)]))
+        assert ht.size == 5
+        assert ht.load_factor() <= 0.75
+
+    def test_update_resizes_once(self):
+        ht = HashTable(4)
+        resizes = []
+        original_resize = ht._resize
+        ht._resize = lambda new_size=None: (resizes.append(new_size),
+                                            original_resize(new_size))
+        ht.update((number, number) for number in range(100))
+        assert resizes == [256]
+        assert ht.size == 100
+
+    def test_from_items(self):
+        pairs = [(number, str(number)) for number in range(100)]
+        ht = HashTable.from_items(pairs)
+        assert len(ht.buckets) == 256  # Pre-sized, no resizing needed
+        assert ht.size == 100
+        assert ht.get(42) == '42'
+        ht = HashTable.from_items(iter(pairs), storage='linear')
+        assert len(ht.slot_keys) == 256
+        assert ht.get(99) == '99'
+
+    def test_get_many(self):
+        for storage in ['chained', 'linear']:
+            ht = HashTable.from_items([('I', 1), ('V', 5), ('X', 10)],
+                                      storage=storage)
+            assert ht.get_many(['X', 'I']) == [10, 1]
+            assert ht.get_many(['X', 'A'], default=None) == [10, None]
+            with self.assertRaises(KeyError):
+                ht.get_many(['X', 'A'])
+
+    def test_contains_many(self):
+        for storage in ['chained', 'linear']:
+            ht = HashTable.from_items([('I', 1), ('V', None)],
+                                      storage=storage)
+            assert ht.contains_many(['I', 'V', 'A']) == [True, True, False]
+            assert ht.contains_many([]) == []
+
+
+class ResizeMovesNodesTest(unittest.TestCase):
+
+    def nodes(self, ht):
+        return set(id(node) for bucket in ht.buckets
+                   for node in _nodes(bucket))
+
+    def test_grow_and_shrink_keep_nodes(self):
+        ht = HashTable(8)
+        for number in range(6):
+            ht.set(number, number)
+        before = self.nodes(ht)
+        ht.set(6, 6)  # Should trigger resize
+        assert len(ht.buckets) == 16
+        assert self.nodes(ht) > before  # Same nodes plus the new one
+        before = self.nodes(ht)
+        for number in range(4):
+            ht.delete(number)  # Should shrink back down
+        assert len(ht.buckets) == 8
+        assert self.nodes(ht) < before
+        self.assertCountEqual(ht.items(), [(4, 4), (5, 5), (6, 6)])
+
+
+def _nodes(bucket):
+    node = bucket.head
+    while node is not None:
+        yield node
+        node = node.next
+
+
+class IncrementalHashTableTest(unittest.TestCase):
+
+    def test_resize_is_spread_over_operations(self):
+        ht = HashTable(4, incremental=True)
+        ht.set('I', 1)
+        ht.set('V', 5)
+        ht.set('X', 10)
+        ht.set('L', 50)  # Should start a resize, but not move entries yet
+        assert len(ht.buckets) == 8
+        assert ht._old_buckets is not None
+        # Entries are still reachable while the resize is half done
+        assert ht.get('I') == 1
+        assert ht.contains('L') is True
+        ht.get('V')
+        assert ht._old_buckets is None  # Every old bucket was moved over
+        self.assertCountEqual(ht.items(),
+                              [('I', 1), ('V', 5), ('X', 10), ('L', 50)])
+
+    def test_matches_regular_table(self):
+        ht = HashTable(incremental=True)
+        expected = {}
+        for number in range(500):
+            ht.set(number, number)
+            expected[number] = number
+            if number % 3 == 0 and number // 2 in expected:
+                ht.delete(number // 2)
+                del expected[number // 2]
+        assert ht.size == len(expected)
+        self.assertCountEqual(ht.items(), list(expected.items()))
+        for key in list(expected):
+            ht.delete(key)
+        assert ht.size == 0
+        assert ht.keys() == []
+
+    def test_chained_only(self):
+        for storage in ['linear', 'compact']:
+            with self.assertRaises(ValueError):
+                HashTable(8, storage=storage, incremental=True)
+            ht = HashTable(8, storage=storage, incremental=False)
+            assert ht.incremental is False
+            ht = HashTable.from_items([(1, 1)], storage=storage,
+                                      incremental=False)
+            assert ht.get(1) == 1
+
+    def test_positional_arguments(self):
+        ht = HashTable(8, 'chained', True, fibonacci_hash)
+        assert ht.incremental is True
+        assert ht.hash_function is fibonacci_hash
+        for storage in ['linear', 'compact']:
+            ht = HashTable(8, storage, False, fibonacci_hash)
+            assert ht.hash_function is fibonacci_hash
+            ht.set(1, 'one')
+            assert ht.get(1) == 'one'
+            with self.assertRaises(ValueError):
+                HashTable(8, storage, True)
+
+    def test_reading_while_iterating(self):
+        ht = HashTable(4, incremental=True)
+        for number in range(4):
+            ht.set(number, number)
+        assert ht._old_buckets is not None
+        # Reads don't move buckets while a loop is running over the table
+        seen = []
+        for key in ht:
+            assert ht.get(key) == key
+            assert ht.contains(key + 100) is False
+            seen.append(key)
+        self.assertCountEqual(seen, range(4))
+        # Once the loop is done, reads move buckets over again
+        ht.get(0)
+        ht.get(0)
+        assert ht._old_buckets is None
+        # Abandoning a loop halfway lets the resize carry on too
+        for key in ht:
+            break
+        ht.set('A', 1)
+        assert ht._iterators == 0
+        with self.assertRaises(RuntimeError):
+            for key in ht:
+                ht.set(key, 0)
+                ht.set(-key - 1, 0)
+
+
+class LinearProbingHashTableTest(unittest.TestCase):
+
+    def test_init(self):
+        ht = HashTable(4, storage='linear')
+        assert isinstance(ht, LinearProbingHashTable)
+        assert len(ht.slot_keys) == 4
+        assert ht.size == 0
+        with self.assertRaises(ValueError):
+            HashTable(4, storage='cuckoo')
+
+    def test_set_and_get(self):
+        ht = HashTable(storage='linear')
+        ht.set('I', 1)
+        ht.set('V', 5)
+        ht.set('X', 10)
+        ht.set('V', 4)  # Update value
+        assert ht.get('I') == 1
+        assert ht.get('V') == 4
+        assert ht.get('X') == 10
+        assert ht.size == 3
+        assert ht.contains('X') is True
+        assert ht.contains('A') is False
+        self.assertCountEqual(ht.items(), [('I', 1), ('V', 4), ('X', 10)])
+        with self.assertRaises(KeyError):
+            ht.get('A')  # Key does not exist
+
+    def test_resize(self):
+        ht = HashTable(2, storage='linear')
+        ht.set('I', 1)
+        assert len(ht.slot_keys) == 2
+        ht.set('V', 5)  # Should trigger resize
+        assert len(ht.slot_keys) == 4
+        assert ht.load_factor() == 0.5
+        for number in range(100):
+            ht.set(number, number * 2)
+        assert ht.size == 102
+        assert ht.load_factor() <= 0.75
+        assert ht.get(77) == 154
+
+    def test_delete_shifts_collisions_back(self):
+        # Small integers hash to themselves, so 1, 17 and 33 all collide
+        # in a 16 slot table and 2 lands inside their probe run
+        ht = HashTable(16, storage='linear')
+        for key in [1, 17, 2, 33]:
+            ht.set(key, str(key))
+        ht.delete(1)
+        assert ht.get(17) == '17'
+        assert ht.get(2) == '2'
+        assert ht.get(33) == '33'
+        ht.delete(17)
+        assert ht.get(33) == '33'
+        assert ht.size == 2
+        with self.assertRaises(KeyError):
+            ht.delete(17)  # Key no longer exists
+
+    def test_setdefault_and_pop(self):
+        ht = HashTable(storage='linear')
+        assert ht.setdefault('I', 1) == 1
+        assert ht.setdefault('I', 2) == 1
+        assert ht.get('V', 5) == 5
+        assert ht.pop('I') == 1
+        assert ht.pop('I', 0) == 0
+        with self.assertRaises(KeyError):
+            ht.pop('I')  # Key no longer exists
+
+    def test_delete_everything(self):
+        ht = HashTable(storage='linear')
+        for number in range(50):
+            ht.set(number, None)
+        for number in range(50):
+            ht.delete(number)
+        assert ht.size == 0
+        assert ht.keys() == []
+        ht.set('A', 1)  # Still usable after shrinking all the way down
+        assert ht.get('A') == 1
+
+
+class IteratorHashTableTest(unittest.TestCase):
+
+    def test_iterators(self):
+        for storage in ['chained', 'linear', 'compact']:
+            ht = HashTable.from_items([('I', 1), ('V', 5)], storage=storage)
+            self.assertCountEqual(ht.iter_items(), [('I', 1), ('V', 5)])
+            self.assertCountEqual(ht.iter_keys(), ['I', 'V'])
+            self.assertCountEqual(ht.iter_values(), [1, 5])
+            self.assertCountEqual(list(ht), ['I', 'V'])
+            # Generators, not lists
+            assert next(ht.iter_keys()) in ['I', 'V']
+
+    def test_same_key_object_skips_eq(self):
+        for storage in ['chained', 'linear', 'compact']:
+            key = EqualityCountedKey('I')
+            ht = HashTable(storage=storage)
+            ht.set(key, 1)
+            EqualityCountedKey.eq_calls = 0
+            assert ht.get(key) == 1
+            assert ht.contains(key) is True
+            ht.set(key, 2)
+            assert ht.pop(key) == 2
+            assert EqualityCountedKey.eq_calls == 0
+            # Equal but different objects still find it
+            ht.set(key, 3)
+            assert ht.get(EqualityCountedKey('I')) == 3
+
+    def test_dunder_methods(self):
+        for storage in ['chained', 'linear', 'compact']:
+            ht = HashTable(storage=storage)
+            ht['I'] = 1
+            ht['V'] = 5
+            assert len(ht) == 2
+            assert ht['I'] == 1
+            assert 'V' in ht
+            assert 'X' not in ht
+            del ht['V']
+            assert len(ht) == 1
+            with self.assertRaises(KeyError):
+                ht['V']  # Key no longer exists
+
+    def test_fail_fast(self):
+        for storage in ['chained', 'linear', 'compact']:
+            ht = HashTable.from_items([(n, n) for n in range(10)],
+                                      storage=storage)
+            with self.assertRaises(RuntimeError):
+                for key in ht:
+                    ht.set(key + 100, key)
+            ht = HashTable.from_items([(n, n) for n in range(10)],
+                                      storage=storage)
+            with self.assertRaises(RuntimeError):
+                for key in ht:
+                    ht.delete(key)
+
+    def test_updating_values_while_iterating(self):
+        ht = HashTable.from_items([(n, n) for n in range(10)])
+        for key in ht:
+            ht[key] = key * 2  # Existing keys only; nothing moves
+        assert ht.get(9) == 18
+
+
+class CompactHashTableTest(unittest.TestCase):
+
+    def test_init(self):
+        ht = HashTable(4, storage='compact')
+        assert isinstance(ht, CompactHashTable)
+        assert ht.buckets == [None, None, None, None]  # No bucket objects yet
+        assert ht.size == 0
+
+    def test_set_get_and_delete(self):
+        ht = HashTable(storage='compact')
+        ht.set('I', 1)
+        ht.set('V', 5)
+        ht.set('X', 10)
+        ht.set('V', 4)  # Update value
+        assert ht.get('V') == 4
+        assert ht.size == 3
+        self.assertCountEqual(ht.items(), [('I', 1), ('V', 4), ('X', 10)])
+        ht.delete('I')
+        assert ht.contains('I') is False
+        assert ht.setdefault('I', 2) == 2
+        assert ht.pop('X') == 10
+        with self.assertRaises(KeyError):
+            ht.delete('X')  # Key no longer exists
+
+    def test_collisions_and_resize(self):
+        ht = HashTable(2, storage='compact')
+        for number in range(100):
+            ht.set(number, number * 2)
+        assert len(ht.buckets) == 256
+        for number in range(0, 100, 2):
+            ht.delete(number)
+        assert ht.size == 50
+        assert ht.get(51) == 102
+        assert ht.contains(50) is False
+        # Emptied buckets go back to None rather than an empty chain
+        assert ht.buckets.count(None) == len(ht.buckets) - 50
+
+
+class HashFunctionTest(unittest.TestCase):
+
+    def test_custom_hash_function(self):
+        for storage in ['chained', 'linear', 'compact']:
+            # Everything collides, but the table still has to work
+            ht = HashTable(storage=storage, hash_function=lambda key: 7)
+            for number in range(20):
+                ht.set(number, number)
+            ht.delete(3)
+            assert ht.get(19) == 19
+            assert ht.contains(3) is False
+            assert max(ht.chain_lengths()) == 19
+
+    def test_mixers_spread_patterned_keys(self):
+        keys = [number * 1024 for number in range(200)]
+        for hash_function in [fibonacci_hash, mix64_hash, seeded_hash(42)]:
+            plain = HashTable.from_items((key, key) for key in keys)
+            mixed = HashTable.from_items(((key, key) for key in keys),
+                                         hash_function=hash_function)
+            assert max(plain.chain_lengths()) == 200  # All in bucket 0
+            assert max(mixed.chain_lengths()) < 10
+            assert mixed.get(1024 * 150) == 1024 * 150
+
+    def test_seeded_hash(self):
+        assert seeded_hash(1)(12345) == seeded_hash(1)(12345)
+        assert seeded_hash(1)(12345) != seeded_hash(2)(12345)
+        assert seeded_hash()('A') >= 0
+
+    def test_bucket_histogram(self):
+        ht = HashTable(8, hash_function=lambda key: key)
+        ht.update([(0, 'A'), (8, 'B'), (1, 'C')])
+        assert ht.bucket_histogram() == {2: 1, 1: 1, 0: 6}
+        ht = HashTable(8, storage='linear', hash_function=lambda key: key)
+        ht.update([(0, 'A'), (8, 'B'), (1, 'C')])
+        # 8 probes past 0, then 1 gets pushed past 8
+        assert ht.bucket_histogram() == {1: 1, 2: 2}
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'table.htbl')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_save_and_open(self):
+        ht = HashTable()
+        for number in range(1000):
+            ht.set('+1415{}'.format(number), number)
+        ht.set('rate', 0.25)
+        ht.set('negative', -7)
+        ht.set('\u00e9t\u00e9', 2 ** 62)  # Non ASCII keys and big ints
+        ht.save(self.path)
+        with HashTable.open_mmap(self.path) as mapped:
+            assert isinstance(mapped, MappedHashTable)
+            assert len(mapped) == 1003
+            assert mapped.get('+1415999') == 999
+            assert mapped['rate'] == 0.25
+            assert mapped.get('negative') == -7
+            assert mapped.get('\u00e9t\u00e9') == 2 ** 62
+            assert mapped.contains('+14151000') is False
+            assert 'rate' in mapped
+            assert 5 not in mapped  # Non string keys are never there
+            assert mapped.get('missing', None) is None
+            with self.assertRaises(KeyError):
+                mapped.get('missing')
+            self.assertCountEqual(mapped.items(), ht.items())
+
+    def test_save_empty_and_other_engines(self):
+        HashTable(storage='compact').save(self.path)
+        with HashTable.open_mmap(self.path) as mapped:
+            assert mapped.size == 0
+            assert mapped.keys() == []
+        HashTable.from_items([('A', 1)], storage='linear').save(self.path)
+        with HashTable.open_mmap(self.path) as mapped:
+            assert mapped.get('A') == 1
+
+    def test_save_rejects_unsupported_entries(self):
+        with self.assertRaises(TypeError):
+            HashTable.from_items([(1, 1)]).save(self.path)
+        with self.assertRaises(TypeError):
+            HashTable.from_items([('A', 'one')]).save(self.path)
+        with self.assertRaises(TypeError):
+            HashTable.from_items([('A', 2 ** 70)]).save(self.path)
+
+    def test_open_rejects_other_files(self):
+        with open(self.path, 'wb') as other:
+            other.write(b'not a snapshot at all, definitely not')
+        with self.assertRaises(ValueError):
+            HashTable.open_mmap(self.path)
+
+
+class MemoryUsageTest(unittest.TestCase):
+
+    def test_memory_usage(self):
+        for storage in ['chained', 'linear', 'compact']:
+            ht = HashTable(storage=storage)
+            assert ht.memory_usage()['entries'] == 0
+            assert ht.memory_usage()['bytes_per_entry'] == 0
+            ht.update((number, number) for number in range(100))
+            usage = ht.memory_usage()
+            assert usage['entries'] == 100
+            assert usage['bytes'] > 0
+            assert usage['bytes_per_entry'] == usage['bytes'] / 100
+
+    def test_compact_is_smaller(self):
+        pairs = [(number, number) for number in range(1000)]
+        chained = HashTable.from_items(pairs).memory_usage()
+        compact = HashTable.from_items(pairs, storage='compact').memory_usage()
+        assert compact['bytes_per_entry'] < chained['bytes_per_entry']
+
 
 if __name__ == '__main__':
     unittest.main()
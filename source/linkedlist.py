@@ -1,23 +1,78 @@
 # !python
 
+_MISSING = object()  # Default for "no item given", since None is an item
+
+
 class Node(object):
+    # No per-node __dict__; a list can have a lot of these
+    __slots__ = ('data', 'next', 'prev', 'pinned')
+
     def __init__(self, data):
         """Initialize this node with the given data."""
         self.data = data
         self.next = None
         self.prev = None
+        # True once the node was handed out as a handle, so it must never
+        # be recycled by a NodePool (the handle would start holding new data)
+        self.pinned = False
 
     def __repr__(self):
         """Return a string representation of this node."""
         return 'Node({!r})'.format(self.data)
 
+class NodePool(object):
+    """Bounded free list of spare Nodes. A list using a pool takes nodes
+    from here instead of creating new ones, and gives back the nodes it
+    removes, so code that keeps adding and removing (like a queue) stops
+    allocating once it reaches a steady size.
+    Nodes handed out as handles (by insert_after and insert_before) are
+    pinned and never come back here, so a handle always keeps its own data."""
+
+    def __init__(self, max_size=1024):
+        """Initialize this pool, keeping at most max_size spare nodes."""
+        self.max_size = max_size
+        self.free = []  # Spare nodes, ready to reuse
+        self.allocated = 0  # Number of brand new nodes handed out
+        self.reused = 0  # Number of spare nodes handed out
+
+    def __repr__(self):
+        """Return a string representation of this pool."""
+        return 'NodePool({} free, allocated={}, reused={})'.format(
+            len(self.free), self.allocated, self.reused)
+
+    def acquire(self, data):
+        """Return a node holding the given data, reusing a spare if any.
+        Running time: O(1)"""
+        if self.free:
+            node = self.free.pop()
+            node.data = data
+            self.reused += 1
+            return node
+        self.allocated += 1
+        return Node(data)
+
+    def release(self, node):
+        """Take back a node nothing points to anymore, if there's room and
+        it was never handed out as a handle.
+        Running time: O(1)"""
+        if not node.pinned and len(self.free) < self.max_size:
+            # Don't keep the old data (or neighbours) alive
+            node.data = node.next = node.prev = None
+            self.free.append(node)
+
+
 class LinkedList(object):
     """DOUBLE linked list."""
-    def __init__(self, iterable=None):
-        """Initialize this linked list and append the given items, if any."""
+    def __init__(self, iterable=None, pool=None):
+        """Initialize this linked list and append the given items, if any.
+        If a NodePool is given, nodes come from and go back to it."""
         self.head = None  # First node
         self.tail = None  # Last node
         self.size = 0  # Number of nodes
+        self.pool = pool
+        # Last node reached by index, as (node, index), so the next index
+        # lookup near it can walk from there; None when we don't have one
+        self._finger = None
         # Append the given items
         if iterable is not None:
             for item in iterable:
@@ -25,13 +80,37 @@ class LinkedList(object):
 
     def __str__(self):
         """Return a formatted string representation of this linked list."""
-        items = ['({!r})'.format(item) for item in self.items()]
+        items = ['({!r})'.format(item) for item in self]
         return '[{}]'.format(' -> '.join(items))
 
     def __repr__(self):
         """Return a string representation of this linked list."""
         return 'LinkedList({!r})'.format(self.items())
 
+    def __iter__(self):
+        """Return a generator over the items from head to tail. Nothing is
+        copied, so stopping early costs only the nodes visited."""
+        return self.iter_from(self.head)
+
+    def __reversed__(self):
+        """Return a generator over the items from tail to head."""
+        return self.iter_from(self.tail, reverse=True)
+
+    def __len__(self):
+        """Return the number of items in this linked list."""
+        return self.size
+
+    def iter_from(self, node, reverse=False):
+        """Yield the items from the given node (included) to the tail, or to
+        the head if reverse is True. Each step is O(1), so it's a cursor
+        that can pick up wherever a node handle points.
+        Running time: O(1) per item"""
+        while node is not None:
+            # Step first, in case the caller unlinks the node we yielded
+            following = node.prev if reverse else node.next
+            yield node.data
+            node = following
+
     def items(self):
         """Return a list of all items in this linked list.
         Best and worst case running time: Theta(n) for n items in the list
@@ -71,50 +150,105 @@ class LinkedList(object):
         return self.head is None
 
     def length(self):
-        """Return the length of this linked list by traversing its nodes.
-        Best case: Constant time; if empty, just returns 0
-        Worst case: Theta(n). Goes through entire list and adds 1 per n
-        """
-        # Node counter initialized to zero
-        node_count = 0
-        # Start at the head node
+        """Return the length of this linked list.
+        Best and worst case: O(1); every method that adds or removes nodes
+        keeps size up to date (check_invariants double-checks that)"""
+        return self.size
+
+    def check_invariants(self):
+        """Walk the list once and raise AssertionError if size, head, tail,
+        the finger or any prev/next pair disagree with the nodes. Slow; meant
+        for tests and debugging, not for normal use.
+        Best and worst case: Theta(n)"""
+        count = 0
+        previous = None
         node = self.head
-        # Loop until the node is None, which is one node too far past the tail
+        finger_seen = self._finger is None
         while node is not None:
-            # Count one for this node
-            node_count += 1
-            # Skip to the next node
+            if node.prev is not previous:
+                raise AssertionError('Node {} at index {} has prev {!r}, '
+                                     'expected {!r}'.format(
+                                         node, count, node.prev, previous))
+            if not finger_seen and node is self._finger[0]:
+                if self._finger[1] != count:
+                    raise AssertionError('Finger says index {}, node is at '
+                                         '{}'.format(self._finger[1], count))
+                finger_seen = True
+            count += 1
+            # A cycle would otherwise loop forever
+            if count > self.size:
+                raise AssertionError('More nodes than size {}'
+                                     .format(self.size))
+            previous = node
             node = node.next
-        # Now node_count contains the number of nodes
-        return node_count
+        if count != self.size:
+            raise AssertionError('Counted {} nodes, size is {}'
+                                 .format(count, self.size))
+        if self.tail is not previous:
+            raise AssertionError('Tail is {!r}, last node is {!r}'
+                                 .format(self.tail, previous))
+        if not finger_seen:
+            raise AssertionError('Finger {!r} is not in the list'
+                                 .format(self._finger[0]))
+
+    def first(self):
+        """Return the item at the head, or raise ValueError if empty."""
+        if self.head is None:
+            raise ValueError('List is empty')
+        return self.head.data
+
+    def last(self):
+        """Return the item at the tail, or raise ValueError if empty."""
+        if self.tail is None:
+            raise ValueError('List is empty')
+        return self.tail.data
 
     def get_at_index(self, index):
         """Return the item at the given index in this linked list, or
         raise ValueError if the given index is out of range of the list size.
         Best case (error): Theta(2); after comparison, raise Value
-        Best case (success): Constant; it's at the 0th index or tail
-            No for loop; just goes to returns immediately.
-        Worst case: Theta(n-1); near end of index.
+        Best case (success): Constant; it's the head, the tail, or right
+            next to the last index we looked up.
+        Worst case: Theta(n/2); in the middle, far from the last lookup.
+        Walking through indexes in order is amortised O(1) per call.
         """
         # Check if the given index is out of range and if so raise an error
         if not (0 <= index < self.size):
             raise ValueError('List index out of range: {}'.format(index))
-        # if it's at the end, just return it. Might as well, right?
-        if index == self.size:
-            return self.tail.data
-
-        counter = self.head
-        # Otherwise, let's go through the list unless it's you're
-        # Looking at the tip; if so, well, it's the head, return that.
-        for i in range(index):
-            counter = counter.next
-        return counter.data
+        return self._node_at(index).data
+
+    def _node_at(self, index):
+        """Return the node at the given (valid) index. Walks from whichever
+        is closest: the head, the tail, or the last node found by index.
+        Best case: O(1) at either end or next to the last index found
+        Worst case: O(n/2) in the middle with nothing cached nearby"""
+        # Start from the head, walking forwards...
+        node, position = self.head, 0
+        distance = index
+        # ...unless walking backwards from the tail is shorter...
+        if self.size - 1 - index < distance:
+            node, position = self.tail, self.size - 1
+            distance = self.size - 1 - index
+        # ...or the last node we found by index is closer still
+        if self._finger is not None:
+            finger_node, finger_index = self._finger
+            if abs(index - finger_index) < distance:
+                node, position = finger_node, finger_index
+        while position < index:
+            node = node.next
+            position += 1
+        while position > index:
+            node = node.prev
+            position -= 1
+        self._finger = (node, index)
+        return node
 
     def insert_at_index(self, index, item):
         """Insert the given item at the given index in this linked list, or
         raise ValueError if the given index is out of range of the list size.
         Best case (Success): Constant; if head/tail, it's just append/prepend
-        Worst case: Theta(index) and assignments.
+            or right next to the last index we looked up
+        Worst case: Theta(n/2) and assignments, in the middle.
         """
         # Check if the given index is out of range and if so raise an error
         if not (0 <= index <= self.size):
@@ -127,11 +261,9 @@ class LinkedList(object):
             self.append(item)
         # For everything else...
         else:
-            new_node = Node(item)
-            old_node = self.head
-            # We loop through till we find index
-            for i in range(index):
-                old_node = old_node.next
+            new_node = self._new_node(item)
+            # Find the node currently at index, from whichever end is closer
+            old_node = self._node_at(index)
             # Previous node's next node becomes this one
             # This one's previous node is now the next node
             old_node.prev.next = new_node
@@ -142,6 +274,8 @@ class LinkedList(object):
             new_node.next = old_node
             # Can't forget that it got bigger
             self.size += 1
+            # The new node is at index now, so that's our finger
+            self._finger = (new_node, index)
 
     def append(self, item):
         """Insert the given item at the tail of this linked list.
@@ -149,7 +283,7 @@ class LinkedList(object):
         Worst: Constant; if not empty, 1 comparison, 5 assignments
         """
         # Create a new node to hold the given item
-        new_node = Node(item)
+        new_node = self._new_node(item)
         # Check if this linked list is empty
         if self.is_empty():
             # Assign head to new node
@@ -169,7 +303,7 @@ class LinkedList(object):
         Worst: Constant; if not empty, 1 comparison, 5 assignments
         """
         # Create a new node to hold the given item
-        new_node = Node(item)
+        new_node = self._new_node(item)
         # Check if this linked list is empty
         if self.is_empty():
             # Assign tail to new node
@@ -181,6 +315,15 @@ class LinkedList(object):
         # Update head to new node regardless
         self.head = new_node
         self.size += 1
+        # Everything moved up one index, including the finger
+        if self._finger is not None:
+            self._finger = (self._finger[0], self._finger[1] + 1)
+
+    def _new_node(self, item):
+        """Return a node for the given item, from the pool if we have one."""
+        if self.pool is not None:
+            return self.pool.acquire(item)
+        return Node(item)
 
     def find(self, quality):
         """Return an item from this linked list satisfying the given quality.
@@ -200,6 +343,85 @@ class LinkedList(object):
         # We never found data satisfying quality, but have to return something
         return None  # Constant time to return None
 
+    def find_all(self, quality=None, *, item=_MISSING):
+        """Return a list of every item satisfying the given quality, or equal
+        to the given item. Comparing to an item skips calling a function per
+        node, so it's the faster way to match on plain values.
+        Best and worst case: Theta(n); one pass over the nodes"""
+        quality = _check_match(quality, item)
+        result = []
+        node = self.head
+        if quality is None:
+            while node is not None:
+                if node.data == item:
+                    result.append(node.data)
+                node = node.next
+        else:
+            while node is not None:
+                if quality(node.data):
+                    result.append(node.data)
+                node = node.next
+        return result
+
+    def count_if(self, quality=None, *, item=_MISSING):
+        """Return how many items satisfy the given quality, or equal the
+        given item.
+        Best and worst case: Theta(n); one pass over the nodes"""
+        quality = _check_match(quality, item)
+        count = 0
+        node = self.head
+        if quality is None:
+            while node is not None:
+                if node.data == item:
+                    count += 1
+                node = node.next
+        else:
+            while node is not None:
+                if quality(node.data):
+                    count += 1
+                node = node.next
+        return count
+
+    def remove_if(self, quality=None, *, item=_MISSING):
+        """Remove every item satisfying the given quality, or equal to the
+        given item, and return how many were removed.
+        Best and worst case: Theta(n); one pass, each unlink is O(1)"""
+        quality = _check_match(quality, item)
+        count = 0
+        node = self.head
+        while node is not None:
+            following = node.next
+            if node.data == item if quality is None else quality(node.data):
+                self.unlink(node)
+                if self.pool is not None:
+                    self.pool.release(node)
+                count += 1
+            node = following
+        return count
+
+    def index_of(self, quality=None, *, item=_MISSING):
+        """Return the index of the first item satisfying the given quality,
+        or equal to the given item, or raise ValueError if there's none.
+        Best case: O(1) if it's the head
+        Worst case: Theta(n) if it's the tail or not there"""
+        quality = _check_match(quality, item)
+        index = 0
+        node = self.head
+        if quality is None:
+            while node is not None and node.data != item:
+                node = node.next
+                index += 1
+        else:
+            while node is not None and not quality(node.data):
+                node = node.next
+                index += 1
+        if node is None:
+            raise ValueError('Item not found: {}'.format(
+                item if quality is None else quality))
+        # We know where it is now, so the next index lookup can start here
+        self._finger = (node, index)
+        return index
+
     def replace(self, old_item, new_item):
         """Replace the given old_item in this linked list with given new_item
         using the same node, or raise ValueError if old_item is not found.
@@ -241,39 +463,187 @@ class LinkedList(object):
                 node = node.next
         # Check if we found the given item or we never did and reached the tail
         if found:
-            self.size -= 1
-            # Check if we found a node in the middle of this linked list
-            if node is not self.head and node is not self.tail:
-                # Update the previous node to skip around the found node
-                node.prev.next = node.next
-                node.next.prev = node.prev
-                # Unlink the found node from its next node
-                node.next = None
-            # Check if we found a node at the head
-            if node is self.head:
-                # Update head to the next node
-                self.head = node.next
-                if node.next is not None:
-                    node.next.prev = None
-                # Unlink the found node from the next node
-                node.next = None
-            # Check if we found a node at the tail
-            if node is self.tail:
-                # Check if there is a node before the found node
-                if node.prev is not None:
-                    # Unlink the previous node from the found node
-                    node.prev.next = None
-                # Update tail to the previous node regardless
-                self.tail = node.prev
+            self.unlink(node)
+            # The pool skips pinned nodes, so any handle to it stays good
+            if self.pool is not None:
+                self.pool.release(node)
         else:
             # Otherwise raise an error to tell the user that delete has failed
             raise ValueError('Item not found: {}'.format(item))
 
+    def unlink(self, node):
+        """Remove the given node (which must be in this list) from the list.
+        Lets callers that already found a node skip searching for it again.
+        Best and worst case: O(1); only the neighbours get relinked"""
+        self.size -= 1
+        # We don't know the node's index, so the finger may be off now
+        self._finger = None
+        # Update the previous node (or head) to skip around the node
+        if node.prev is not None:
+            node.prev.next = node.next
+        else:
+            self.head = node.next
+        # Update the next node (or tail) to skip around the node
+        if node.next is not None:
+            node.next.prev = node.prev
+        else:
+            self.tail = node.prev
+        # Unlink the node from its old neighbours
+        node.next = None
+        node.prev = None
+
+    def insert_after(self, node, item):
+        """Insert the given item right after the given node (which must be
+        in this list) and return the new node. The node is pinned, so a
+        NodePool won't recycle it after it's removed.
+        Best and worst case: O(1); no searching, just relinking"""
+        if node is self.tail:
+            self.append(item)
+            self.tail.pinned = True
+            return self.tail
+        new_node = self._new_node(item)
+        new_node.pinned = True
+        new_node.prev = node
+        new_node.next = node.next
+        node.next.prev = new_node
+        node.next = new_node
+        self.size += 1
+        # We don't know the node's index, so the finger may be off now
+        self._finger = None
+        return new_node
+
+    def insert_before(self, node, item):
+        """Insert the given item right before the given node (which must be
+        in this list) and return the new node (pinned, like insert_after).
+        Best and worst case: O(1); no searching, just relinking"""
+        if node is self.head:
+            self.prepend(item)
+            self.head.pinned = True
+            return self.head
+        return self.insert_after(node.prev, item)
+
+    def move_to_front(self, node):
+        """Move the given node (which must be in this list) to the head.
+        The node object itself moves, so handles to it stay good.
+        Best and worst case: O(1)"""
+        if node is self.head:
+            return
+        self.unlink(node)
+        node.next = self.head
+        if self.head is None:
+            self.tail = node
+        else:
+            self.head.prev = node
+        self.head = node
+        self.size += 1
+
+    def move_to_back(self, node):
+        """Move the given node (which must be in this list) to the tail.
+        The node object itself moves, so handles to it stay good.
+        Best and worst case: O(1)"""
+        if node is self.tail:
+            return
+        self.unlink(node)
+        self.append_node(node)
+
+    def append_node(self, node):
+        """Link the given node, which isn't in any list, in at the tail.
+        For moving nodes between lists without allocating new ones.
+        Best and worst case: O(1)"""
+        node.next = None
+        node.prev = self.tail
+        if self.tail is None:
+            self.head = node
+        else:
+            self.tail.next = node
+        self.tail = node
+        self.size += 1
+
+    def splice(self, other):
+        """Move every node of the other linked list onto the end of this
+        one, leaving the other one empty. Just relinks head and tail.
+        Best and worst case: O(1)"""
+        if other is self or other.head is None:
+            return
+        if self.tail is None:
+            self.head = other.head
+        else:
+            self.tail.next = other.head
+            other.head.prev = self.tail
+        self.tail = other.tail
+        self.size += other.size
+        # Our indexes didn't change; the other list has nothing left
+        other.head = other.tail = None
+        other.size = 0
+        other._finger = None
+
+    def concat(self, *others):
+        """Splice each of the given linked lists onto the end of this one,
+        in order, and return this list.
+        Best and worst case: O(k) for k lists, whatever their lengths"""
+        for other in others:
+            self.splice(other)
+        return self
+
+    def extend(self, iterable):
+        """Append every item of the given iterable. The new nodes are chained
+        together on their own first and then linked in all at once.
+        Best and worst case: O(k) for k items"""
+        first = last = None
+        count = 0
+        for item in iterable:
+            node = self._new_node(item)
+            if first is None:
+                first = node
+            else:
+                last.next = node
+                node.prev = last
+            last = node
+            count += 1
+        if first is None:
+            return
+        if self.tail is None:
+            self.head = first
+        else:
+            self.tail.next = first
+            first.prev = self.tail
+        self.tail = last
+        self.size += count
+
+    def split_at(self, index):
+        """Cut this linked list in two: keep the items before the given index
+        and return a new LinkedList with the rest (same nodes, not copies).
+        Raise ValueError if the index is out of range of the list size.
+        Best case: O(1) at either end or next to the last index found
+        Worst case: O(n/2) to find the node at index"""
+        if not (0 <= index <= self.size):
+            raise ValueError('List index out of range: {}'.format(index))
+        rest = LinkedList(pool=self.pool)
+        if index == self.size:
+            return rest
+        node = self._node_at(index)
+        rest.head = node
+        rest.tail = self.tail
+        rest.size = self.size - index
+        self.tail = node.prev
+        if node.prev is None:
+            self.head = None
+        else:
+            node.prev.next = None
+        node.prev = None
+        self.size = index
+        # The finger was just set to the node we moved out
+        self._finger = None
+        return rest
+
     def remove_tail(self):
         """Delete the tail specifically."""
         # The one before the tail now points to None
         # Tail is now the previous; return front
         oldtail = self.tail
+        # No other index changes, unless the finger was on the tail
+        if self._finger is not None and self._finger[0] is oldtail:
+            self._finger = None
         if oldtail.prev is not None:
             oldtail.prev.next = None
             self.tail = oldtail.prev
@@ -282,13 +652,22 @@ class LinkedList(object):
         else:
             self.head = self.tail = None
             self.size -= 1
-        return oldtail.data
+        data = oldtail.data
+        if self.pool is not None:
+            self.pool.release(oldtail)
+        return data
 
     def remove_head(self):
         """Delete the head specifically."""
         # The one after the head's prev now leads to nothing
         #
         oldhead = self.head
+        # Everything moves down one index; the finger goes if it was the head
+        if self._finger is not None:
+            if self._finger[0] is oldhead:
+                self._finger = None
+            else:
+                self._finger = (self._finger[0], self._finger[1] - 1)
         if oldhead.next is not None:
             oldhead.next.prev = None
             self.head = oldhead.next
@@ -297,7 +676,22 @@ class LinkedList(object):
         else:
             self.head = self.tail = None
             self.size -= 1
-        return oldhead.data
+        data = oldhead.data
+        if self.pool is not None:
+            self.pool.release(oldhead)
+        return data
+
+
+def _check_match(quality, item):
+    """Make sure exactly one of quality and item was given, and return the
+    quality (None means compare against item). item is keyword only, so
+    find_all(7) would otherwise fail later calling 7 on every node."""
+    if (quality is None) == (item is _MISSING):
+        raise TypeError('Pass either a quality function or an item')
+    if quality is not None and not callable(quality):
+        raise TypeError('quality must be a function; to match an item, '
+                        'pass item={!r}'.format(quality))
+    return quality
 
 
 def test_linked_list():
@@ -1,6 +1,7 @@
 #!python
 
-from linkedlist import LinkedList, Node
+from linkedlist import LinkedList, Node, NodePool
+import random
 import unittest
 
 
@@ -12,6 +13,57 @@ class NodeTest(unittest.TestCase):
         assert node.data is data
         assert node.next is None
 
+    def test_slots(self):
+        node = Node('ABC')
+        assert not hasattr(node, '__dict__')
+        with self.assertRaises(AttributeError):
+            node.color = 'red'
+
+
+class NodePoolTest(unittest.TestCase):
+
+    def test_recycles_nodes(self):
+        pool = NodePool()
+        ll = LinkedList(['A', 'B'], pool=pool)
+        assert pool.allocated == 2
+        tail = ll.tail
+        assert ll.remove_tail() == 'B'
+        assert tail.data is None  # released nodes drop their data
+        ll.append('C')
+        assert ll.tail is tail  # same node object, reused
+        assert pool.allocated == 2
+        assert pool.reused == 1
+        ll.remove_head()
+        ll.delete('C')
+        ll.prepend('D')
+        ll.insert_at_index(1, 'E')
+        assert ll.items() == ['D', 'E']
+        assert pool.allocated == 2
+        assert pool.reused == 3
+
+    def test_handles_not_recycled(self):
+        pool = NodePool()
+        ll = LinkedList(['A', 'C'], pool=pool)
+        handle = ll.insert_after(ll.head, 'B')
+        front = ll.insert_before(ll.head, 'Z')
+        ll.delete('B')
+        ll.remove_head()
+        ll.append('X')
+        ll.append('Y')
+        assert handle.data == 'B'  # still its own node, not reused
+        assert front.data == 'Z'
+        assert pool.free == []
+        ll.move_to_front(ll.tail)
+        assert ll.items() == ['Y', 'A', 'C', 'X']
+        ll.check_invariants()
+
+    def test_bounded(self):
+        pool = NodePool(max_size=2)
+        ll = LinkedList(range(5), pool=pool)
+        while not ll.is_empty():
+            ll.remove_head()
+        assert len(pool.free) == 2
+
 
 class LinkedListTest(unittest.TestCase):
 
@@ -27,6 +79,15 @@ class LinkedListTest(unittest.TestCase):
         assert ll.tail.data == 'C'  # last item
         assert ll.size == 3
 
+    def test_first_and_last(self):
+        ll = LinkedList(['A', 'B', 'C'])
+        assert ll.first() == 'A'
+        assert ll.last() == 'C'
+        with self.assertRaises(ValueError):
+            LinkedList().first()
+        with self.assertRaises(ValueError):
+            LinkedList().last()
+
     def test_items(self):
         ll = LinkedList()
         assert ll.items() == []
@@ -37,6 +98,30 @@ class LinkedListTest(unittest.TestCase):
         ll.append('C')
         assert ll.items() == ['A', 'B', 'C']
 
+    def test_iter(self):
+        ll = LinkedList()
+        assert list(ll) == []
+        assert list(reversed(ll)) == []
+        ll = LinkedList(['A', 'B', 'C'])
+        assert list(ll) == ['A', 'B', 'C']
+        assert list(reversed(ll)) == ['C', 'B', 'A']
+        assert len(ll) == 3
+        assert 'B' in ll
+        iterator = iter(ll)
+        assert next(iterator) == 'A'  # lazy; nothing else visited yet
+
+    def test_iter_from(self):
+        ll = LinkedList(['A', 'B', 'C', 'D'])
+        middle = ll.head.next
+        assert list(ll.iter_from(middle)) == ['B', 'C', 'D']
+        assert list(ll.iter_from(middle, reverse=True)) == ['B', 'A']
+        assert list(ll.iter_from(None)) == []
+        # Unlinking the node just yielded doesn't stop the walk
+        for item in ll.iter_from(ll.head):
+            if item == 'B':
+                ll.unlink(middle)
+        assert ll.items() == ['A', 'C', 'D']
+
     def test_length(self):
         ll = LinkedList()
         assert ll.length() == 0
@@ -83,6 +168,33 @@ class LinkedListTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             ll.get_at_index(-1)  # index too low
 
+    def test_get_at_index_from_either_end(self):
+        ll = LinkedList(range(10))
+        assert ll.get_at_index(9) == 9  # walks back from the tail
+        assert ll.get_at_index(8) == 8  # one step from the finger
+        assert ll._finger == (ll.tail.prev, 8)
+        assert [ll.get_at_index(i) for i in range(10)] == list(range(10))
+        assert [ll.get_at_index(i) for i in reversed(range(10))] == \
+            list(reversed(range(10)))
+
+    def test_finger_survives_changes(self):
+        ll = LinkedList(['B', 'C', 'D'])
+        assert ll.get_at_index(1) == 'C'
+        ll.prepend('A')  # finger shifts up one index
+        assert ll.get_at_index(2) == 'C'
+        ll.remove_head()  # and back down again
+        assert ll.get_at_index(1) == 'C'
+        ll.insert_at_index(1, 'X')
+        assert ll.items() == ['B', 'X', 'C', 'D']
+        assert ll.get_at_index(2) == 'C'
+        ll.remove_tail()
+        ll.delete('X')
+        assert ll.get_at_index(1) == 'C'
+        ll.remove_tail()  # finger was on the tail
+        assert ll.get_at_index(0) == 'B'
+        ll.remove_head()  # and on the head
+        assert ll.size == 0
+
     def test_insert_at_index(self):
         ll = LinkedList()
         ll.insert_at_index(0, 'B')  # append('B')
@@ -143,6 +255,50 @@ class LinkedListTest(unittest.TestCase):
         assert ll.find(lambda item: item > 'B') == 'C'
         assert ll.find(lambda item: item == 'X') is None
 
+    def test_find_all_and_count_if(self):
+        ll = LinkedList([1, 2, 3, 2, 4])
+        assert ll.find_all(lambda item: item % 2 == 0) == [2, 2, 4]
+        assert ll.find_all(item=2) == [2, 2]
+        assert ll.find_all(item=9) == []
+        assert ll.count_if(lambda item: item > 1) == 4
+        assert ll.count_if(item=2) == 2
+        assert LinkedList().count_if(item=None) == 0
+        with self.assertRaises(TypeError):
+            ll.find_all()  # neither quality nor item
+        with self.assertRaises(TypeError):
+            ll.count_if(lambda item: True, item=2)  # both
+        # Items are matched by keyword in all four, never by position
+        for method in [ll.find_all, ll.count_if, ll.remove_if, ll.index_of]:
+            with self.assertRaises(TypeError):
+                method(2)
+        assert ll.index_of(lambda item: item > 2) == 2
+
+    def test_remove_if(self):
+        pool = NodePool()
+        ll = LinkedList([1, 2, 3, 2, 4], pool=pool)
+        assert ll.remove_if(item=2) == 2
+        assert ll.items() == [1, 3, 4]
+        assert len(pool.free) == 2
+        assert ll.remove_if(lambda item: item != 3) == 2
+        assert ll.items() == [3]
+        assert ll.remove_if(item=3) == 1
+        assert ll.is_empty() is True
+        assert ll.tail is None
+        assert ll.remove_if(item=3) == 0
+
+    def test_index_of(self):
+        ll = LinkedList(['A', 'B', 'C', 'B'])
+        assert ll.index_of(item='A') == 0
+        assert ll.index_of(item='B') == 1
+        assert ll.index_of(quality=lambda item: item > 'B') == 2
+        # index_of leaves the finger on what it found
+        assert ll.get_at_index(2) == 'C'
+        ll.check_invariants()
+        with self.assertRaises(ValueError):
+            ll.index_of(item='Z')
+        # None is an item like any other
+        assert LinkedList([None]).index_of(item=None) == 0
+
     def test_replace(self):
         ll = LinkedList(['A', 'B', 'C'])
         ll.replace('A', 'D')
@@ -177,6 +333,102 @@ class LinkedListTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             ll.delete('X')  # item not in list
 
+    def test_unlink(self):
+        ll = LinkedList(['A', 'B', 'C', 'D'])
+        ll.unlink(ll.head.next)  # middle node
+        assert ll.items() == ['A', 'C', 'D']
+        ll.unlink(ll.tail)
+        assert ll.items() == ['A', 'C']
+        assert ll.rev_items() == ['C', 'A']
+        ll.unlink(ll.head)
+        assert ll.head.data == 'C'
+        assert ll.head.prev is None
+        ll.unlink(ll.head)
+        assert ll.head is None
+        assert ll.tail is None
+        assert ll.size == 0
+
+    def test_insert_after_and_before(self):
+        ll = LinkedList(['A', 'C'])
+        node = ll.insert_after(ll.head, 'B')
+        assert node.data == 'B'
+        assert ll.items() == ['A', 'B', 'C']
+        ll.insert_after(ll.tail, 'D')
+        assert ll.tail.data == 'D'
+        ll.insert_before(node, 'AB')
+        ll.insert_before(ll.head, 'Z')
+        assert ll.items() == ['Z', 'A', 'AB', 'B', 'C', 'D']
+        assert ll.rev_items() == ['D', 'C', 'B', 'AB', 'A', 'Z']
+        assert ll.size == 6
+
+    def test_move_to_front_and_back(self):
+        ll = LinkedList(['A', 'B', 'C'])
+        middle = ll.head.next
+        ll.move_to_front(middle)
+        assert ll.items() == ['B', 'A', 'C']
+        assert ll.head is middle  # same node, not a copy
+        ll.move_to_front(middle)  # already there
+        ll.move_to_back(middle)
+        assert ll.items() == ['A', 'C', 'B']
+        assert ll.rev_items() == ['B', 'C', 'A']
+        ll.move_to_back(ll.head)
+        assert ll.items() == ['C', 'B', 'A']
+        assert ll.size == 3
+        assert ll.get_at_index(1) == 'B'
+        ll = LinkedList(['A'])
+        ll.move_to_back(ll.head)
+        ll.move_to_front(ll.tail)
+        assert ll.items() == ['A']
+
+    def test_splice(self):
+        ll = LinkedList(['A', 'B'])
+        other = LinkedList(['C', 'D'])
+        first_of_other = other.head
+        ll.splice(other)
+        assert ll.items() == ['A', 'B', 'C', 'D']
+        assert ll.rev_items() == ['D', 'C', 'B', 'A']
+        assert ll.head.next.next is first_of_other  # moved, not copied
+        assert ll.size == 4
+        assert other.is_empty() is True
+        assert other.size == 0
+        empty = LinkedList()
+        empty.splice(ll)
+        assert empty.items() == ['A', 'B', 'C', 'D']
+        empty.splice(LinkedList())
+        assert empty.size == 4
+
+    def test_concat(self):
+        ll = LinkedList(['A']).concat(LinkedList(['B']), LinkedList(),
+                                      LinkedList(['C', 'D']))
+        assert ll.items() == ['A', 'B', 'C', 'D']
+        assert ll.tail.data == 'D'
+
+    def test_extend(self):
+        ll = LinkedList()
+        ll.extend([])
+        assert ll.is_empty() is True
+        ll.extend(item for item in 'AB')
+        ll.extend(['C', 'D'])
+        assert ll.items() == ['A', 'B', 'C', 'D']
+        assert ll.rev_items() == ['D', 'C', 'B', 'A']
+        assert ll.size == 4
+
+    def test_split_at(self):
+        ll = LinkedList(['A', 'B', 'C', 'D'])
+        rest = ll.split_at(1)
+        assert ll.items() == ['A']
+        assert ll.tail.next is None
+        assert rest.items() == ['B', 'C', 'D']
+        assert rest.rev_items() == ['D', 'C', 'B']
+        assert (ll.size, rest.size) == (1, 3)
+        assert rest.split_at(3).is_empty() is True
+        everything = rest.split_at(0)
+        assert rest.is_empty() is True
+        assert rest.tail is None
+        assert everything.items() == ['B', 'C', 'D']
+        with self.assertRaises(ValueError):
+            everything.split_at(4)  # index too high
+
     def test_double(self):
         """The reversed linked list makes use of previous nodes"""
         """Reversed LinkedList which uses prev to traverse should work."""
@@ -195,6 +447,65 @@ class LinkedListTest(unittest.TestCase):
         assert ll.rev_items()[1] == 'C'
         assert ll.rev_items()[2] == 'A'
 
+    def test_check_invariants(self):
+        ll = LinkedList(['A', 'B', 'C'])
+        ll.check_invariants()
+        LinkedList().check_invariants()
+        ll.size = 4
+        with self.assertRaises(AssertionError):
+            ll.check_invariants()
+        ll.size = 3
+        ll.tail = ll.head
+        with self.assertRaises(AssertionError):
+            ll.check_invariants()
+        ll.tail = ll.head.next.next
+        ll.head.next.prev = None
+        with self.assertRaises(AssertionError):
+            ll.check_invariants()
+        ll.head.next.prev = ll.head
+        ll.tail.next = ll.head  # a cycle
+        with self.assertRaises(AssertionError):
+            ll.check_invariants()
+        ll.tail.next = None
+        ll._finger = (ll.tail, 1)
+        with self.assertRaises(AssertionError):
+            ll.check_invariants()
+
+    def test_invariants_hold_under_random_operations(self):
+        rand = random.Random(4)
+        ll = LinkedList(pool=NodePool(max_size=8))
+        expected = []
+        for step in range(3000):
+            choice = rand.randrange(8)
+            if choice == 0:
+                ll.append(step)
+                expected.append(step)
+            elif choice == 1:
+                ll.prepend(step)
+                expected.insert(0, step)
+            elif choice == 2 and expected:
+                assert ll.remove_head() == expected.pop(0)
+            elif choice == 3 and expected:
+                assert ll.remove_tail() == expected.pop()
+            elif choice == 4:
+                index = rand.randrange(len(expected) + 1)
+                ll.insert_at_index(index, step)
+                expected.insert(index, step)
+            elif choice == 5 and expected:
+                index = rand.randrange(len(expected))
+                assert ll.get_at_index(index) == expected[index]
+            elif choice == 6 and expected:
+                item = rand.choice(expected)
+                ll.delete(item)
+                expected.remove(item)
+            elif choice == 7:
+                rest = ll.split_at(rand.randrange(len(expected) + 1))
+                rest.check_invariants()
+                ll.splice(rest)
+            ll.check_invariants()
+            assert ll.length() == len(expected)
+        assert ll.items() == expected
+
 
 
 
@@ -1,6 +1,6 @@
 #!python
 
-from linkedlist import LinkedList
+from arraylinkedlist import ArrayLinkedList
 
 
 # Implement LinkedQueue below, then change the assignment at the bottom
@@ -9,8 +9,9 @@ class LinkedQueue(object):
 
     def __init__(self, iterable=None):
         """Initialize this queue and enqueue the given items, if any."""
-        # Initialize a new linked list to store the items
-        self.list = LinkedList()
+        # Initialize a new linked list to store the items; queues churn
+        # through nodes, so keep them in reusable array slots instead
+        self.list = ArrayLinkedList()
         if iterable is not None:
             for item in iterable:
                 self.enqueue(item)
@@ -37,7 +38,7 @@ class LinkedQueue(object):
         or None if this queue is empty."""
         if self.is_empty():
             return None
-        return self.list.tail.data
+        return self.list.last()
 
     def dequeue(self):
         """Remove and return the item at the front of this queue,
@@ -51,8 +52,9 @@ class DeQueue(object):
     """Gee, it sure is easier to do this with a double linked list."""
     def __init__(self, iterable=None):
         """Initialize this queue and enqueue the given items, if any."""
-        # Initialize a new linked list to store the items
-        self.list = LinkedList()
+        # Initialize a new linked list to store the items; queues churn
+        # through nodes, so keep them in reusable array slots instead
+        self.list = ArrayLinkedList()
         if iterable is not None:
             for item in iterable:
                 self.enqueue_back(item)
@@ -84,14 +86,14 @@ class DeQueue(object):
         or None if this queue is empty."""
         if self.is_empty():
             return None
-        return self.list.tail.data
+        return self.list.last()
 
     def back(self):
         """Return the item at the back of this queue without removing it,
         or None if this queue is empty."""
         if self.is_empty():
             return None
-        return self.list.head.data
+        return self.list.first()
 
     def dequeue_front(self):
         """Remove and return the item at the front of this queue,
@@ -0,0 +1,496 @@
+#!python
+
+from array import array
+from bisect import bisect_left, insort
+import operator
+import struct
+import sys
+
+from bitset import _popcount
+from hashtable import HashTable
+from set import Set
+
+# A chunk with more than this many values is cheaper as a bitmap: 4096
+# two-byte values take the same 8KB as a bitmap of all 65536
+ARRAY_MAX = 4096
+_BITMAP_BYTES = 8192
+
+# How each set operation looks on Python sets and on int bitmaps
+_OPERATIONS = {
+    'union': (operator.or_, operator.or_),
+    'intersection': (operator.and_, operator.and_),
+    'difference': (operator.sub, lambda left, right: left & ~right),
+    'symmetric_difference': (operator.xor, operator.xor),
+}
+
+_ROARING_MAGIC = b'RSET'
+_ROARING_HEADER = struct.Struct('<4sII')  # magic, version, chunk count
+_ROARING_CHUNK = struct.Struct('<QBI')  # high bits, kind, value count
+_ARRAY_CHUNK = 0
+_BITMAP_CHUNK = 1
+
+
+class ArrayContainer(object):
+    """The low 16 bits of the values in a sparse chunk, as a sorted array
+    of unsigned shorts: 2 bytes per value."""
+    __slots__ = ('values',)
+
+    def __init__(self, values=None):
+        """Initialize this container with the given sorted array('H')."""
+        self.values = values if values is not None else array('H')
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def contains(self, low):
+        """Binary search for low. O(log k) for k values"""
+        index = bisect_left(self.values, low)
+        return index < len(self.values) and self.values[index] == low
+
+    def add(self, low):
+        """Add low and return the container now holding this chunk, which is
+        a bitmap once there are too many values for an array.
+        O(k) to shift the values after it"""
+        if len(self.values) >= ARRAY_MAX:
+            return BitmapContainer.from_values(self.values).add(low)
+        insort(self.values, low)
+        return self
+
+    def remove(self, low):
+        """Remove low and return the container now holding this chunk."""
+        del self.values[bisect_left(self.values, low)]
+        return self
+
+    def copy(self):
+        return ArrayContainer(array('H', self.values))
+
+    def to_int(self):
+        """Return this chunk as a 65536 bit int bitmap."""
+        return BitmapContainer.from_values(self.values).to_int()
+
+    def payload(self):
+        """Return the values as little endian bytes, for to_bytes."""
+        values = self.values
+        if sys.byteorder == 'big':
+            values = array('H', values)
+            values.byteswap()
+        return values.tobytes()
+
+
+class BitmapContainer(object):
+    """The low 16 bits of the values in a dense chunk, as a 65536 bit
+    bitmap: always 8KB, however many values there are."""
+    __slots__ = ('bits', 'size')
+
+    def __init__(self, bits, size):
+        """Initialize this container with an 8192 byte bytearray bitmap
+        holding size 1 bits."""
+        self.bits = bits
+        self.size = size
+
+    @classmethod
+    def from_values(cls, values):
+        """Return a bitmap container holding the given distinct values."""
+        bits = bytearray(_BITMAP_BYTES)
+        for low in values:
+            bits[low >> 3] |= 1 << (low & 7)
+        return cls(bits, len(values))
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for index, byte in enumerate(self.bits):
+            base = index * 8
+            while byte:
+                lowest = byte & -byte
+                yield base + lowest.bit_length() - 1
+                byte ^= lowest
+
+    def contains(self, low):
+        """One bit test. O(1)"""
+        return self.bits[low >> 3] >> (low & 7) & 1 == 1
+
+    def add(self, low):
+        """Set the bit for low and return this container. O(1)"""
+        mask = 1 << (low & 7)
+        if not self.bits[low >> 3] & mask:
+            self.bits[low >> 3] |= mask
+            self.size += 1
+        return self
+
+    def remove(self, low):
+        """Clear the bit for low and return the container now holding this
+        chunk, which is an array again once it's sparse enough."""
+        self.bits[low >> 3] &= ~(1 << (low & 7)) & 0xFF
+        self.size -= 1
+        if self.size <= ARRAY_MAX:
+            return ArrayContainer(array('H', self))
+        return self
+
+    def copy(self):
+        return BitmapContainer(bytearray(self.bits), self.size)
+
+    def to_int(self):
+        return int.from_bytes(self.bits, 'little')
+
+    def payload(self):
+        return bytes(self.bits)
+
+
+def _container_from_int(number):
+    """Return the smaller kind of container for a 65536 bit int bitmap, or
+    None if it's empty."""
+    size = _popcount(number)
+    if size == 0:
+        return None
+    bits = bytearray(number.to_bytes(_BITMAP_BYTES, 'little'))
+    container = BitmapContainer(bits, size)
+    if size <= ARRAY_MAX:
+        return ArrayContainer(array('H', container))
+    return container
+
+
+def _combine(left, right, name):
+    """Return the container for the given operation on two containers of
+    the same chunk, or None if the result is empty. Two arrays go through
+    Python sets; anything with a bitmap goes through ints, a word at a
+    time."""
+    set_operation, int_operation = _OPERATIONS[name]
+    if type(left) is ArrayContainer and type(right) is ArrayContainer:
+        values = sorted(set_operation(set(left.values), set(right.values)))
+        if not values:
+            return None
+        if len(values) <= ARRAY_MAX:
+            return ArrayContainer(array('H', values))
+        return BitmapContainer.from_values(values)
+    return _container_from_int(int_operation(left.to_int(), right.to_int()))
+
+
+def _from_sorted(values):
+    """Return a new RoaringSet of the given sorted, distinct, non-negative
+    ints, filling each chunk's container in one go."""
+    newset = RoaringSet()
+    start = 0
+    while start < len(values):
+        high = values[start] >> 16
+        # Everything up to the first value of the next chunk is in this one
+        end = bisect_left(values, (high + 1) << 16, start)
+        lows = [value & 0xFFFF for value in values[start:end]]
+        if len(lows) <= ARRAY_MAX:
+            container = ArrayContainer(array('H', lows))
+        else:
+            container = BitmapContainer.from_values(lows)
+        newset.keys.append(high)
+        newset.containers.append(container)
+        newset._size += len(lows)
+        start = end
+    return newset
+
+
+class RoaringSet(Set):
+    """Set of non-negative ints, split into chunks of 65536 by their high
+    bits (value >> 16). Each chunk that has any values gets a container for
+    their low 16 bits: a sorted array of shorts while it has at most 4096
+    values, a 8KB bitmap once it has more. Clustered values (like ranges of
+    ids or phone numbers) end up in a few dense bitmaps, scattered ones in
+    small arrays, and empty stretches cost nothing at all.
+    Set algebra between two RoaringSets walks both sorted chunk lists at
+    once and only combines containers of matching chunks.
+    Like BitSet, adding something that isn't a non-negative int turns this
+    into a plain hash-backed Set."""
+
+    def __init__(self, elements=None):
+        """Make a roaring set of the given elements, if any."""
+        self.keys = []  # Sorted high bits of the chunks we have
+        self.containers = []  # Container for each of those chunks
+        self._size = 0
+        if elements is not None:
+            self.update(elements)
+
+    def __str__(self):
+        return str(self.contents())
+
+    def __repr__(self):
+        return 'RoaringSet({!r})'.format(self.contents())
+
+    def __iter__(self):
+        """Yield the elements from smallest to largest."""
+        for high, container in zip(self.keys, self.containers):
+            base = high << 16
+            for low in container:
+                yield base | low
+
+    def __len__(self):
+        return self._size
+
+    def contents(self):
+        return list(self)
+
+    def size(self):
+        """Find size. O(1)"""
+        return self._size
+
+    def memory_usage(self):
+        """Return the bytes taken by the containers' values and bitmaps."""
+        return sum(2 * len(container) if type(container) is ArrayContainer
+                   else _BITMAP_BYTES for container in self.containers)
+
+    def _chunk(self, high):
+        """Return the index of the chunk with the given high bits, or None.
+        O(log c) for c chunks"""
+        index = bisect_left(self.keys, high)
+        if index < len(self.keys) and self.keys[index] == high:
+            return index
+        return None
+
+    def _fall_back(self):
+        """Turn this object into a hash-backed Set with the same elements."""
+        elements = list(self)
+        del self.keys, self.containers, self._size
+        self.__class__ = Set
+        self.data = HashTable.from_items((item, None) for item in elements)
+
+    def contains(self, element):
+        """Checks if element is inside set.
+        O(log c) to find the chunk, then a bit test or binary search"""
+        if type(element) is not int or element < 0:
+            return False
+        index = self._chunk(element >> 16)
+        return (index is not None and
+                self.containers[index].contains(element & 0xFFFF))
+
+    def add(self, element):
+        """Adds element to set."""
+        if type(element) is not int or element < 0:
+            self._fall_back()
+            self.add(element)
+            return
+        high, low = element >> 16, element & 0xFFFF
+        index = bisect_left(self.keys, high)
+        if index == len(self.keys) or self.keys[index] != high:
+            self.keys.insert(index, high)
+            self.containers.insert(index, ArrayContainer(array('H', [low])))
+            self._size += 1
+            return
+        container = self.containers[index]
+        if not container.contains(low):
+            self.containers[index] = container.add(low)
+            self._size += 1
+
+    def remove(self, element):
+        """Removes element from set, or raises ValueError if it's not there.
+        Chunks that end up empty are dropped."""
+        if not self.contains(element):
+            raise ValueError('Element not found: {}'.format(element))
+        index = self._chunk(element >> 16)
+        container = self.containers[index].remove(element & 0xFFFF)
+        if len(container) == 0:
+            del self.keys[index]
+            del self.containers[index]
+        else:
+            self.containers[index] = container
+        self._size -= 1
+
+    def copy(self):
+        """Return a new roaring set with copies of the same containers."""
+        newset = RoaringSet()
+        newset.keys = list(self.keys)
+        newset.containers = [container.copy()
+                             for container in self.containers]
+        newset._size = self._size
+        return newset
+
+    def _merge(self, other_set, name):
+        """Return a new RoaringSet from the given operation on this one and
+        other_set, walking both sorted chunk lists side by side.
+        O(c1 + c2) chunks, plus the cost of combining matching ones"""
+        keep_left = name != 'intersection'
+        keep_right = name in ('union', 'symmetric_difference')
+        newset = RoaringSet()
+        keys, containers = newset.keys, newset.containers
+
+        def keep(high, container):
+            keys.append(high)
+            containers.append(container)
+            newset._size += len(container)
+
+        i = j = 0
+        left_keys, right_keys = self.keys, other_set.keys
+        while i < len(left_keys) and j < len(right_keys):
+            if left_keys[i] < right_keys[j]:
+                if keep_left:
+                    keep(left_keys[i], self.containers[i].copy())
+                i += 1
+            elif right_keys[j] < left_keys[i]:
+                if keep_right:
+                    keep(right_keys[j], other_set.containers[j].copy())
+                j += 1
+            else:
+                container = _combine(self.containers[i],
+                                     other_set.containers[j], name)
+                if container is not None:
+                    keep(left_keys[i], container)
+                i += 1
+                j += 1
+        if keep_left:
+            for index in range(i, len(left_keys)):
+                keep(left_keys[index], self.containers[index].copy())
+        if keep_right:
+            for index in range(j, len(right_keys)):
+                keep(right_keys[index], other_set.containers[index].copy())
+        return newset
+
+    def union(self, other_set):
+        """Return a new set that is a union of this set and other_set."""
+        if isinstance(other_set, RoaringSet):
+            return self._merge(other_set, 'union')
+        newset = self.copy()
+        newset.update(other_set)
+        return newset
+
+    def intersection(self, other_set):
+        """Return a new set that is an intersection of this set + other_set.
+        Only chunks both sets have are looked at."""
+        if isinstance(other_set, RoaringSet):
+            return self._merge(other_set, 'intersection')
+        if len(other_set) < len(self):
+            return RoaringSet(item for item in other_set
+                              if self.contains(item))
+        return RoaringSet(item for item in self if other_set.contains(item))
+
+    def difference(self, other_set):
+        """Return a new set of the elements in this set but not other_set."""
+        if isinstance(other_set, RoaringSet):
+            return self._merge(other_set, 'difference')
+        return RoaringSet(item for item in self
+                          if not other_set.contains(item))
+
+    def symmetric_difference(self, other_set):
+        """Return a new set of the elements in exactly one of the two sets."""
+        if isinstance(other_set, RoaringSet):
+            return self._merge(other_set, 'symmetric_difference')
+        newset = self.copy()
+        newset.symmetric_difference_update(other_set)
+        return newset
+
+    def _replace_with(self, other_set):
+        """Take over the chunks of the given (new) roaring set."""
+        self.keys = other_set.keys
+        self.containers = other_set.containers
+        self._size = other_set._size
+
+    def update(self, other_set):
+        """Add every element of other_set to this set."""
+        if isinstance(other_set, RoaringSet):
+            self._replace_with(self._merge(other_set, 'union'))
+            return
+        items = list(other_set)
+        if not all(type(item) is int and item >= 0 for item in items):
+            for item in items:
+                # Once add falls back to a hash set, this calls Set.add
+                self.add(item)
+            return
+        # Sort once and build whole containers, instead of inserting one
+        # value at a time into sorted arrays
+        loaded = _from_sorted(sorted(set(items)))
+        if self._size == 0:
+            self._replace_with(loaded)
+        else:
+            self._replace_with(self._merge(loaded, 'union'))
+
+    def intersection_update(self, other_set):
+        """Keep only the elements that are also in other_set."""
+        self._replace_with(self.intersection(other_set))
+
+    def difference_update(self, other_set):
+        """Remove every element of other_set from this set."""
+        self._replace_with(self.difference(other_set))
+
+    def symmetric_difference_update(self, other_set):
+        """Keep the elements in exactly one of this set and other_set."""
+        if isinstance(other_set, RoaringSet):
+            self._replace_with(self._merge(other_set, 'symmetric_difference'))
+            return
+        for item in other_set:
+            if self.contains(item):
+                self.remove(item)
+            else:
+                self.add(item)
+
+    def is_subset(self, other_set):
+        """Return a boolean whether this set is a subset of other_set.
+        For two roaring sets, every one of our chunks has to be in theirs,
+        with nothing left over after taking theirs away."""
+        if not isinstance(other_set, RoaringSet):
+            return Set.is_subset(self, other_set)
+        if self._size > other_set._size:
+            return False
+        for high, container in zip(self.keys, self.containers):
+            index = other_set._chunk(high)
+            if (index is None or
+                    _combine(container, other_set.containers[index],
+                             'difference') is not None):
+                return False
+        return True
+
+    def to_bytes(self):
+        """Return this set in a compact byte format: a header, then for each
+        chunk its high bits, kind and value count followed by either the
+        values as little endian shorts or the 8KB bitmap."""
+        parts = [_ROARING_HEADER.pack(_ROARING_MAGIC, 1, len(self.keys))]
+        for high, container in zip(self.keys, self.containers):
+            kind = (_ARRAY_CHUNK if type(container) is ArrayContainer
+                    else _BITMAP_CHUNK)
+            parts.append(_ROARING_CHUNK.pack(high, kind, len(container)))
+            parts.append(container.payload())
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Return a new roaring set read from bytes made by to_bytes, or
+        raise ValueError if they aren't in that format."""
+        try:
+            magic, version, count = _ROARING_HEADER.unpack_from(data, 0)
+        except struct.error:
+            raise ValueError('Not a roaring set: too short')
+        if magic != _ROARING_MAGIC or version != 1:
+            raise ValueError('Not a roaring set: {!r}'.format(magic))
+        newset = cls()
+        offset = _ROARING_HEADER.size
+        for chunk in range(count):
+            if offset + _ROARING_CHUNK.size > len(data):
+                raise ValueError('Not a roaring set: chunk {} is cut short'
+                                 .format(chunk))
+            high, kind, size = _ROARING_CHUNK.unpack_from(data, offset)
+            offset += _ROARING_CHUNK.size
+            if kind == _ARRAY_CHUNK:
+                length = 2 * size
+            elif kind == _BITMAP_CHUNK:
+                length = _BITMAP_BYTES
+            else:
+                raise ValueError('Not a roaring set: chunk {} has kind {}'
+                                 .format(chunk, kind))
+            if offset + length > len(data):
+                raise ValueError('Not a roaring set: chunk {} is cut short'
+                                 .format(chunk))
+            if kind == _ARRAY_CHUNK:
+                values = array('H')
+                values.frombytes(data[offset:offset + length])
+                if sys.byteorder == 'big':
+                    values.byteswap()
+                container = ArrayContainer(values)
+            else:
+                bits = bytearray(data[offset:offset + length])
+                container = BitmapContainer(bits, size)
+            offset += length
+            newset.keys.append(high)
+            newset.containers.append(container)
+            newset._size += size
+        if offset != len(data):
+            raise ValueError('Not a roaring set: {} bytes left over'
+                             .format(len(data) - offset))
+        return newset
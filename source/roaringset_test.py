@@ -0,0 +1,129 @@
+#!python
+
+from roaringset import RoaringSet, ArrayContainer, BitmapContainer, ARRAY_MAX
+from set import Set
+import unittest
+
+
+class RoaringSetTest(unittest.TestCase):
+
+    def test_init(self):
+        test1 = RoaringSet([70000, 5, 1, 5])
+        assert test1.size() == 3
+        assert test1.contents() == [1, 5, 70000]
+        # Two chunks: 0 for 1 and 5, and 1 for 70000
+        assert test1.keys == [0, 1]
+        assert len(RoaringSet()) == 0
+
+    def test_add_remove_contains(self):
+        test1 = RoaringSet()
+        test1.add(3)
+        test1.add(3)
+        test1.add(2 ** 40)
+        assert test1.size() == 2
+        assert test1.contains(3) is True
+        assert test1.contains(2 ** 40) is True
+        assert test1.contains(4) is False
+        assert test1.contains(-3) is False
+        assert test1.contains('3') is False
+        test1.remove(2 ** 40)
+        assert test1.keys == [0]  # empty chunks go away
+        with self.assertRaises(ValueError):
+            test1.remove(2 ** 40)
+
+    def test_containers_switch_kind(self):
+        test1 = RoaringSet(range(ARRAY_MAX))
+        assert type(test1.containers[0]) is ArrayContainer
+        test1.add(ARRAY_MAX)
+        assert type(test1.containers[0]) is BitmapContainer
+        assert test1.size() == ARRAY_MAX + 1
+        test1.remove(0)
+        assert type(test1.containers[0]) is ArrayContainer
+        assert test1.contents() == list(range(1, ARRAY_MAX + 1))
+
+    def test_memory_usage(self):
+        # 100000 values in a row: two chunks, both full enough for bitmaps
+        test1 = RoaringSet(range(100000))
+        assert test1.memory_usage() == 2 * 8192
+        # A few far apart values: 2 bytes each
+        assert RoaringSet([1, 10 ** 6, 10 ** 9]).memory_usage() == 6
+
+    def test_set_algebra(self):
+        test1 = RoaringSet(list(range(0, 10000)) + [100000, 200000])
+        test2 = RoaringSet(list(range(5000, 15000)) + [200000, 300000])
+        union = test1.union(test2)
+        assert union.contents() == (list(range(15000)) +
+                                    [100000, 200000, 300000])
+        assert test1.intersection(test2).contents() == (
+            list(range(5000, 10000)) + [200000])
+        assert test1.difference(test2).contents() == (list(range(5000)) +
+                                                      [100000])
+        assert test1.symmetric_difference(test2).contents() == (
+            list(range(5000)) + list(range(10000, 15000)) +
+            [100000, 300000])
+        assert test1.intersection(RoaringSet()).size() == 0
+        # Inputs don't change
+        assert test1.size() == 10002
+
+    def test_set_algebra_with_hash_sets(self):
+        test1 = RoaringSet([1, 2, 3, 70000])
+        test2 = Set([3, 70000, 9])
+        assert test1.intersection(test2).contents() == [3, 70000]
+        assert test1.difference(test2).contents() == [1, 2]
+        assert test1.union(test2).contents() == [1, 2, 3, 9, 70000]
+
+    def test_in_place(self):
+        test1 = RoaringSet([1, 2, 3])
+        test1.update(RoaringSet([3, 70000]))
+        assert test1.contents() == [1, 2, 3, 70000]
+        test1.intersection_update(RoaringSet([2, 3, 70000]))
+        assert test1.contents() == [2, 3, 70000]
+        test1.difference_update(RoaringSet([70000]))
+        assert test1.contents() == [2, 3]
+        assert test1.keys == [0]
+        test1.symmetric_difference_update(RoaringSet([3, 9]))
+        assert test1.contents() == [2, 9]
+
+    def test_subset(self):
+        big = RoaringSet(range(20000))
+        assert RoaringSet([5, 19999]).is_subset(big) is True
+        assert RoaringSet([5, 20000]).is_subset(big) is False
+        assert RoaringSet([70000]).is_subset(big) is False
+        assert big.is_subset(big) is True
+        assert RoaringSet([1, 2]).is_subset(Set([1, 2, 'A'])) is True
+
+    def test_bytes_round_trip(self):
+        test1 = RoaringSet(list(range(50000)) + [10 ** 9, 10 ** 9 + 7])
+        data = test1.to_bytes()
+        # Header, then a chunk with an 8KB bitmap for 0 to 49999, and a
+        # chunk with two shorts for the two big values
+        assert len(data) == 12 + (13 + 8192) + (13 + 2 * 2)
+        test2 = RoaringSet.from_bytes(data)
+        assert test2.contents() == test1.contents()
+        assert test2.size() == test1.size()
+        assert len(RoaringSet([1, 2, 3]).to_bytes()) < 32
+        assert RoaringSet.from_bytes(RoaringSet().to_bytes()).size() == 0
+        with self.assertRaises(ValueError):
+            RoaringSet.from_bytes(b'nope')
+        with self.assertRaises(ValueError):
+            RoaringSet.from_bytes(b'XXXX' + data[4:])
+        # Cut short anywhere: in a chunk header, or a few bytes into the
+        # last chunk's values
+        for length in [20, 12 + 13 + 8192 + 5, len(data) - 2]:
+            with self.assertRaises(ValueError):
+                RoaringSet.from_bytes(data[:length])
+        with self.assertRaises(ValueError):
+            RoaringSet.from_bytes(data + b'\x00')
+        with self.assertRaises(ValueError):
+            RoaringSet.from_bytes(data[:12 + 8] + b'\x07' + data[12 + 9:])
+
+    def test_falls_back_for_non_ints(self):
+        test1 = RoaringSet([1, 2])
+        test1.add('A')
+        assert type(test1) is Set
+        assert test1.size() == 3
+        assert test1.contains(2) is True
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,24 +7,35 @@
 # intersection(other_set) - return a new set that is the intersection of this set and other_set
 # difference(other_set) - return a new set that is the difference of this set and other_set
 # is_subset(other_set) - return a boolean indicating whether other_set is a subset of this set
+# freeze() - return an immutable, hashable FrozenSet of this set's elements
+
+from array import array
 
 from linkedlist import Node, LinkedList
-from hashtable import HashTable
+from hashtable import (HashTable, FIBONACCI_MULTIPLIER, _MASK_64, _MISSING,
+                       _mix64, mix64_hash)
 
 
 class Set(object):
     def __init__(self, elements=None):
-        # If I want a perfect O(n), I'll need... linear collision check?
-        self.data = HashTable()
-        for item in elements:
-            if self.data.contains(item):
-                continue
-            else:
-                self.data.set(item, None)
+        """Make a set of the given elements (if any), sized up front so
+        adding them never has to resize the table."""
+        if elements is None:
+            self.data = HashTable()
+        else:
+            self.data = HashTable.from_items((item, None) for item in elements)
 
     def __str__(self):
         return str(self.data.keys())
 
+    def __iter__(self):
+        """Iterate over the elements without copying them into a list."""
+        return self.data.iter_keys()
+
+    def __len__(self):
+        """Number of elements, same as size()."""
+        return self.data.size
+
     def contents(self):
         return self.data.keys()
 
@@ -50,49 +61,131 @@ class Set(object):
 
         O(1) if at head, O(n) at tail
         Delete is still the same; lt -> ht
-        The added "contains" makes it run slower though
+        No separate "contains" check; delete already tells us if it's missing
         """
-        if self.contains(element):
+        try:
             self.data.delete(element)
-        else:
-            raise ValueError
+        except KeyError:
+            raise ValueError('Element not found: {}'.format(element))
+
+    def _empty_like(self, count):
+        """Return an empty Set with room for count elements, so filling it
+        never resizes."""
+        newset = Set()
+        newset.data._reserve(count)
+        return newset
+
+    def copy(self):
+        """Return a new set with the same elements.
+        O(n), and the new table is sized once up front"""
+        newset = self._empty_like(len(self))
+        add = newset.data.set
+        for item in self:
+            add(item, None)
+        return newset
+
+    def freeze(self):
+        """Return an immutable, hashable FrozenSet of this set's elements.
+        O(n) expected to build its perfect hash"""
+        return FrozenSet(self)
 
     def union(self, other_set):
         """Return a new set that is a union of this set and other_set.
-        O(n); goes through every item and has contains"""
-        newset = self.contents()
-        for item in other_set.contents():
-            if self.contains(item):
-                continue
-            else:
-                newset.append(item)
-        return Set(newset)
+        O(n + m); the new table is sized for both up front, so adding
+        every element of each never resizes it. Always a Set, whichever
+        kind of set other_set is"""
+        newset = self._empty_like(len(self) + len(other_set))
+        add = newset.data.set
+        for item in self:
+            add(item, None)
+        for item in other_set:
+            add(item, None)
+        return newset
+
+    def intersection(self, other_set):
+        """Return a new set that is an intersection of this set + other_set.
+        O(min(n, m)); only the smaller set is walked, checking each of its
+        elements against the bigger one"""
+        small, large = self, other_set
+        if len(other_set) < len(self):
+            small, large = other_set, self
+        newset = self._empty_like(len(small))
+        add = newset.data.set
+        for item in small:
+            if large.contains(item):
+                add(item, None)
+        return newset
 
     def difference(self, other_set):
-        newset = Set(self.contents())
-        for item in other_set.contents():
-            if newset.contains(item):
-                newset.remove(item)
-            else:
-                newset.add(item)
+        """Return a new set of the elements in this set but not other_set.
+        O(n); every one of our elements has to be checked"""
+        newset = self._empty_like(len(self))
+        add = newset.data.set
+        for item in self:
+            if not other_set.contains(item):
+                add(item, None)
         return newset
 
+    def symmetric_difference(self, other_set):
+        """Return a new set of the elements in exactly one of the two sets.
+        O(n + m)"""
+        newset = self._empty_like(len(self) + len(other_set))
+        add = newset.data.set
+        for item in self:
+            if not other_set.contains(item):
+                add(item, None)
+        for item in other_set:
+            if not self.contains(item):
+                add(item, None)
+        return newset
 
-    def intersection(self, other_set):
-        """Return a new set that is an intersection of this set + other_set.
-        O(n); goes through every item and has contains"""
-        newset = []
-        for item in other_set.contents():
-            if self.contains(item):
-                newset.append(item)
-        return Set(newset)
+    def update(self, other_set):
+        """Add every element of other_set to this set.
+        O(m); makes room for all of them first, so it resizes at most once"""
+        self.data.update((item, None) for item in other_set)
+
+    def intersection_update(self, other_set):
+        """Keep only the elements that are also in other_set.
+        O(min(n, m)); if other_set is smaller we rebuild from it instead of
+        checking all of ours"""
+        if len(other_set) < len(self):
+            self.data = self.intersection(other_set).data
+            return
+        unwanted = [item for item in self if not other_set.contains(item)]
+        for item in unwanted:
+            self.data.delete(item)
+
+    def difference_update(self, other_set):
+        """Remove every element of other_set from this set.
+        O(min(n, m)); walk whichever set is smaller"""
+        if other_set is self:
+            self.data = HashTable()
+            return
+        if len(other_set) <= len(self):
+            unwanted = [item for item in other_set if self.contains(item)]
+        else:
+            unwanted = [item for item in self if other_set.contains(item)]
+        for item in unwanted:
+            self.data.delete(item)
+
+    def symmetric_difference_update(self, other_set):
+        """Keep the elements in exactly one of this set and other_set.
+        O(m); each of other_set's elements is either added or removed"""
+        if other_set is self:
+            self.data = HashTable()
+            return
+        for item in other_set:
+            if self.data.contains(item):
+                self.data.delete(item)
+            else:
+                self.data.set(item, None)
 
     def is_subset(self, other_set):
         """Return a boolean whether other set is a subset of this set.
         O(n). It's like the above, with an additional comparison"""
         # Check to make sure if everything in THIS set is in the other
         if self.size() <= other_set.size():
-            for item in self.contents():
+            for item in self:
                 if other_set.contains(item):
                     continue
                 else:
@@ -100,36 +193,288 @@ class Set(object):
             return True
         else:
             return False
-#
-
-test1 = Set([4, 5, 6, 7, 8])
-test2 = Set([1, 2, 3, 4, 5])
-print(test1.difference(test2))
-# result = test1.intersection(test2)
-# print(result)
-# test2 = Set([4, 5, 6, 7, 8])
-#
-# print(test)
-# print(test2)
-# test.add(1)
-# print(test)
-# print(test.intersection(test2))
-# print(test.union(test2))
-#
-# print(test.is_subset(test2))
-#
-# test = Set([1, 2, 3])
-# test2 = Set([1, 2, 3, 4, 5, 6, 7, 8])
-# print(test.is_subset(test2))
-#
-# test = Set([1, 2, 3])
-# test2 = Set([1, 2, 3])
-# print(test.is_subset(test2))
-#
-# test = Set([1, 2, 3, 4])
-# test2 = Set([1, 2, 3])
-# print(test.is_subset(test2))
-#
-# test = Set([1, 2, 3, 4, 5])
-# test2 = Set([4, 5, 6, 7, 8])
-# print(test.is_subset(test2))
+
+
+# Displacements FrozenSet tries per group before giving up on it
+_MAX_DISPLACEMENTS = 256
+
+
+def _scramble(code):
+    """Scramble a 64 bit hash code for FrozenSet. A plain fibonacci multiply
+    keeps codes in a line (like i << 32) in a line; the shifts fold high
+    bits down and low bits up around the multiply, which is most of what
+    _mix64 does for half the work. Each step can be undone, so different
+    codes always scramble differently."""
+    code ^= code >> 29
+    code = (code * FIBONACCI_MULTIPLIER) & _MASK_64
+    return code ^ (code >> 32)
+
+
+def _step(scrambled):
+    """Return the odd displacement step for a scrambled code: the high bits
+    of another fibonacci multiply, which depend on all of its bits, not
+    just the top ones that picked its group."""
+    return (((scrambled * FIBONACCI_MULTIPLIER) & _MASK_64) >> 32) | 1
+
+
+class FrozenSet(object):
+    """Immutable set, built once and then only read. The elements go in a
+    tuple with one slot each (and at least a quarter of the slots spare),
+    placed by a perfect hash (hash and displace): every element's hash code
+    picks one of about n displacements, and that displacement either is the
+    element's slot directly or moves its group to slots nothing else needs.
+    So contains is one hash, two index computations and one comparison,
+    with no buckets or chains to walk.
+    FrozenSets are hashable (the hash is computed once and cached), so they
+    can be keys in a HashTable or elements of another set."""
+
+    def __init__(self, elements=None):
+        """Make a frozen set of the given elements, if any.
+        O(n) expected"""
+        elements = [] if elements is None else list(elements)
+        self._hash = None
+        codes = [hash(item) & _MASK_64 for item in elements]
+        # One element per hash code. Int elements are their own hash codes,
+        # so the table mixes them, or codes like i << 32 would all share a
+        # bucket
+        unique = HashTable.from_items(zip(codes, elements),
+                                      hash_function=mix64_hash)
+        # Different elements with the exact same hash code (like -1 and -2
+        # in CPython) can't be told apart by any hash, so all but one of
+        # them go in a small overflow tuple that's searched on a miss;
+        # equal ones are just duplicates
+        overflow = []
+        if len(unique) < len(elements):
+            for code, item in zip(codes, elements):
+                kept = unique.get(code)
+                if (item is not kept and item != kept and
+                        item not in overflow):
+                    overflow.append(item)
+        self._size = len(unique) + len(overflow)
+        # Bit (code & 63) is set for every element's hash code, so
+        # is_subset can often say no without looking at any element
+        self._signature = 0
+        for code in unique.keys():
+            self._signature |= 1 << (code & 63)
+        overflow.extend(self._build(unique.values(), unique.keys()))
+        self._overflow = tuple(overflow)
+
+    def _build(self, elements, codes):
+        """Lay out the given elements, whose hash codes are all different,
+        by a perfect hash, and return any it couldn't place.
+        For a scrambled code x, the group is the top bits of x, and with
+        displacement d the slot is (x + d * step) % m, where step is odd
+        (see _step), so it runs every element through all m slots (m is a
+        power of two). A group that no displacement up to
+        _MAX_DISPLACEMENTS places makes us double the slots and start over,
+        and after a few tries the elements that still don't fit go in the
+        overflow. O(n) expected"""
+        size = len(elements)
+        group_bits = max(1, (size - 1).bit_length())
+        self._group_shift = 64 - group_bits
+        scrambled = []
+        groups = [[] for i in range(1 << group_bits)]
+        for position, code in enumerate(codes):
+            code = _scramble(code)
+            scrambled.append((code, _step(code)))
+            groups[code >> self._group_shift].append(position)
+        # With no spare slots the last groups to be placed would have to
+        # hit the last free slots exactly, which takes O(n^2) tries
+        slot_count = 8
+        while slot_count < size + size // 4:
+            slot_count *= 2
+        for attempt in range(4):
+            left_over = self._place(elements, scrambled, groups, slot_count)
+            if not left_over:
+                break
+            slot_count *= 2
+        return left_over
+
+    def _place(self, elements, scrambled, groups, slot_count):
+        """Try to place every group in slot_count slots, and return the
+        elements of the groups that didn't fit."""
+        mask = slot_count - 1
+        self._slot_mask = mask
+        self._displacements = array('q', [0] * len(groups))
+        slots = [_MISSING] * slot_count
+        taken = [False] * slot_count
+        left_over = []
+        # Place the biggest groups first, while there's the most room
+        order = sorted(range(len(groups)),
+                       key=lambda group: -len(groups[group]))
+        singles = []
+        for group in order:
+            members = groups[group]
+            if len(members) <= 1:
+                if members:
+                    singles.append(group)
+                continue
+            # Try displacements until every member lands in a free slot
+            for displacement in range(1, min(slot_count,
+                                             _MAX_DISPLACEMENTS) + 1):
+                chosen = []
+                for position in members:
+                    code, step = scrambled[position]
+                    slot = (code + displacement * step) & mask
+                    if taken[slot] or slot in chosen:
+                        break
+                    chosen.append(slot)
+                else:
+                    break
+            else:
+                left_over.extend(elements[position] for position in members)
+                continue
+            self._displacements[group] = displacement
+            for position, slot in zip(members, chosen):
+                taken[slot] = True
+                slots[slot] = elements[position]
+        # Groups of one go straight into whatever slots are left, stored
+        # as -slot - 1 so lookups can tell them apart from displacements
+        free = [slot for slot in range(slot_count) if not taken[slot]]
+        for group in singles:
+            slot = free.pop()
+            self._displacements[group] = -slot - 1
+            slots[slot] = elements[groups[group][0]]
+        self._keys = tuple(slots)
+        return left_over
+
+    def __repr__(self):
+        return 'FrozenSet({!r})'.format(self.contents())
+
+    def __str__(self):
+        return str(self.contents())
+
+    def __iter__(self):
+        for item in self._keys:
+            if item is not _MISSING:
+                yield item
+        for item in self._overflow:
+            yield item
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, element):
+        return self.contains(element)
+
+    def __hash__(self):
+        """Hash of the elements, in any order; worked out once, then
+        cached."""
+        if self._hash is None:
+            combined = self._size
+            for item in self:
+                combined ^= _mix64(hash(item) & _MASK_64)
+            self._hash = combined
+        return self._hash
+
+    def __eq__(self, other):
+        """FrozenSets are equal if they have the same elements. O(1) when
+        they're the same object or have different hashes, O(n) otherwise"""
+        if self is other:
+            return True
+        if not isinstance(other, FrozenSet):
+            return NotImplemented
+        return (self._size == other._size and hash(self) == hash(other) and
+                self.is_subset(other))
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def contents(self):
+        return list(self)
+
+    def size(self):
+        return self._size
+
+    def contains(self, element):
+        """Checks if element is inside set.
+        O(1): one slot to look at, no chain to walk (plus the overflow,
+        which is almost always empty)"""
+        if not self._size:
+            return False
+        # Same as _scramble, _step and the slot math in _place, written out
+        code = hash(element) & _MASK_64
+        code = ((code ^ (code >> 29)) * FIBONACCI_MULTIPLIER) & _MASK_64
+        code ^= code >> 32
+        displacement = self._displacements[code >> self._group_shift]
+        if displacement < 0:
+            slot = -displacement - 1
+        else:
+            step = (((code * FIBONACCI_MULTIPLIER) & _MASK_64) >> 32) | 1
+            slot = (code + displacement * step) & self._slot_mask
+        return self._keys[slot] == element or element in self._overflow
+
+    def is_subset(self, other_set):
+        """Return a boolean whether this set is a subset of other_set.
+        O(n), but against another FrozenSet it's usually O(1) to say no:
+        if we have a hash bit pattern they don't, we have something they
+        don't."""
+        if self._size > len(other_set):
+            return False
+        if (isinstance(other_set, FrozenSet) and
+                self._signature & ~other_set._signature):
+            return False
+        contains = other_set.contains
+        for item in self:
+            if not contains(item):
+                return False
+        return True
+
+    def freeze(self):
+        """Already frozen."""
+        return self
+
+    def thaw(self):
+        """Return a mutable Set with the same elements."""
+        return Set(self)
+
+    def union(self, other_set):
+        """Return a new FrozenSet with the elements of both sets."""
+        return FrozenSet(self.thaw().union(other_set))
+
+    def intersection(self, other_set):
+        """Return a new FrozenSet with the elements in both sets."""
+        return FrozenSet(self.thaw().intersection(other_set))
+
+    def difference(self, other_set):
+        """Return a new FrozenSet with our elements not in other_set."""
+        return FrozenSet(self.thaw().difference(other_set))
+
+    def symmetric_difference(self, other_set):
+        """Return a new FrozenSet with the elements in exactly one set."""
+        return FrozenSet(self.thaw().symmetric_difference(other_set))
+
+
+if __name__ == '__main__':
+    test1 = Set([4, 5, 6, 7, 8])
+    test2 = Set([1, 2, 3, 4, 5])
+    print(test1.difference(test2))
+    # result = test1.intersection(test2)
+    # print(result)
+    # test2 = Set([4, 5, 6, 7, 8])
+    #
+    # print(test)
+    # print(test2)
+    # test.add(1)
+    # print(test)
+    # print(test.intersection(test2))
+    # print(test.union(test2))
+    #
+    # print(test.is_subset(test2))
+    #
+    # test = Set([1, 2, 3])
+    # test2 = Set([1, 2, 3, 4, 5, 6, 7, 8])
+    # print(test.is_subset(test2))
+    #
+    # test = Set([1, 2, 3])
+    # test2 = Set([1, 2, 3])
+    # print(test.is_subset(test2))
+    #
+    # test = Set([1, 2, 3, 4])
+    # test2 = Set([1, 2, 3])
+    # print(test.is_subset(test2))
+    #
+    # test = Set([1, 2, 3, 4, 5])
+    # test2 = Set([4, 5, 6, 7, 8])
+    # print(test.is_subset(test2))
@@ -2,7 +2,10 @@
 """If you put in numbers, they're JUST in the right order."""
 """Pretty funky, huh?"""
 
-from set import Set
+from set import Set, FrozenSet
+from bitset import BitSet
+from hashtable import HashTable
+import time
 import unittest
 
 class SetTest(unittest.TestCase):
@@ -126,6 +129,13 @@ class SetTest(unittest.TestCase):
         assert result.contains('C') is True
         assert result.contains('D') is True
         assert result.contains('E') is False
+        # Still a Set when the other one is a bigger set of another kind
+        for bigger in [FrozenSet([1, 2, 3]), BitSet([1, 2, 3])]:
+            result = Set([1]).union(bigger)
+            assert type(result) is Set
+            assert sorted(result.contents()) == [1, 2, 3]
+            result.add(4)
+            assert result.size() == 4
 
     def test_subset(self):
         # Should be false; two overlapping
@@ -167,5 +177,170 @@ class SetTest(unittest.TestCase):
         test2 = Set(['X', 'Y', 'Z'])
         assert test1.is_subset(test2) is False
 
+    def test_init_empty(self):
+        test1 = Set()
+        assert test1.size() == 0
+        test1 = Set(['A', 'A', 'B'])
+        assert test1.size() == 2
+
+    def test_difference(self):
+        test1 = Set([1, 2, 3, 4, 5])
+        test2 = Set([4, 5, 6, 7, 8])
+        # Only what's in test1 and not test2, not both ways
+        assert sorted(test1.difference(test2).contents()) == [1, 2, 3]
+        assert sorted(test2.difference(test1).contents()) == [6, 7, 8]
+        assert test1.difference(test1).size() == 0
+        assert test1.difference(Set()).size() == 5
+        # Neither input changes
+        assert test1.size() == 5 and test2.size() == 5
+
+    def test_symmetric_difference(self):
+        test1 = Set([1, 2, 3, 4, 5])
+        test2 = Set([4, 5, 6, 7, 8])
+        result = test1.symmetric_difference(test2)
+        assert sorted(result.contents()) == [1, 2, 3, 6, 7, 8]
+        assert test1.symmetric_difference(test1).size() == 0
+
+    def test_intersection_walks_smaller_set(self):
+        small = Set([3, 500])
+        large = Set(range(1000))
+        # Either way around, the result is the same
+        assert sorted(small.intersection(large).contents()) == [3, 500]
+        assert sorted(large.intersection(small).contents()) == [3, 500]
+        # and its table wasn't sized for the big set
+        assert len(large.intersection(small).data.buckets) < 8 * 2
+
+    def test_copy(self):
+        test1 = Set(['A', 'B'])
+        test2 = test1.copy()
+        test2.add('C')
+        assert test1.size() == 2
+        assert sorted(test2.contents()) == ['A', 'B', 'C']
+
+    def test_update(self):
+        test1 = Set([1, 2, 3])
+        test1.update(Set([3, 4, 5]))
+        assert sorted(test1.contents()) == [1, 2, 3, 4, 5]
+        test1.update([6])  # any iterable works
+        assert test1.size() == 6
+
+    def test_intersection_update(self):
+        test1 = Set([1, 2, 3, 4, 5])
+        test1.intersection_update(Set([4, 5, 6]))
+        assert sorted(test1.contents()) == [4, 5]
+        test1 = Set([1, 2])
+        test1.intersection_update(Set(range(100)))
+        assert sorted(test1.contents()) == [1, 2]
+        test1.intersection_update(Set())
+        assert test1.size() == 0
+
+    def test_difference_update(self):
+        test1 = Set([1, 2, 3, 4, 5])
+        test1.difference_update(Set([4, 5, 6]))
+        assert sorted(test1.contents()) == [1, 2, 3]
+        test1.difference_update(Set(range(2, 100)))
+        assert test1.contents() == [1]
+        test1.difference_update(test1)
+        assert test1.size() == 0
+
+    def test_symmetric_difference_update(self):
+        test1 = Set([1, 2, 3, 4, 5])
+        test1.symmetric_difference_update(Set([4, 5, 6]))
+        assert sorted(test1.contents()) == [1, 2, 3, 6]
+        test1.symmetric_difference_update(test1)
+        assert test1.size() == 0
+
+
+class FrozenSetTest(unittest.TestCase):
+    def test_freeze(self):
+        test1 = Set(['A', 'B', 'C'])
+        frozen = test1.freeze()
+        assert frozen.size() == 3
+        assert sorted(frozen.contents()) == ['A', 'B', 'C']
+        # Changing the original doesn't change the frozen copy
+        test1.add('D')
+        assert frozen.contains('D') is False
+        assert frozen.freeze() is frozen
+        assert sorted(frozen.thaw().contents()) == ['A', 'B', 'C']
+
+    def test_contains(self):
+        frozen = FrozenSet(range(0, 2000, 2))
+        assert all(frozen.contains(number) for number in range(0, 2000, 2))
+        assert not any(frozen.contains(number)
+                       for number in range(1, 2000, 2))
+        assert 'A' not in frozen
+        assert FrozenSet().contains('A') is False
+        assert FrozenSet(['A', 'A']).size() == 1
+
+    def test_same_hash_codes(self):
+        # hash(-1) == hash(-2) in CPython, so no hash can split them up
+        frozen = FrozenSet([-1, -2, 5])
+        assert frozen.contains(-1) is True
+        assert frozen.contains(-2) is True
+        assert frozen.contains(-3) is False
+        assert sorted(frozen.contents()) == [-2, -1, 5]
+
+    def test_equal_duplicates(self):
+        assert FrozenSet([1, 1.0, True]).size() == 1
+        frozen = FrozenSet(['ab', ''.join(['a', 'b']), -1, -2, -1])
+        assert frozen.size() == 3
+        assert sorted(frozen.contents(), key=str) == [-1, -2, 'ab']
+
+    def test_shifted_ints_build_fast(self):
+        # Ints are their own hash codes, so these all share their low bits;
+        # building used to take 40 seconds for 20000 of them
+        for shift in [20, 32, 40]:
+            elements = [number << shift for number in range(20000)]
+            start = time.perf_counter()
+            frozen = FrozenSet(elements)
+            assert time.perf_counter() - start < 5
+            assert frozen.size() == 20000
+            assert all(frozen.contains(item) for item in elements)
+            assert frozen.contains(1) is False
+
+    def test_immutable(self):
+        frozen = FrozenSet([1, 2])
+        with self.assertRaises(AttributeError):
+            frozen.add(3)
+        with self.assertRaises(AttributeError):
+            frozen.remove(1)
+
+    def test_hashable(self):
+        test1 = FrozenSet([1, 2, 3])
+        test2 = Set([3, 2, 1]).freeze()
+        assert test1 == test2
+        assert hash(test1) == hash(test2)
+        assert test1 != FrozenSet([1, 2])
+        assert test1 != FrozenSet([1, 2, 4])
+        table = HashTable()
+        table.set(test1, 'rule')
+        assert table.get(test2) == 'rule'
+        assert table.get(test1) == 'rule'
+        assert test1 == test1
+        assert (test1 != test1) is False
+        # Sets of frozen sets work too
+        assert Set([test1, test2]).size() == 1
+
+    def test_subset(self):
+        big = FrozenSet(range(100))
+        assert FrozenSet([1, 50]).is_subset(big) is True
+        assert FrozenSet([1, 500]).is_subset(big) is False
+        assert FrozenSet().is_subset(big) is True
+        assert big.is_subset(FrozenSet([1])) is False
+        assert FrozenSet([1, 2]).is_subset(Set([1, 2, 3])) is True
+        assert Set([1, 2]).is_subset(big) is True
+
+    def test_set_algebra(self):
+        test1 = FrozenSet([1, 2, 3, 4, 5])
+        test2 = FrozenSet([4, 5, 6])
+        assert sorted(test1.union(test2).contents()) == [1, 2, 3, 4, 5, 6]
+        assert sorted(test1.intersection(test2).contents()) == [4, 5]
+        assert sorted(test1.difference(test2).contents()) == [1, 2, 3]
+        assert sorted(test1.symmetric_difference(test2).contents()) == [
+            1, 2, 3, 6]
+        assert type(test1.union(test2)) is FrozenSet
+        assert sorted(Set([1, 9]).intersection(test1).contents()) == [1]
+
+
 if __name__ == '__main__':
     unittest.main()
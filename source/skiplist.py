@@ -0,0 +1,245 @@
+#!python
+
+import random
+
+
+class SkipNode(object):
+    """A node of a SkipList. Like linkedlist.Node it has data, next and prev,
+    except next is a list with one forward pointer per level, and width[i]
+    counts how many items next[i] jumps over (which is what makes rank and
+    select fast)."""
+    __slots__ = ('data', 'next', 'width', 'prev')
+
+    def __init__(self, data, level):
+        """Initialize this node with the given data and number of levels."""
+        self.data = data
+        self.next = [None] * level
+        self.width = [1] * level
+        self.prev = None  # Only kept on the bottom level
+
+    def __repr__(self):
+        """Return a string representation of this node."""
+        return 'SkipNode({!r})'.format(self.data)
+
+
+class SkipList(object):
+    """Sorted collection of items kept in a linked list with extra express
+    lanes on top: each node is on level 0, about half are also on level 1,
+    a quarter on level 2 and so on. Searching starts on the highest level
+    and drops down a level whenever it would overshoot, so insert, delete,
+    contains, rank and select are all expected O(log n).
+    Unlike a balanced tree, an insert never rebalances anything; it only
+    rewires the pointers right next to the new node, which is what makes
+    skip lists popular for concurrent ordered maps.
+    Duplicate items are allowed; they sit next to each other."""
+
+    MAX_LEVEL = 32
+
+    def __init__(self, iterable=None, seed=None):
+        """Initialize this skip list and insert the given items, if any.
+        Pass a seed to get the same node levels every run."""
+        self.head = SkipNode(None, self.MAX_LEVEL)  # Sentinel, holds no item
+        self.tail = None  # Last node on the bottom level
+        self.level = 0  # Number of levels currently in use
+        self.size = 0
+        self._random = random.Random(seed)
+        if iterable is not None:
+            for item in iterable:
+                self.insert(item)
+
+    def __str__(self):
+        """Return a formatted string representation of this skip list."""
+        items = ['({!r})'.format(item) for item in self]
+        return '[{}]'.format(' -> '.join(items))
+
+    def __repr__(self):
+        """Return a string representation of this skip list."""
+        return 'SkipList({!r})'.format(self.items())
+
+    def __iter__(self):
+        """Yield the items from smallest to largest."""
+        node = self.head.next[0] if self.level else None
+        while node is not None:
+            following = node.next[0]
+            yield node.data
+            node = following
+
+    def __reversed__(self):
+        """Yield the items from largest to smallest."""
+        node = self.tail
+        while node is not None:
+            following = node.prev
+            yield node.data
+            node = following
+
+    def __len__(self):
+        """Return the number of items in this skip list."""
+        return self.size
+
+    def __contains__(self, item):
+        """Return True if this skip list contains the given item."""
+        return self.contains(item)
+
+    def items(self):
+        """Return a list of all items in this skip list, smallest first.
+        Best and worst case running time: Theta(n)"""
+        return list(self)
+
+    def is_empty(self):
+        """Return True if this skip list is empty, or False otherwise."""
+        return self.size == 0
+
+    def length(self):
+        """Return the number of items in this skip list."""
+        return self.size
+
+    def _random_level(self):
+        """Return a level count for a new node: 1 with probability 1/2, 2 with
+        probability 1/4, and so on, up to MAX_LEVEL."""
+        level = 1
+        while level < self.MAX_LEVEL and self._random.random() < 0.5:
+            level += 1
+        return level
+
+    def _last_before(self, item):
+        """Return the last node holding something less than item (or the head
+        sentinel) along with the position of that node, 0 being the head.
+        Expected running time: O(log n)"""
+        node = self.head
+        position = 0
+        for i in reversed(range(self.level)):
+            following = node.next[i]
+            while following is not None and following.data < item:
+                position += node.width[i]
+                node = following
+                following = node.next[i]
+        return node, position
+
+    def insert(self, item):
+        """Insert the given item after any items equal to it.
+        Expected running time: O(log n)"""
+        level = self._random_level()
+        if level > self.level:
+            # Fresh levels on the head point past the end, over every item
+            for i in range(self.level, level):
+                self.head.next[i] = None
+                self.head.width[i] = self.size + 1
+            self.level = level
+        # For each level, find the node the new one goes after, and count how
+        # many items that level skips while getting there
+        before = [None] * self.level
+        steps = [0] * self.level
+        node = self.head
+        for i in reversed(range(self.level)):
+            following = node.next[i]
+            while following is not None and not item < following.data:
+                steps[i] += node.width[i]
+                node = following
+                following = node.next[i]
+            before[i] = node
+        new_node = SkipNode(item, level)
+        skipped = 0  # Items between before[i] and the new node
+        for i in range(level):
+            previous = before[i]
+            new_node.next[i] = previous.next[i]
+            previous.next[i] = new_node
+            new_node.width[i] = previous.width[i] - skipped
+            previous.width[i] = skipped + 1
+            skipped += steps[i]
+        # Higher levels jump over the new node, so they are one item longer
+        for i in range(level, self.level):
+            before[i].width[i] += 1
+        # Bottom level back pointers
+        new_node.prev = before[0] if before[0] is not self.head else None
+        if new_node.next[0] is None:
+            self.tail = new_node
+        else:
+            new_node.next[0].prev = new_node
+        self.size += 1
+
+    def delete(self, item):
+        """Delete the first occurrence of the given item, or raise ValueError.
+        Expected running time: O(log n)"""
+        before = [None] * self.level
+        node = self.head
+        for i in reversed(range(self.level)):
+            following = node.next[i]
+            while following is not None and following.data < item:
+                node = following
+                following = node.next[i]
+            before[i] = node
+        target = before[0].next[0] if self.level else None
+        if target is None or target.data != item:
+            raise ValueError('Item not found: {!r}'.format(item))
+        for i in range(self.level):
+            previous = before[i]
+            if previous.next[i] is target:
+                previous.width[i] += target.width[i] - 1
+                previous.next[i] = target.next[i]
+            else:
+                previous.width[i] -= 1
+        if target.next[0] is None:
+            self.tail = target.prev
+        else:
+            target.next[0].prev = target.prev
+        self.size -= 1
+        # Drop levels nothing is using any more
+        while self.level > 0 and self.head.next[self.level - 1] is None:
+            self.level -= 1
+
+    def contains(self, item):
+        """Return True if this skip list contains the given item.
+        Expected running time: O(log n)"""
+        node = self._last_before(item)[0].next[0] if self.level else None
+        return node is not None and node.data == item
+
+    def rank(self, item):
+        """Return how many items in this skip list are less than item, which
+        is also the index item has (or would have) in sorted order.
+        Expected running time: O(log n)"""
+        return self._last_before(item)[1]
+
+    def select(self, index):
+        """Return the item at the given index in sorted order.
+        Expected running time: O(log n)"""
+        if not (0 <= index < self.size):
+            raise ValueError('List index out of range: {}'.format(index))
+        node = self.head
+        position = 0
+        for i in reversed(range(self.level)):
+            while (node.next[i] is not None and
+                   position + node.width[i] <= index + 1):
+                position += node.width[i]
+                node = node.next[i]
+        return node.data
+
+    def iter_range(self, low=None, high=None):
+        """Yield the items with low <= item < high, smallest first. Leave out
+        low or high for no lower or upper bound.
+        Running time: O(log n + k) for k yielded items"""
+        if not self.level:
+            return
+        if low is None:
+            node = self.head.next[0]
+        else:
+            node = self._last_before(low)[0].next[0]
+        while node is not None and (high is None or node.data < high):
+            following = node.next[0]
+            yield node.data
+            node = following
+
+    def range(self, low=None, high=None):
+        """Return a list of the items with low <= item < high."""
+        return list(self.iter_range(low, high))
+
+    def first(self):
+        """Return the smallest item, or raise ValueError if empty."""
+        if self.is_empty():
+            raise ValueError('SkipList is empty')
+        return self.head.next[0].data
+
+    def last(self):
+        """Return the largest item, or raise ValueError if empty."""
+        if self.is_empty():
+            raise ValueError('SkipList is empty')
+        return self.tail.data
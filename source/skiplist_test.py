@@ -0,0 +1,96 @@
+#!python
+
+from skiplist import SkipList
+import bisect
+import random
+import unittest
+
+
+class SkipListTest(unittest.TestCase):
+
+    def test_init(self):
+        sl = SkipList()
+        assert sl.size == 0
+        assert sl.is_empty()
+        assert sl.items() == []
+        sl = SkipList([3, 1, 2])
+        assert sl.items() == [1, 2, 3]
+        assert sl.length() == 3
+
+    def test_insert_keeps_order(self):
+        sl = SkipList(seed=0)
+        for item in ['D', 'B', 'A', 'C', 'B']:
+            sl.insert(item)
+        assert sl.items() == ['A', 'B', 'B', 'C', 'D']
+        assert list(reversed(sl)) == ['D', 'C', 'B', 'B', 'A']
+        assert len(sl) == 5
+        assert sl.first() == 'A'
+        assert sl.last() == 'D'
+
+    def test_delete(self):
+        sl = SkipList(['A', 'B', 'B', 'C'], seed=0)
+        sl.delete('B')
+        assert sl.items() == ['A', 'B', 'C']
+        sl.delete('A')
+        sl.delete('C')
+        assert sl.items() == ['B']
+        assert sl.last() == 'B'
+        sl.delete('B')
+        assert sl.is_empty()
+        assert sl.level == 0
+        with self.assertRaises(ValueError):
+            sl.delete('B')
+        with self.assertRaises(ValueError):
+            sl.first()
+
+    def test_contains(self):
+        sl = SkipList([5, 1, 9], seed=0)
+        assert sl.contains(5)
+        assert 9 in sl
+        assert 4 not in sl
+        assert 10 not in sl
+        assert not SkipList().contains(5)
+
+    def test_rank_and_select(self):
+        sl = SkipList(range(0, 100, 10), seed=0)
+        assert sl.rank(0) == 0
+        assert sl.rank(35) == 4
+        assert sl.rank(1000) == 10
+        assert [sl.select(i) for i in range(10)] == list(range(0, 100, 10))
+        with self.assertRaises(ValueError):
+            sl.select(10)
+        with self.assertRaises(ValueError):
+            sl.select(-1)
+
+    def test_range(self):
+        sl = SkipList(range(10), seed=0)
+        assert sl.range(3, 6) == [3, 4, 5]
+        assert sl.range(high=2) == [0, 1]
+        assert sl.range(low=8) == [8, 9]
+        assert sl.range(20, 30) == []
+        assert list(sl.iter_range()) == list(range(10))
+        assert list(SkipList().iter_range(1, 2)) == []
+
+    def test_matches_sorted_list(self):
+        rand = random.Random(2)
+        sl = SkipList(seed=2)
+        expected = []
+        for step in range(2000):
+            item = rand.randrange(100)
+            if rand.random() < 0.6:
+                sl.insert(item)
+                bisect.insort_right(expected, item)
+            elif item in expected:
+                sl.delete(item)
+                expected.remove(item)
+            index = rand.randrange(len(expected)) if expected else None
+            if index is not None:
+                assert sl.select(index) == expected[index]
+            assert sl.rank(item) == bisect.bisect_left(expected, item)
+        assert sl.items() == expected
+        assert list(reversed(sl)) == expected[::-1]
+        assert sl.size == len(expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
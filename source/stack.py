@@ -1,6 +1,6 @@
 #!python
 
-from linkedlist import LinkedList
+from linkedlist import LinkedList, NodePool
 
 
 # Implement LinkedStack below, then change the assignment at the bottom
@@ -9,8 +9,9 @@ class LinkedStack(object):
 
     def __init__(self, iterable=None):
         """Initialize this stack and push the given items, if any."""
-        # Initialize a new linked list to store the items
-        self.list = LinkedList()
+        # Initialize a new linked list to store the items; pushes and pops
+        # churn through nodes, so recycle them instead of making new ones
+        self.list = LinkedList(pool=NodePool())
         if iterable is not None:
             for item in iterable:
                 self.push(item)
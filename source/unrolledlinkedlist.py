@@ -0,0 +1,261 @@
+#!python
+
+
+class Block(object):
+    """A node of an UnrolledLinkedList, holding up to capacity items in a
+    plain Python list instead of just one."""
+    __slots__ = ('items', 'next', 'prev')
+
+    def __init__(self, items=None):
+        """Initialize this block with the given list of items."""
+        self.items = items if items is not None else []
+        self.next = None
+        self.prev = None
+
+    def __repr__(self):
+        """Return a string representation of this block."""
+        return 'Block({!r})'.format(self.items)
+
+
+class UnrolledLinkedList(object):
+    """Doubly linked list of Blocks that each hold several items, with the
+    same API as LinkedList. One block per capacity items means far fewer
+    objects and pointer hops than one Node per item, while inserting and
+    deleting in the middle only ever shifts items within one block."""
+
+    def __init__(self, iterable=None, capacity=32):
+        """Initialize this linked list and append the given items, if any.
+        Blocks hold at most capacity items each."""
+        self.head = None  # First block
+        self.tail = None  # Last block
+        self.size = 0  # Number of items (not blocks)
+        self.capacity = max(2, capacity)
+        # Append the given items
+        if iterable is not None:
+            for item in iterable:
+                self.append(item)
+
+    def __str__(self):
+        """Return a formatted string representation of this linked list."""
+        items = ['({!r})'.format(item) for item in self]
+        return '[{}]'.format(' -> '.join(items))
+
+    def __repr__(self):
+        """Return a string representation of this linked list."""
+        return 'UnrolledLinkedList({!r})'.format(self.items())
+
+    def __iter__(self):
+        """Yield the items from head to tail without copying them."""
+        block = self.head
+        while block is not None:
+            following = block.next
+            for item in block.items:
+                yield item
+            block = following
+
+    def __reversed__(self):
+        """Yield the items from tail to head without copying them."""
+        block = self.tail
+        while block is not None:
+            following = block.prev
+            for item in reversed(block.items):
+                yield item
+            block = following
+
+    def __len__(self):
+        """Return the number of items in this linked list."""
+        return self.size
+
+    def items(self):
+        """Return a list of all items in this linked list.
+        Best and worst case running time: Theta(n)"""
+        result = []
+        block = self.head
+        while block is not None:
+            result.extend(block.items)
+            block = block.next
+        return result
+
+    def rev_items(self):
+        """Return a list of all items in this linked list, last first.
+        Best and worst case running time: Theta(n)"""
+        result = []
+        block = self.tail
+        while block is not None:
+            result.extend(reversed(block.items))
+            block = block.prev
+        return result
+
+    def is_empty(self):
+        """Return True if this linked list is empty, or False."""
+        return self.head is None
+
+    def length(self):
+        """Return the number of items in this linked list.
+        Best and worst case: O(1); size is kept up to date"""
+        return self.size
+
+    def _link_after(self, block, new_block):
+        """Link new_block in after block (or as the head if block is None)."""
+        if block is None:
+            new_block.next = self.head
+            if self.head is not None:
+                self.head.prev = new_block
+            self.head = new_block
+        else:
+            new_block.prev = block
+            new_block.next = block.next
+            if block.next is not None:
+                block.next.prev = new_block
+            block.next = new_block
+        if new_block.next is None:
+            self.tail = new_block
+
+    def _unlink(self, block):
+        """Remove the given (empty) block from the chain."""
+        if block.prev is not None:
+            block.prev.next = block.next
+        else:
+            self.head = block.next
+        if block.next is not None:
+            block.next.prev = block.prev
+        else:
+            self.tail = block.prev
+        block.next = block.prev = None
+
+    def _find_block(self, index):
+        """Return (block, offset) for the item at the given (valid) index,
+        walking from whichever end is closer.
+        Running time: O(n / capacity)"""
+        if index < self.size // 2:
+            block = self.head
+            while index >= len(block.items):
+                index -= len(block.items)
+                block = block.next
+            return block, index
+        # Count back from the end instead
+        index = self.size - 1 - index
+        block = self.tail
+        while index >= len(block.items):
+            index -= len(block.items)
+            block = block.prev
+        return block, len(block.items) - 1 - index
+
+    def get_at_index(self, index):
+        """Return the item at the given index in this linked list, or
+        raise ValueError if the given index is out of range of the list size.
+        Running time: O(n / capacity) block hops, then O(1)"""
+        if not (0 <= index < self.size):
+            raise ValueError('List index out of range: {}'.format(index))
+        block, offset = self._find_block(index)
+        return block.items[offset]
+
+    def insert_at_index(self, index, item):
+        """Insert the given item at the given index in this linked list, or
+        raise ValueError if the given index is out of range of the list size.
+        A full block is split in half first to make room.
+        Running time: O(n / capacity + capacity)"""
+        if not (0 <= index <= self.size):
+            raise ValueError('List index out of range: {}'.format(index))
+        if index == self.size:
+            self.append(item)
+            return
+        block, offset = self._find_block(index)
+        if len(block.items) >= self.capacity:
+            # Move the back half into a new block right after this one
+            half = len(block.items) // 2
+            self._link_after(block, Block(block.items[half:]))
+            del block.items[half:]
+            if offset > half:
+                block, offset = block.next, offset - half
+        block.items.insert(offset, item)
+        self.size += 1
+
+    def append(self, item):
+        """Insert the given item at the tail of this linked list.
+        Running time: O(1)"""
+        if self.tail is None or len(self.tail.items) >= self.capacity:
+            self._link_after(self.tail, Block())
+        self.tail.items.append(item)
+        self.size += 1
+
+    def prepend(self, item):
+        """Insert the given item at the head of this linked list.
+        Running time: O(capacity) to shift the head block's items"""
+        if self.head is None or len(self.head.items) >= self.capacity:
+            self._link_after(None, Block())
+        self.head.items.insert(0, item)
+        self.size += 1
+
+    def find(self, quality):
+        """Return an item from this linked list satisfying the given quality.
+        Best case running time: Omega(1) if item is near the head.
+        Worst case running time: O(n) if it's near the tail or not here."""
+        block = self.head
+        while block is not None:
+            for item in block.items:
+                if quality(item):
+                    return item
+            block = block.next
+        return None
+
+    def replace(self, old_item, new_item):
+        """Replace the given old_item in this linked list with given new_item,
+        or raise ValueError if old_item is not found.
+        Running time: O(n) worst case"""
+        if old_item == new_item:
+            return
+        block = self.head
+        while block is not None:
+            for offset, item in enumerate(block.items):
+                if item == old_item:
+                    block.items[offset] = new_item
+                    return
+            block = block.next
+        raise ValueError('Item not found: {}'.format(old_item))
+
+    def delete(self, item):
+        """Delete the given item from this linked list, or raise ValueError.
+        A block that gets too small is merged into the next one, so blocks
+        stay at least about half full.
+        Running time: O(n) to find it, O(capacity) to remove it"""
+        block = self.head
+        while block is not None:
+            if item in block.items:
+                block.items.remove(item)
+                self.size -= 1
+                self._rebalance(block)
+                return
+            block = block.next
+        raise ValueError('Item not found: {}'.format(item))
+
+    def _rebalance(self, block):
+        """Drop the given block if it's empty, or merge the next block into
+        it if both fit in one block and it's under half full."""
+        if not block.items:
+            self._unlink(block)
+            return
+        following = block.next
+        if (following is not None and
+                len(block.items) < self.capacity // 2 and
+                len(block.items) + len(following.items) <= self.capacity):
+            block.items.extend(following.items)
+            self._unlink(following)
+
+    def remove_tail(self):
+        """Delete the tail item specifically and return it.
+        Running time: O(1)"""
+        item = self.tail.items.pop()
+        self.size -= 1
+        if not self.tail.items:
+            self._unlink(self.tail)
+        return item
+
+    def remove_head(self):
+        """Delete the head item specifically and return it.
+        Running time: O(capacity) to shift the head block's items"""
+        item = self.head.items.pop(0)
+        self.size -= 1
+        if not self.head.items:
+            self._unlink(self.head)
+        return item
@@ -0,0 +1,107 @@
+#!python
+
+from unrolledlinkedlist import UnrolledLinkedList
+import random
+import unittest
+
+
+class UnrolledLinkedListTest(unittest.TestCase):
+
+    def test_init(self):
+        ll = UnrolledLinkedList()
+        assert ll.head is None
+        assert ll.tail is None
+        assert ll.size == 0
+        ll = UnrolledLinkedList(['A', 'B', 'C'])
+        assert ll.items() == ['A', 'B', 'C']
+        assert ll.length() == 3
+
+    def test_blocks_fill_up(self):
+        ll = UnrolledLinkedList(range(10), capacity=4)
+        assert ll.head.items == [0, 1, 2, 3]
+        assert ll.tail.items == [8, 9]
+        ll.prepend(-1)  # head block is full, so a new one goes in front
+        assert ll.head.items == [-1]
+        assert ll.items() == list(range(-1, 10))
+        assert ll.rev_items() == list(reversed(range(-1, 10)))
+        assert list(ll) == ll.items()
+        assert list(reversed(ll)) == ll.rev_items()
+        assert len(ll) == 11
+
+    def test_get_at_index(self):
+        ll = UnrolledLinkedList(range(100), capacity=8)
+        for index in range(100):
+            assert ll.get_at_index(index) == index
+        with self.assertRaises(ValueError):
+            ll.get_at_index(100)  # index too high
+        with self.assertRaises(ValueError):
+            ll.get_at_index(-1)  # index too low
+
+    def test_insert_at_index_splits_blocks(self):
+        ll = UnrolledLinkedList(['A', 'B', 'C', 'D'], capacity=4)
+        ll.insert_at_index(1, 'X')
+        assert ll.items() == ['A', 'X', 'B', 'C', 'D']
+        assert ll.head.items == ['A', 'X', 'B']
+        ll.insert_at_index(5, 'E')  # append
+        ll.insert_at_index(0, 'Z')
+        assert ll.items() == ['Z', 'A', 'X', 'B', 'C', 'D', 'E']
+        with self.assertRaises(ValueError):
+            ll.insert_at_index(8, 'Y')  # index too high
+
+    def test_delete(self):
+        ll = UnrolledLinkedList(['A', 'B', 'C'], capacity=2)
+        ll.delete('A')
+        assert ll.items() == ['B', 'C']
+        ll.delete('C')
+        ll.delete('B')
+        assert ll.head is None
+        assert ll.tail is None
+        assert ll.size == 0
+        with self.assertRaises(ValueError):
+            ll.delete('X')  # item not in list
+
+    def test_find_and_replace(self):
+        ll = UnrolledLinkedList(['A', 'B', 'C'], capacity=2)
+        assert ll.find(lambda item: item > 'A') == 'B'
+        assert ll.find(lambda item: item == 'X') is None
+        ll.replace('C', 'D')
+        assert ll.items() == ['A', 'B', 'D']
+        with self.assertRaises(ValueError):
+            ll.replace('X', 'Y')  # item not in list
+
+    def test_remove_head_and_tail(self):
+        ll = UnrolledLinkedList(range(5), capacity=2)
+        assert ll.remove_head() == 0
+        assert ll.remove_tail() == 4
+        assert ll.remove_tail() == 3
+        assert ll.items() == [1, 2]
+        assert ll.remove_head() == 1
+        assert ll.remove_head() == 2
+        assert ll.is_empty() is True
+
+    def test_matches_list(self):
+        rand = random.Random(1)
+        ll = UnrolledLinkedList(capacity=4)
+        expected = []
+        for number in range(2000):
+            choice = rand.random()
+            if choice < 0.3:
+                ll.append(number)
+                expected.append(number)
+            elif choice < 0.5:
+                ll.prepend(number)
+                expected.insert(0, number)
+            elif choice < 0.7:
+                index = rand.randint(0, len(expected))
+                ll.insert_at_index(index, number)
+                expected.insert(index, number)
+            elif expected:
+                item = rand.choice(expected)
+                ll.delete(item)
+                expected.remove(item)
+        assert ll.items() == expected
+        assert ll.size == len(expected)
+
+
+if __name__ == '__main__':
+    unittest.main()